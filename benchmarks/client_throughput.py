@@ -0,0 +1,152 @@
+"""Compare ingest and query throughput of the v3 and v4 Weaviate clients.
+
+The v3 client (``DatabaseConnection.legacy_client``) imports over REST and
+queries through GraphQL; the v4 client batches and searches over gRPC. Both
+load the same synthetic corpus into a scratch collection with the Memory
+schema and then run the same near-vector and filtered queries.
+
+Usage:
+    python benchmarks/client_throughput.py --count 20000 --queries 500
+    python benchmarks/client_throughput.py --clients v4 --dimension 384
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
+
+from eumas.database.connection import DatabaseConnection
+from eumas.database.schema import get_memory_class_schema
+
+CLASS_NAME = "BenchClientMemory"
+FIELDS = ["userPrompt", "contextTags", "memoryPriority"]
+
+
+def synthetic_corpus(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Generate random unit vectors."""
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def properties(i: int) -> dict:
+    """Properties of the i-th synthetic memory."""
+    return {
+        "userPrompt": f"synthetic prompt {i}",
+        "contextTags": [f"tag{i % 50}"],
+        "memoryPriority": (i % 100) / 100.0,
+    }
+
+
+def reset_collection(connection: DatabaseConnection) -> None:
+    """Create an empty scratch collection."""
+    schema = get_memory_class_schema()
+    schema["class"] = CLASS_NAME
+    schema.pop("moduleConfig", None)
+    if connection.client.collections.exists(CLASS_NAME):
+        connection.client.collections.delete(CLASS_NAME)
+    connection.client.collections.create_from_dict(schema)
+
+
+def run_v3(connection: DatabaseConnection, corpus: np.ndarray, queries: np.ndarray, k: int):
+    """Ingest and query through the v3 REST/GraphQL client."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        client = connection.legacy_client
+
+    start = time.perf_counter()
+    with client.batch(batch_size=200) as batch:
+        for i, vector in enumerate(corpus):
+            batch.add_data_object(
+                properties(i), CLASS_NAME, uuid=generate_uuid5(i), vector=vector.tolist()
+            )
+    ingest = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        client.query.get(CLASS_NAME, FIELDS).with_near_vector(
+            {"vector": query.tolist()}
+        ).with_limit(k).with_additional("distance").do()
+    near_vector = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(len(queries)):
+        client.query.get(CLASS_NAME, FIELDS).with_where({
+            "operator": "And",
+            "operands": [
+                {"path": ["contextTags"], "operator": "ContainsAny",
+                 "valueTextArray": [f"tag{i % 50}"]},
+                {"path": ["memoryPriority"], "operator": "GreaterThanEqual", "valueNumber": 0.5},
+            ],
+        }).with_limit(k).do()
+    filtered = time.perf_counter() - start
+    return ingest, near_vector, filtered
+
+
+def run_v4(connection: DatabaseConnection, corpus: np.ndarray, queries: np.ndarray, k: int):
+    """Ingest and query through the v4 gRPC client."""
+    collection = connection.get_collection(CLASS_NAME)
+
+    start = time.perf_counter()
+    with connection.get_batch_client(batch_size=200) as batch:
+        for i, vector in enumerate(corpus):
+            batch.add_object(
+                collection=CLASS_NAME,
+                properties=properties(i),
+                uuid=generate_uuid5(i),
+                vector=vector.tolist(),
+            )
+    ingest = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        collection.query.near_vector(
+            query.tolist(), limit=k, return_properties=FIELDS, return_metadata=["distance"]
+        )
+    near_vector = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(len(queries)):
+        collection.query.fetch_objects(
+            filters=(
+                Filter.by_property("contextTags").contains_any([f"tag{i % 50}"])
+                & Filter.by_property("memoryPriority").greater_or_equal(0.5)
+            ),
+            limit=k,
+            return_properties=FIELDS,
+        )
+    filtered = time.perf_counter() - start
+    return ingest, near_vector, filtered
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clients", nargs="+", default=["v3", "v4"], choices=["v3", "v4"])
+    args = parser.parse_args()
+
+    vectors = synthetic_corpus(args.count + args.queries, args.dimension)
+    queries, corpus = vectors[:args.queries], vectors[args.queries:]
+    runners = {"v3": run_v3, "v4": run_v4}
+
+    print(f"corpus={len(corpus)} dimension={args.dimension} queries={len(queries)}")
+    print(f"{'client':8} {'ingest/s':>10} {'nearVector QPS':>15} {'filtered QPS':>13}")
+    with DatabaseConnection() as connection:
+        for name in args.clients:
+            reset_collection(connection)
+            ingest, near_vector, filtered = runners[name](connection, corpus, queries, args.k)
+            print(
+                f"{name:8} {len(corpus) / ingest:10.0f} {len(queries) / near_vector:15.1f} "
+                f"{len(queries) / filtered:13.1f}"
+            )
+        connection.client.collections.delete(CLASS_NAME)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure retrieval recall@k of reduced-dimension embeddings.
+
+Embeds a text corpus at full dimension, then reports how many of each query's
+full-dimension top-k neighbours are still retrieved after truncating to smaller
+sizes. Without --input, a synthetic corpus with a decaying variance spectrum
+(similar to Matryoshka-trained models) is used so the harness runs offline.
+
+Usage:
+    python benchmarks/embedding_dimensions.py --input texts.txt --model text-embedding-3-small
+    python benchmarks/embedding_dimensions.py --synthetic 20000 --dimensions 256 512 768
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from eumas.embeddings.reduction import evaluate_dimensions
+
+
+def synthetic_embeddings(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Generate random embeddings whose variance decays over the dimensions."""
+    rng = np.random.default_rng(seed)
+    scale = 1.0 / np.sqrt(1.0 + np.arange(dimension) / 32.0)
+    return (rng.standard_normal((count, dimension)) * scale).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", help="Text file with one document per line")
+    parser.add_argument("--model", default="text-embedding-3-small")
+    parser.add_argument("--synthetic", type=int, default=10000,
+                        help="Synthetic corpus size when --input is not given")
+    parser.add_argument("--full-dimension", type=int, default=1536)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[256, 512, 768, 1024])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.input:
+        from eumas.embeddings.generator import EmbeddingGenerator
+
+        with open(args.input, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        embeddings = EmbeddingGenerator(model=args.model).generate(texts, as_array=True)
+    else:
+        embeddings = synthetic_embeddings(args.synthetic + args.queries, args.full_dimension)
+
+    queries, corpus = embeddings[:args.queries], embeddings[args.queries:]
+    print(f"corpus={len(corpus)} queries={len(queries)} full_dimension={corpus.shape[1]}")
+
+    start = time.perf_counter()
+    results = evaluate_dimensions(corpus, queries, args.dimensions, k=args.k)
+    elapsed = time.perf_counter() - start
+
+    for dimension, recall in sorted(results.items()):
+        ratio = corpus.shape[1] / dimension
+        print(f"dim={dimension:5d}  recall@{args.k}={recall:.3f}  {ratio:.1f}x less vector memory")
+    print(f"evaluated in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
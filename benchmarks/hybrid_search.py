@@ -0,0 +1,149 @@
+"""Compare hybrid BM25 + vector search with vector-only search.
+
+Each synthetic memory mentions a rare made-up name, and its vector lies in one
+of a few topic clusters. A query asks about one memory by name, with the
+target's vector perturbed by noise, as an embedding of a paraphrase would be.
+Vector-only search finds the right cluster but often not the memory; the
+keyword half of hybrid search matches the name. Reports hit rate, mean
+reciprocal rank and latency per configuration.
+
+Usage:
+    python benchmarks/hybrid_search.py --count 20000 --queries 500
+    python benchmarks/hybrid_search.py --alphas 0.25 0.5 --fusion ranked
+"""
+
+import argparse
+import time
+
+import numpy as np
+from weaviate.util import generate_uuid5
+
+from eumas.database.connection import DatabaseConnection
+from eumas.database.operations import SEARCH_FIELDS, hybrid_memories_query
+from eumas.database.schema import get_memory_class_schema
+
+CLASS_NAME = "BenchHybridMemory"
+SYLLABLES = ["ka", "zu", "rin", "tho", "vel", "mor", "qi", "sha", "dun", "lex"]
+
+
+def rare_name(i: int) -> str:
+    """Spell a unique pronounceable name for memory i."""
+    digits = f"{i:05d}"
+    return "".join(SYLLABLES[int(d)] for d in digits).capitalize()
+
+
+def synthetic_corpus(count: int, dimension: int, topics: int, seed: int = 0) -> np.ndarray:
+    """Generate unit vectors around a few topic centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((topics, dimension))
+    vectors = centroids[np.arange(count) % topics] + 0.3 * rng.standard_normal((count, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def properties(i: int, topics: int) -> dict:
+    """Properties of the i-th synthetic memory."""
+    return {
+        "userPrompt": f"I met {rare_name(i)} yesterday and we talked about topic {i % topics}",
+        "agentReply": f"That sounds like a good conversation about topic {i % topics}.",
+        "contextTags": [f"topic{i % topics}"],
+    }
+
+
+def load(connection: DatabaseConnection, corpus: np.ndarray, topics: int) -> None:
+    """Create the scratch collection and import the corpus."""
+    schema = get_memory_class_schema()
+    schema["class"] = CLASS_NAME
+    schema.pop("moduleConfig", None)
+    if connection.client.collections.exists(CLASS_NAME):
+        connection.client.collections.delete(CLASS_NAME)
+    connection.client.collections.create_from_dict(schema)
+
+    with connection.get_batch_client(batch_size=200) as batch:
+        for i, vector in enumerate(corpus):
+            batch.add_object(
+                collection=CLASS_NAME,
+                properties=properties(i, topics),
+                uuid=generate_uuid5(i),
+                vector=vector.tolist(),
+            )
+
+
+def evaluate(search, targets: np.ndarray, k: int) -> dict:
+    """Run one search per target and score where the target ranks."""
+    latencies, reciprocal_ranks = [], []
+    for query_index, target in enumerate(targets):
+        expected = generate_uuid5(int(target))
+        start = time.perf_counter()
+        objects = search(query_index, int(target))
+        latencies.append(time.perf_counter() - start)
+        ids = [str(obj.uuid) for obj in objects]
+        reciprocal_ranks.append(1.0 / (ids.index(expected) + 1) if expected in ids else 0.0)
+
+    ranks = np.array(reciprocal_ranks)
+    millis = np.array(latencies) * 1000
+    return {
+        "hit_rate": float((ranks > 0).mean()),
+        "mrr": float(ranks.mean()),
+        "p50_ms": float(np.percentile(millis, 50)),
+        "p95_ms": float(np.percentile(millis, 95)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=0.6,
+                        help="standard deviation of the query vector perturbation")
+    parser.add_argument("--alphas", type=float, nargs="+", default=[0.25, 0.5, 0.75])
+    parser.add_argument("--fusion", choices=["relative_score", "ranked"], default="relative_score")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    corpus = synthetic_corpus(args.count, args.dimension, args.topics)
+    targets = rng.choice(args.count, size=args.queries, replace=False)
+    queries = corpus[targets] + args.noise * rng.standard_normal(
+        (args.queries, args.dimension)
+    ) / np.sqrt(args.dimension)
+    texts = [f"what did {rare_name(int(t))} and I talk about" for t in targets]
+
+    with DatabaseConnection() as connection:
+        load(connection, corpus, args.topics)
+        collection = connection.get_collection(CLASS_NAME)
+
+        def vector_only(q, target):
+            return collection.query.near_vector(
+                queries[q].tolist(), limit=args.k, return_properties=SEARCH_FIELDS,
+                return_metadata=["distance"]
+            ).objects
+
+        configs = [("vector only", vector_only)]
+        for alpha in args.alphas:
+            search = hybrid_memories_query(
+                args.k, alpha, args.fusion, None, None, None, SEARCH_FIELDS
+            )
+
+            def hybrid(q, target, search=search):
+                return collection.query.hybrid(
+                    texts[q], vector=queries[q].tolist(), **search
+                ).objects
+
+            configs.append((f"hybrid a={alpha:g}", hybrid))
+
+        print(f"corpus={args.count} dimension={args.dimension} queries={args.queries} "
+              f"k={args.k} fusion={args.fusion}")
+        print(f"{'search':16} {'hit@k':>7} {'MRR':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, search in configs:
+            result = evaluate(search, targets, args.k)
+            print(f"{name:16} {result['hit_rate']:7.3f} {result['mrr']:7.3f} "
+                  f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f}")
+
+        connection.client.collections.delete(CLASS_NAME)
+
+
+if __name__ == "__main__":
+    main()
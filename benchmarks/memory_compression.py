@@ -0,0 +1,108 @@
+"""Compare vector compression profiles for the Memory collection.
+
+For each profile a scratch collection with the Memory schema is created in the
+configured Weaviate instance and filled with a synthetic clustered corpus. The
+script then reports the estimated in-memory vector footprint, single-client
+query throughput and recall@10 against exact brute-force search.
+
+Usage:
+    python benchmarks/memory_compression.py --count 50000 --dimension 1536
+    python benchmarks/memory_compression.py --profiles none sq bq --queries 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+from weaviate.util import generate_uuid5
+
+from eumas.database.compression import COMPRESSION_PROFILES, estimate_vector_bytes
+from eumas.database.connection import DatabaseConnection
+from eumas.database.schema import get_memory_class_schema
+from eumas.embeddings.reduction import recall_at_k, top_k
+
+
+def synthetic_corpus(count: int, dimension: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """Generate unit vectors grouped around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension))
+    vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal(
+        (count, dimension)
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def run_profile(client, profile: str, corpus: np.ndarray, queries: np.ndarray, k: int) -> dict:
+    """Load the corpus into a scratch collection and measure one profile."""
+    class_name = f"BenchMemory{profile.upper()}"
+    schema = get_memory_class_schema(
+        compression=profile,
+        # Train on part of the corpus so compression kicks in during the import
+        **({"trainingLimit": min(len(corpus) // 2, 100000)} if profile in ("pq", "sq") else {})
+    )
+    schema["class"] = class_name
+    schema.pop("moduleConfig", None)
+
+    if client.collections.exists(class_name):
+        client.collections.delete(class_name)
+    collection = client.collections.create_from_dict(schema)
+
+    start = time.perf_counter()
+    with client.batch.dynamic() as batch:
+        for i, vector in enumerate(corpus):
+            batch.add_object(
+                collection=class_name,
+                properties={"userPrompt": f"memory {i}"},
+                uuid=generate_uuid5(i),
+                vector=vector.tolist(),
+            )
+    ingest_seconds = time.perf_counter() - start
+
+    uuid_to_index = {generate_uuid5(i): i for i in range(len(corpus))}
+    retrieved = []
+    start = time.perf_counter()
+    for query in queries:
+        result = collection.query.near_vector(query.tolist(), limit=k, return_properties=[])
+        ids = [uuid_to_index[str(o.uuid)] for o in result.objects]
+        retrieved.append((ids + [-1] * k)[:k])
+    query_seconds = time.perf_counter() - start
+
+    client.collections.delete(class_name)
+    return {
+        "ingest_per_second": len(corpus) / ingest_seconds,
+        "qps": len(queries) / query_seconds,
+        "retrieved": np.array(retrieved),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--profiles", nargs="+", default=COMPRESSION_PROFILES,
+                        choices=COMPRESSION_PROFILES)
+    args = parser.parse_args()
+
+    vectors = synthetic_corpus(args.count + args.queries, args.dimension)
+    queries, corpus = vectors[:args.queries], vectors[args.queries:]
+    expected = top_k(queries, corpus, args.k)
+
+    print(f"corpus={len(corpus)} dimension={args.dimension} queries={len(queries)}")
+    recall_header = f"recall@{args.k}"
+    print(f"{'profile':8} {'vector MB':>10} {'ingest/s':>10} {'QPS':>8} {recall_header:>10}")
+    with DatabaseConnection() as connection:
+        for profile in args.profiles:
+            result = run_profile(connection.client, profile, corpus, queries, args.k)
+            megabytes = estimate_vector_bytes(profile, args.dimension) * len(corpus) / 2 ** 20
+            recall = recall_at_k(expected, result["retrieved"])
+            print(
+                f"{profile:8} {megabytes:10.1f} {result['ingest_per_second']:10.0f} "
+                f"{result['qps']:8.1f} {recall:10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ setup(
     install_requires=[
         "weaviate-client==4.9.4",
         "openai==1.55.1",
+        "numpy==1.26.4",
+        "pyarrow==17.0.0",
         "python-dotenv==1.0.0",
         "pyyaml==6.0.1",
         "loguru==0.7.2",
@@ -22,6 +24,7 @@ setup(
             "black==23.11.0",
             "flake8==6.1.0",
             "mypy==1.7.0",
+            "types-PyYAML==6.0.12.12",
         ],
     },
     python_requires=">=3.9",
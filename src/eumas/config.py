@@ -12,9 +12,15 @@ class Config:
 
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     WEAVIATE_URL: str = os.getenv("WEAVIATE_URL", "")
+    WEAVIATE_GRPC_PORT: int = int(os.getenv("WEAVIATE_GRPC_PORT", "50051"))
+    WEAVIATE_POOL_SIZE: int = int(os.getenv("WEAVIATE_POOL_SIZE", "4"))
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "openai")
+    ARCHETYPE_METADATA_PATH: str = os.getenv(
+        "ARCHETYPE_METADATA_PATH", "docs_startup/archetype_metadata.yaml"
+    )
 
     @classmethod
     def validate(cls) -> Optional[str]:
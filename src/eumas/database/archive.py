@@ -0,0 +1,458 @@
+"""
+Columnar export and import of memories and relations.
+
+Collections are streamed to Parquet or Arrow IPC files one record batch at a
+time and streamed back through the batch import, so archives of any size are
+handled in bounded memory. Each row holds the object's UUID, its properties,
+its references as UUID columns and, for memories, the vector as a fixed-size
+float32 list (all NaN for memories without a vector). Importing reuses the
+archived UUIDs, so an interrupted import can simply be repeated.
+
+Usage:
+    python -m eumas.database.archive export backup/
+    python -m eumas.database.archive import backup/ --batch-size 500
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+from weaviate.classes.query import QueryReference
+
+from eumas.database.connection import DatabaseConnection
+from eumas.database.cursor import iter_objects
+from eumas.database.ingest import BatchItem, IngestReport, StreamingIngestor
+from eumas.database.schema import (
+    MEMORY_CLASS,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    get_schema,
+)
+
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".ipc": "arrow", ".feather": "arrow"}
+VECTOR_COLUMN = "vector"
+UUID_COLUMN = "uuid"
+
+# Arrow types of the Weaviate data types used by the schema
+DATA_TYPES = {
+    "text": pa.string(),
+    "string": pa.string(),
+    "text[]": pa.list_(pa.string()),
+    "date": pa.timestamp("us", tz="UTC"),
+    "number": pa.float64(),
+    "int": pa.int64(),
+}
+
+
+class ArchiveReport:
+    """Outcome and throughput of one export."""
+
+    def __init__(self, collection: str, path: str) -> None:
+        self.collection = collection
+        self.path = path
+        self.rows = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Export throughput over the written rows."""
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the report as a plain dict, e.g. for logging."""
+        return {
+            "collection": self.collection,
+            "path": self.path,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def detect_format(path: str, file_format: Optional[str] = None) -> str:
+    """Get the archive format of a path.
+
+    Args:
+        path: Archive file path
+        file_format: Explicit "parquet" or "arrow", overriding the extension
+
+    Returns:
+        str: "parquet" or "arrow"
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if file_format is None:
+        file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format not in ("parquet", "arrow"):
+        raise ValueError(
+            f"Cannot tell the archive format of {path}; use one of {sorted(FORMATS)}"
+        )
+    return file_format
+
+
+def _class_schema(collection: str) -> Dict:
+    for class_schema in get_schema():
+        if class_schema["class"] == collection:
+            return class_schema
+    raise ValueError(f"Unknown collection: {collection}")
+
+
+def archive_schema(collection: str, dimensions: Optional[int] = None) -> pa.Schema:
+    """Build the Arrow schema of a collection's archive.
+
+    Args:
+        collection: MEMORY_CLASS or ARCHETYPE_MEMORY_RELATION_CLASS
+        dimensions: Vector length. None leaves out the vector column.
+
+    Returns:
+        pa.Schema: UUID, property and reference columns, then the vector
+    """
+    fields = [pa.field(UUID_COLUMN, pa.string(), nullable=False)]
+    for prop in _class_schema(collection)["properties"]:
+        data_type = prop["dataType"][0]
+        # References are archived as the UUID of the referenced object
+        fields.append(pa.field(prop["name"], DATA_TYPES.get(data_type, pa.string())))
+    if dimensions is not None:
+        fields.append(pa.field(VECTOR_COLUMN, pa.list_(pa.float32(), dimensions)))
+    return pa.schema(fields, metadata={"collection": collection})
+
+
+def _reference_names(collection: str) -> List[str]:
+    return [
+        prop["name"] for prop in _class_schema(collection)["properties"]
+        if prop["dataType"][0] not in DATA_TYPES
+    ]
+
+
+def _record_batch(rows: Sequence[Any], schema: pa.Schema, references: List[str]) -> pa.RecordBatch:
+    """Convert a chunk of v4 objects into one record batch."""
+    columns = []
+    for field in schema:
+        values: List[Any]
+        if field.name == UUID_COLUMN:
+            values = [str(obj.uuid) for obj in rows]
+        elif field.name == VECTOR_COLUMN:
+            columns.append(_vector_array(rows, field.type.list_size))
+            continue
+        elif field.name in references:
+            values = []
+            for obj in rows:
+                reference = (obj.references or {}).get(field.name)
+                values.append(str(reference.objects[0].uuid) if reference and reference.objects
+                              else None)
+        else:
+            values = [obj.properties.get(field.name) for obj in rows]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _vector_array(rows: Sequence[Any], dimensions: int) -> pa.FixedSizeListArray:
+    # Objects without a vector get a NaN row; Parquet readers reject null
+    # entries in fixed-size lists
+    matrix = np.full((len(rows), dimensions), np.nan, dtype=np.float32)
+    for i, obj in enumerate(rows):
+        vector = (obj.vector or {}).get("default")
+        if vector is not None:
+            matrix[i] = vector
+    return pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), dimensions)
+
+
+def _open_writer(path: str, schema: pa.Schema, file_format: str) -> Any:
+    if file_format == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_file(path, schema)
+
+
+def export_collection(
+    client: Any,
+    collection: str,
+    path: str,
+    file_format: Optional[str] = None,
+    batch_rows: int = 10000,
+    dimensions: Optional[int] = None,
+) -> ArchiveReport:
+    """Stream a collection into a Parquet or Arrow IPC file.
+
+    At most ``batch_rows`` objects are held in memory at a time.
+
+    Args:
+        client: A connected v4 ``weaviate.WeaviateClient``
+        collection: MEMORY_CLASS or ARCHETYPE_MEMORY_RELATION_CLASS
+        path: Output file; its extension selects the format
+        file_format: Explicit "parquet" or "arrow", overriding the extension
+        batch_rows: Rows per record batch and per page fetched
+        dimensions: Vector length of memories. Inferred from the first
+            vector when None.
+
+    Returns:
+        ArchiveReport: Rows and bytes written and throughput
+
+    Raises:
+        ValueError: If the format is unknown, or memory vectors do not start
+            within the first batch and dimensions is None
+    """
+    file_format = detect_format(path, file_format)
+    with_vectors = collection == MEMORY_CLASS
+    references = _reference_names(collection)
+    report = ArchiveReport(collection, path)
+    started = time.perf_counter()
+
+    objects = iter_objects(
+        client.collections.get(collection),
+        page_size=batch_rows,
+        include_vector=with_vectors,
+        return_references=[
+            QueryReference(link_on=name, return_properties=False) for name in references
+        ] or None,
+    )
+
+    writer = None
+    try:
+        for chunk in _chunks(objects, batch_rows):
+            if writer is None:
+                if with_vectors and dimensions is None:
+                    dimensions = _infer_dimensions(chunk)
+                schema = archive_schema(collection, dimensions if with_vectors else None)
+                writer = _open_writer(path, schema, file_format)
+            writer.write_batch(_record_batch(chunk, schema, references))
+            report.rows += len(chunk)
+            report.elapsed = time.perf_counter() - started
+            logger.info(f"{collection} export progress: {report.rows} rows")
+        if writer is None:
+            schema = archive_schema(collection, dimensions if with_vectors else None)
+            writer = _open_writer(path, schema, file_format)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    report.elapsed = time.perf_counter() - started
+    report.bytes = os.path.getsize(path)
+    logger.info(f"{collection} export finished: {report.as_dict()}")
+    return report
+
+
+def _chunks(objects: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for obj in objects:
+        chunk.append(obj)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _infer_dimensions(chunk: Sequence[Any]) -> int:
+    for obj in chunk:
+        vector = (obj.vector or {}).get("default")
+        if vector is not None:
+            return len(vector)
+    raise ValueError("No vectors in the first batch of memories; pass dimensions explicitly")
+
+
+def read_batches(
+    path: str,
+    file_format: Optional[str] = None,
+    batch_rows: int = 10000
+) -> Iterator[pa.RecordBatch]:
+    """Stream the record batches of an archive.
+
+    Arrow IPC files are memory-mapped; Parquet files are decoded
+    ``batch_rows`` rows at a time.
+
+    Args:
+        path: Archive file
+        file_format: Explicit "parquet" or "arrow", overriding the extension
+        batch_rows: Rows per batch when reading Parquet
+
+    Yields:
+        pa.RecordBatch: The archived rows
+    """
+    if detect_format(path, file_format) == "parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_rows)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def archive_collection(path: str, file_format: Optional[str] = None) -> str:
+    """Get the collection an archive was exported from."""
+    if detect_format(path, file_format) == "parquet":
+        metadata = pq.read_schema(path).metadata
+    else:
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata
+    collection: str = metadata[b"collection"].decode()
+    return collection
+
+
+def batch_items(batch: pa.RecordBatch, references: Sequence[str]) -> Iterator[BatchItem]:
+    """Convert an archived record batch back into batch import items.
+
+    Args:
+        batch: Record batch read from an archive
+        references: Names of the reference columns
+
+    Yields:
+        BatchItem: (uuid, properties, vector, references) per row
+    """
+    columns = {name: batch.column(name) for name in batch.schema.names}
+    uuids = columns.pop(UUID_COLUMN).to_pylist()
+
+    vectors: List[Optional[List[float]]] = [None] * batch.num_rows
+    vector_column = columns.pop(VECTOR_COLUMN, None)
+    if vector_column is not None:
+        dimensions = vector_column.type.list_size
+        values = vector_column.values.slice(
+            vector_column.offset * dimensions, batch.num_rows * dimensions
+        )
+        matrix = values.to_numpy(zero_copy_only=False).reshape(batch.num_rows, dimensions)
+        missing = np.isnan(matrix).all(axis=1)
+        vectors = [None if gap else row for row, gap in zip(matrix.tolist(), missing)]
+
+    refs = {name: columns.pop(name).to_pylist() for name in references if name in columns}
+    properties = {name: column.to_pylist() for name, column in columns.items()}
+
+    for i, uuid in enumerate(uuids):
+        row_properties = {
+            name: values[i] for name, values in properties.items() if values[i] is not None
+        }
+        row_references = {name: values[i] for name, values in refs.items() if values[i]}
+        yield uuid, row_properties, vectors[i], row_references or None
+
+
+def import_collection(
+    client: Any,
+    path: str,
+    file_format: Optional[str] = None,
+    start: int = 0,
+    batch_rows: int = 10000,
+    **options: Any
+) -> IngestReport:
+    """Stream an archive back into its collection through the batch import.
+
+    The collection must exist. Objects keep their archived UUIDs, so a
+    repeated import overwrites instead of duplicating.
+
+    Args:
+        client: A connected v4 ``weaviate.WeaviateClient``
+        path: Archive file written by ``export_collection``
+        file_format: Explicit "parquet" or "arrow", overriding the extension
+        start: Number of leading rows to skip when resuming an import
+        batch_rows: Rows decoded at a time
+        **options: ``StreamingIngestor`` settings such as batch_size,
+            max_errors or on_progress
+
+    Returns:
+        IngestReport: Counts, per-object failures and objects per second
+    """
+    collection = archive_collection(path, file_format)
+    references = _reference_names(collection)
+
+    def items() -> Iterator[BatchItem]:
+        skip = start
+        for batch in read_batches(path, file_format, batch_rows):
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            yield from batch_items(batch.slice(skip), references)
+            skip = 0
+
+    return StreamingIngestor(client, **options).ingest_items(collection, items(), skipped=start)
+
+
+def export_all(
+    client: Any,
+    directory: str,
+    file_format: str = "parquet",
+    **options: Any
+) -> List[ArchiveReport]:
+    """Export memories and relations into one file each.
+
+    Args:
+        client: A connected v4 ``weaviate.WeaviateClient``
+        directory: Output directory, created if missing
+        file_format: "parquet" or "arrow"
+        **options: ``export_collection`` settings such as batch_rows
+
+    Returns:
+        List[ArchiveReport]: One report per collection
+    """
+    os.makedirs(directory, exist_ok=True)
+    extension = ".parquet" if file_format == "parquet" else ".arrow"
+    return [
+        export_collection(client, collection, os.path.join(directory, collection + extension),
+                          **options)
+        for collection in (MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS)
+    ]
+
+
+def import_all(client: Any, directory: str, **options: Any) -> List[IngestReport]:
+    """Import the archives in a directory, memories before relations.
+
+    Args:
+        client: A connected v4 ``weaviate.WeaviateClient``
+        directory: Directory written by ``export_all``
+        **options: ``import_collection`` settings such as batch_size
+
+    Returns:
+        List[IngestReport]: One report per imported archive
+    """
+    reports = []
+    for collection in (MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS):
+        for extension in (".parquet", ".arrow"):
+            path = os.path.join(directory, collection + extension)
+            if os.path.exists(path):
+                reports.append(import_collection(client, path, **options))
+                break
+    return reports
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the archive command line."""
+    parser = argparse.ArgumentParser(description="Export or import EUMAS collections.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write both collections to a directory")
+    export_parser.add_argument("directory")
+    export_parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    export_parser.add_argument("--batch-rows", type=int, default=10000)
+    import_parser = commands.add_parser("import", help="load a directory written by export")
+    import_parser.add_argument("directory")
+    import_parser.add_argument("--batch-size", type=int, default=200)
+    import_parser.add_argument("--concurrent-requests", type=int, default=2)
+    import_parser.add_argument("--create-schema", action="store_true",
+                               help="create the collections first if missing")
+    args = parser.parse_args(argv)
+
+    with DatabaseConnection() as connection:
+        if args.command == "export":
+            reports = [r.as_dict() for r in export_all(
+                connection.client, args.directory, args.format, batch_rows=args.batch_rows
+            )]
+        else:
+            if args.create_schema:
+                connection.create_schema()
+            reports = [r.as_dict() for r in import_all(
+                connection.client,
+                args.directory,
+                batch_size=args.batch_size,
+                concurrent_requests=args.concurrent_requests
+            )]
+
+    for report in reports:
+        print(report)
+    return 1 if any(report.get("failed") for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+"""Asyncio memory operations with concurrent fan-out queries.
+
+``AsyncMemoryOperations`` mirrors ``MemoryOperations`` on the async v4 client,
+sharing its query builders so both return identical results. The fan-out
+helpers issue independent queries concurrently, so building the context for a
+turn costs the slowest round trip instead of the sum of all of them.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import weaviate
+from weaviate.classes.config import ConsistencyLevel
+from weaviate.classes.data import DataObject
+
+from eumas.database.compat import to_legacy_dicts
+from eumas.database.cursor import DEFAULT_PAGE_SIZE
+from eumas.database.ingest import memory_uuid, relation_uuid
+from eumas.database.network import (
+    NETWORK_FIELDS,
+    MemoryNetwork,
+    add_nodes,
+    network_level_query,
+    network_nodes_query,
+)
+from eumas.database.operations import (
+    MEMORY_FIELDS,
+    archetype_perspective_query,
+    attach_relations,
+    context_query,
+    significant_relations_query,
+    timerange_query,
+)
+from eumas.database.significance import (
+    chunk_ids,
+    evaluations_filter,
+    interaction_significance,
+    memories_query,
+    relation_projection,
+    significance_query,
+    significance_updates,
+)
+from eumas.database.schema import (
+    ArchetypeMemoryRelation,
+    Memory,
+    MEMORY_CLASS,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    ARCHETYPES,
+)
+from eumas.utils.errors import DatabaseError
+
+T = TypeVar("T")
+
+
+def merge_perspectives(perspectives: Dict[str, List[Dict]]) -> List[Dict]:
+    """Merge per-archetype perspective results into one entry per memory.
+
+    Args:
+        perspectives: Results of ``get_archetype_perspective`` keyed by archetype
+
+    Returns:
+        List[Dict]: Evaluated memories, strongest first, each with a
+            "perspectives" dict mapping archetype to its relation
+    """
+    merged: Dict[str, Dict] = {}
+    for archetype, relations in perspectives.items():
+        for relation in relations:
+            evaluated = relation.get("evaluatedMemory") or []
+            if not evaluated:
+                continue
+            memory = evaluated[0]
+            entry = merged.setdefault(
+                memory["_additional"]["id"], {**memory, "perspectives": {}}
+            )
+            entry["perspectives"][archetype] = {
+                key: value for key, value in relation.items() if key != "evaluatedMemory"
+            }
+
+    def strongest(entry: Dict) -> float:
+        return max(
+            (r.get("relationshipStrength") or 0.0 for r in entry["perspectives"].values()),
+            default=0.0
+        )
+
+    return sorted(merged.values(), key=strongest, reverse=True)
+
+
+class AsyncMemoryOperations:
+    """Handles memory storage and retrieval on the asyncio Weaviate client."""
+
+    def __init__(self, client: weaviate.WeaviateAsyncClient, max_concurrency: int = 8):
+        """Initialize with a connected async client.
+
+        Args:
+            client: Async client, e.g. from ``connection.connect_async()``
+            max_concurrency: Maximum queries in flight for the fan-out helpers
+        """
+        self.client = client
+        self.memories = client.collections.get(MEMORY_CLASS)
+        self.relations = client.collections.get(ARCHETYPE_MEMORY_RELATION_CLASS)
+        self.max_concurrency = max_concurrency
+        # Created in the running loop: on Python 3.9 a semaphore binds to the
+        # loop current at construction
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    async def _fetch_sorted(collection: Any, **query: Any) -> List[Any]:
+        """Fetch every result of a bounded query, see ``cursor.iter_sorted``."""
+        objects: List[Any] = []
+        while True:
+            page = await collection.query.fetch_objects(
+                offset=len(objects) or None, limit=DEFAULT_PAGE_SIZE, **query
+            )
+            objects.extend(page.objects)
+            if len(page.objects) < DEFAULT_PAGE_SIZE:
+                return objects
+
+    async def _limited(self, awaitable: Awaitable[T]) -> T:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await awaitable
+
+    @staticmethod
+    def _check_batch(response: Any, count: int) -> List[str]:
+        """Return the UUIDs of a batch insert in input order.
+
+        Raises:
+            DatabaseError: If any object failed
+        """
+        if response.has_errors:
+            raise DatabaseError(
+                f"{len(response.errors)} of {count} objects failed to import",
+                code="BATCH_FAILED",
+                details={
+                    "errors": {index: error.message for index, error in response.errors.items()}
+                },
+            )
+        return [str(response.uuids[index]) for index in range(count)]
+
+    async def store_memory(self, memory: Memory) -> str:
+        """Store a new memory in the database.
+
+        Args:
+            memory: Memory instance to store
+
+        Returns:
+            str: UUID of the stored memory
+        """
+        data = memory.to_weaviate_object()
+        return str(await self.memories.data.insert(
+            properties=data["properties"],
+            vector=data["vector"]
+        ))
+
+    async def store_memory_relation(self, relation: ArchetypeMemoryRelation) -> str:
+        """Store a new memory relation in the database.
+
+        Args:
+            relation: ArchetypeMemoryRelation instance to store
+
+        Returns:
+            str: UUID of the stored relation
+        """
+        data = relation.to_weaviate_object()
+        relation_id = str(await self.relations.data.insert(
+            properties=data["properties"],
+            references=data["references"]
+        ))
+        await self.refresh_significance([relation.evaluated_memory_id])
+        return relation_id
+
+    async def store_memories_batch(self, memories: Sequence[Memory]) -> List[str]:
+        """Store multiple memories in one gRPC batch request.
+
+        Args:
+            memories: Memory instances to store
+
+        Returns:
+            List[str]: UUIDs of the stored memories
+
+        Raises:
+            DatabaseError: If any memory failed to import
+        """
+        objects = []
+        for memory in memories:
+            data = memory.to_weaviate_object()
+            objects.append(DataObject(
+                properties=data["properties"],
+                uuid=memory_uuid(memory),
+                vector=data["vector"]
+            ))
+        response = await self.memories.data.insert_many(objects)
+        return self._check_batch(response, len(objects))
+
+    async def store_relations_batch(
+        self,
+        relations: Sequence[ArchetypeMemoryRelation]
+    ) -> List[str]:
+        """Store multiple memory relations in one gRPC batch request.
+
+        Args:
+            relations: ArchetypeMemoryRelation instances to store
+
+        Returns:
+            List[str]: UUIDs of the stored relations
+
+        Raises:
+            DatabaseError: If any relation failed to import
+        """
+        response = await self._insert_relations(relations)
+        await self.refresh_significance(relation.evaluated_memory_id for relation in relations)
+        return self._check_batch(response, len(relations))
+
+    async def _insert_relations(
+        self,
+        relations: Sequence[ArchetypeMemoryRelation],
+        consistency_level: Optional[ConsistencyLevel] = None
+    ) -> Any:
+        objects = []
+        for relation in relations:
+            data = relation.to_weaviate_object()
+            objects.append(DataObject(
+                properties=data["properties"],
+                uuid=relation_uuid(relation),
+                references=data["references"]
+            ))
+        collection = self.relations
+        if consistency_level is not None:
+            collection = collection.with_consistency_level(consistency_level)
+        return await collection.data.insert_many(objects)
+
+    async def store_evaluated_interaction(
+        self,
+        memory: Memory,
+        relations: Sequence[ArchetypeMemoryRelation],
+        consistency_level: Optional[ConsistencyLevel] = None
+    ) -> Tuple[str, List[str]]:
+        """Store a memory with its archetype relations in two round trips.
+
+        UUIDs are assigned up front, see
+        ``MemoryOperations.store_evaluated_interaction``. The relations are
+        sent once the memory is stored, so a failed memory write never leaves
+        relations pointing at a missing memory. If some objects fail,
+        repeating the call is safe and completes the write, since the UUIDs
+        are deterministic.
+
+        Args:
+            memory: The evaluated Memory
+            relations: Its archetype relations. Relations without an
+                evaluated memory ID are attached to ``memory``.
+            consistency_level: Replicas that must acknowledge the writes on a
+                replicated collection, e.g. ``ConsistencyLevel.QUORUM``
+
+        Returns:
+            Tuple[str, List[str]]: UUID of the memory and of each relation
+
+        Raises:
+            DatabaseError: If any object failed to store
+        """
+        memory_id = memory_uuid(memory)
+        for relation in relations:
+            if not relation.evaluated_memory_id:
+                relation.evaluated_memory_id = memory_id
+
+        data = memory.to_weaviate_object()
+        memories = self.memories
+        if consistency_level is not None:
+            memories = memories.with_consistency_level(consistency_level)
+        memory_response = await memories.data.insert_many([DataObject(
+            # The memory's significance is known from the relations in hand
+            properties={**data["properties"], **interaction_significance(memory_id, relations)},
+            uuid=memory_id,
+            vector=data["vector"]
+        )])
+        self._check_batch(memory_response, 1)
+
+        response = await self._insert_relations(relations, consistency_level)
+        # Only relations evaluating other, existing memories need a refresh
+        await self.refresh_significance(
+            relation.evaluated_memory_id for relation in relations
+            if relation.evaluated_memory_id != memory_id
+        )
+        return memory_id, self._check_batch(response, len(relations))
+
+    async def refresh_significance(self, memory_ids: Iterable[Optional[str]]) -> int:
+        """Recompute the significance properties of some memories.
+
+        See ``eumas.database.significance.refresh_significance``; the updates
+        of a chunk are sent concurrently.
+
+        Returns:
+            int: Number of memories updated
+        """
+        query, _ = relation_projection()
+        updated = 0
+        for chunk in chunk_ids(memory_id for memory_id in memory_ids if memory_id):
+            # A chunk's relations stay far below the server's offset limit
+            relations = await self._fetch_sorted(
+                self.relations, filters=evaluations_filter(chunk), **query
+            )
+            memories = await self.memories.query.fetch_objects(**memories_query(chunk))
+
+            updates = significance_updates(relations, memories.objects)
+            await asyncio.gather(*(
+                self._limited(self.memories.data.update(uuid=uuid, properties=properties))
+                for uuid, properties in updates
+            ))
+            updated += len(updates)
+        return updated
+
+    async def get_significant_memories(
+        self,
+        limit: int = 5,
+        min_relationship_strength: float = 0.0,
+        archetype_filter: Optional[str] = None
+    ) -> List[Dict]:
+        """Get the most significant memories, see ``MemoryOperations``."""
+        response = await self.memories.query.fetch_objects(**significance_query(
+            limit, min_relationship_strength, archetype_filter, MEMORY_FIELDS
+        ))
+        if not response.objects:
+            return []
+        relations = await self._fetch_sorted(self.relations, **significant_relations_query(
+            [str(memory.uuid) for memory in response.objects],
+            min_relationship_strength,
+            archetype_filter
+        ))
+        return attach_relations(response.objects, relations)
+
+    async def get_memory_network(
+        self,
+        memory_id: str,
+        max_depth: int = 2,
+        min_strength: float = 0.5,
+        max_nodes_per_level: int = 50,
+        fields: Sequence[str] = NETWORK_FIELDS
+    ) -> Optional[MemoryNetwork]:
+        """Traverse a memory's network breadth-first, see ``MemoryOperations``."""
+        if max_depth < 0 or max_nodes_per_level < 1:
+            raise ValueError("max_depth must be >= 0 and max_nodes_per_level >= 1")
+
+        network = MemoryNetwork(memory_id)
+        frontier = [memory_id]
+        for depth in range(1, max_depth + 1):
+            if not frontier:
+                break
+            relations = await self._fetch_sorted(
+                self.relations, **network_level_query(frontier, min_strength)
+            )
+            frontier = network.expand(relations, depth, max_nodes_per_level)
+
+        query, record = network_nodes_query(list(network.depths), fields)
+        response = await self.memories.query.fetch_objects(**query)
+        add_nodes(network, response.objects, record)
+        if memory_id not in network.nodes:
+            return None
+        return network
+
+    async def get_archetype_perspective(
+        self,
+        archetype: str,
+        context_tag: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict]:
+        """Get relationships from one archetype's perspective, see ``MemoryOperations``."""
+        response = await self.relations.query.fetch_objects(
+            **archetype_perspective_query(archetype, context_tag, limit)
+        )
+        return to_legacy_dicts(response.objects)
+
+    async def get_memories_by_timerange(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        limit: int = 100
+    ) -> List[Dict]:
+        """Get memories within a time range, see ``MemoryOperations``."""
+        response = await self.memories.query.fetch_objects(
+            **timerange_query(start_time, end_time, limit)
+        )
+        return to_legacy_dicts(response.objects)
+
+    async def get_memories_by_context(
+        self,
+        context_tags: List[str],
+        min_priority: float = 0.0,
+        limit: int = 100
+    ) -> List[Dict]:
+        """Get memories by context tags and priority, see ``MemoryOperations``."""
+        response = await self.memories.query.fetch_objects(
+            **context_query(context_tags, min_priority, limit)
+        )
+        return to_legacy_dicts(response.objects)
+
+    async def get_all_perspectives(
+        self,
+        context_tag: Optional[str] = None,
+        limit: int = 10,
+        archetypes: Optional[Sequence[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """Query several archetype perspectives concurrently.
+
+        Args:
+            context_tag: Optional context tag to filter memories
+            limit: Maximum number of relations per archetype
+            archetypes: Archetypes to query. Defaults to all of ARCHETYPES.
+
+        Returns:
+            Dict[str, List[Dict]]: Perspective results keyed by archetype
+        """
+        archetypes = list(archetypes or ARCHETYPES)
+        results = await asyncio.gather(*(
+            self._limited(self.get_archetype_perspective(archetype, context_tag, limit))
+            for archetype in archetypes
+        ))
+        return dict(zip(archetypes, results))
+
+    async def get_merged_perspectives(
+        self,
+        context_tag: Optional[str] = None,
+        limit: int = 10,
+        archetypes: Optional[Sequence[str]] = None
+    ) -> List[Dict]:
+        """Query perspectives concurrently and merge them per memory.
+
+        Returns:
+            List[Dict]: See ``merge_perspectives``
+        """
+        return merge_perspectives(await self.get_all_perspectives(context_tag, limit, archetypes))
+
+    async def build_turn_context(
+        self,
+        context_tags: List[str],
+        min_priority: float = 0.0,
+        limit: int = 10,
+        significant_limit: int = 5
+    ) -> Dict[str, List[Dict]]:
+        """Fetch everything needed to answer one turn in a single concurrent round.
+
+        Args:
+            context_tags: Context tags of the current turn
+            min_priority: Minimum memory priority for context matches
+            limit: Maximum results per context and perspective query
+            significant_limit: Maximum number of significant memories
+
+        Returns:
+            Dict[str, List[Dict]]: "context" memories, "significant" memories
+                and merged archetype "perspectives" for the first context tag
+        """
+        context, significant, perspectives = await asyncio.gather(
+            self._limited(self.get_memories_by_context(context_tags, min_priority, limit)),
+            self._limited(self.get_significant_memories(significant_limit)),
+            self.get_all_perspectives(context_tags[0] if context_tags else None, limit),
+        )
+        return {
+            "context": context,
+            "significant": significant,
+            "perspectives": merge_perspectives(perspectives)
+        }
@@ -0,0 +1,50 @@
+"""
+Compatibility helpers for code written against the v3 Weaviate client.
+
+``MemoryOperations`` queries through the v4 collections API, but its results
+keep the shape the v3 GraphQL responses had: a flat dict of properties,
+references as lists of nested objects and an ``_additional`` block holding the
+id and search metadata. Callers can migrate to the v4 objects at their own pace.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from weaviate.collections.classes.internal import Object
+
+# Search metadata copied into ``_additional`` when the query returned it
+ADDITIONAL_FIELDS = ("distance", "certainty", "score", "explain_score")
+
+
+def to_legacy_dict(obj: Object) -> Dict[str, Any]:
+    """Convert a v4 result object into a v3 GraphQL-style dict.
+
+    Args:
+        obj: Object returned by a v4 query or reference
+
+    Returns:
+        Dict[str, Any]: Properties, references and an ``_additional`` block
+    """
+    result: Dict[str, Any] = {
+        name: value.isoformat() if isinstance(value, datetime) else value
+        for name, value in (obj.properties or {}).items()
+    }
+    for name, reference in (obj.references or {}).items():
+        result[name] = to_legacy_dicts(reference.objects)
+
+    additional: Dict[str, Any] = {"id": str(obj.uuid)}
+    metadata = getattr(obj, "metadata", None)
+    for field in ADDITIONAL_FIELDS:
+        value = getattr(metadata, field, None)
+        if value is not None:
+            additional[field] = value
+    vector = getattr(obj, "vector", None)
+    if vector and "default" in vector:
+        additional["vector"] = vector["default"]
+    result["_additional"] = additional
+    return result
+
+
+def to_legacy_dicts(objects: Iterable[Object]) -> List[Dict[str, Any]]:
+    """Convert several v4 result objects, see ``to_legacy_dict``."""
+    return [to_legacy_dict(obj) for obj in objects]
@@ -0,0 +1,89 @@
+"""
+Vector compression profiles for the EUMAS HNSW indexes.
+
+Each profile maps to a Weaviate quantizer configuration. Compressed vectors are
+kept in memory for graph traversal while the original vectors stay on disk and
+are used to rescore the final candidates.
+"""
+
+from typing import Any, Dict, Optional
+
+# Supported compression profiles
+COMPRESSION_NONE = "none"
+COMPRESSION_PQ = "pq"
+COMPRESSION_BQ = "bq"
+COMPRESSION_SQ = "sq"
+COMPRESSION_PROFILES = [COMPRESSION_NONE, COMPRESSION_PQ, COMPRESSION_BQ, COMPRESSION_SQ]
+
+# Profiles Weaviate can enable on a collection that already holds data.
+# Binary quantization has to be configured when the collection is created.
+MIGRATABLE_PROFILES = [COMPRESSION_PQ, COMPRESSION_SQ]
+
+
+def get_compression_config(profile: Optional[str] = None, **options: Any) -> Dict[str, Any]:
+    """
+    Get the vectorIndexConfig entries enabling a compression profile.
+
+    Args:
+        profile: One of COMPRESSION_PROFILES. None or "none" disables compression.
+        **options: Overrides for the quantizer settings, e.g. ``segments`` for PQ
+            or ``rescoreLimit`` for BQ/SQ.
+
+    Returns:
+        Dict[str, Any]: Entries to merge into an HNSW vectorIndexConfig
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile is None or profile == COMPRESSION_NONE:
+        return {}
+    if profile not in COMPRESSION_PROFILES:
+        raise ValueError(f"Invalid compression profile: {profile}")
+
+    if profile == COMPRESSION_PQ:
+        # Rescoring against the uncompressed vectors is automatic for PQ
+        config: Dict[str, Any] = {
+            "enabled": True,
+            "segments": 0,  # 0 lets Weaviate pick a segment count for the dimension
+            "centroids": 256,
+            "trainingLimit": 100000,
+            "encoder": {"type": "kmeans", "distribution": "log-normal"},
+        }
+    elif profile == COMPRESSION_BQ:
+        config = {
+            "enabled": True,
+            "rescoreLimit": 200,
+            "cache": True,
+        }
+    else:
+        config = {
+            "enabled": True,
+            "rescoreLimit": 20,
+            "trainingLimit": 100000,
+            "cache": True,
+        }
+
+    config.update(options)
+    return {profile: config}
+
+
+def estimate_vector_bytes(profile: Optional[str], dimension: int, segments: int = 0) -> float:
+    """
+    Estimate the in-memory size of one vector under a compression profile.
+
+    Args:
+        profile: One of COMPRESSION_PROFILES
+        dimension: Vector dimension
+        segments: PQ segment count, 0 for Weaviate's default
+
+    Returns:
+        float: Bytes held in memory per vector, excluding the HNSW graph itself
+    """
+    if profile == COMPRESSION_PQ:
+        # One byte per segment with 256 centroids; the default is dimension / 4
+        return float(segments or max(1, dimension // 4))
+    if profile == COMPRESSION_BQ:
+        return dimension / 8.0
+    if profile == COMPRESSION_SQ:
+        return float(dimension)
+    return 4.0 * dimension
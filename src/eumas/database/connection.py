@@ -1,10 +1,25 @@
 """Database connection and schema management for EUMAS."""
 
+import warnings
+from typing import Any, Dict, Optional
+
 import weaviate
+from weaviate.classes.config import Reconfigure
+from weaviate.collections import Collection
+from weaviate.collections.batch.client import ClientBatchingContextManager
+from weaviate.collections.classes.config import PQEncoderDistribution, PQEncoderType
+from weaviate.config import AdditionalConfig
+from weaviate.connect import ConnectionParams
 from weaviate.exceptions import WeaviateBaseError
-from typing import Dict
 
 from eumas.config import Config
+from eumas.database.compression import (
+    COMPRESSION_NONE,
+    COMPRESSION_PQ,
+    COMPRESSION_PROFILES,
+    MIGRATABLE_PROFILES,
+    get_compression_config,
+)
 from eumas.database.schema import (
     get_memory_class_schema,
     get_archetype_memory_relation_schema,
@@ -13,21 +28,97 @@ from eumas.database.schema import (
 )
 
 
+async def connect_async(
+    url: Optional[str] = None,
+    grpc_port: Optional[int] = None,
+    additional_config: Optional[AdditionalConfig] = None
+) -> weaviate.WeaviateAsyncClient:
+    """Open an asyncio Weaviate client bound to the running event loop.
+
+    One client serves any number of concurrent tasks on its loop; close it
+    with ``await client.close()``.
+
+    Args:
+        url: Weaviate HTTP URL. Defaults to Config.WEAVIATE_URL.
+        grpc_port: Weaviate gRPC port. Defaults to Config.WEAVIATE_GRPC_PORT.
+        additional_config: Optional HTTP pool and timeout settings
+
+    Returns:
+        weaviate.WeaviateAsyncClient: A connected async client
+    """
+    client = weaviate.WeaviateAsyncClient(
+        connection_params=ConnectionParams.from_url(
+            url or Config.WEAVIATE_URL, grpc_port or Config.WEAVIATE_GRPC_PORT
+        ),
+        additional_config=additional_config
+    )
+    await client.connect()
+    return client
+
+
 class DatabaseConnection:
-    """Manages the connection to the Weaviate database."""
-
-    def __init__(self) -> None:
-        """Initialize the database connection."""
-        self.client = weaviate.Client(
-            url=Config.WEAVIATE_URL,
-            additional_headers={
-                "X-GraphQL-Introspection": "true"  # Enable GraphQL introspection
-            }
+    """Manages the connection to the Weaviate database.
+
+    Uses the v4 client, which talks gRPC for queries and batch imports and REST
+    for schema management.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        grpc_port: Optional[int] = None,
+        additional_config: Optional[AdditionalConfig] = None
+    ) -> None:
+        """Initialize the database connection.
+
+        Args:
+            url: Weaviate HTTP URL. Defaults to Config.WEAVIATE_URL.
+            grpc_port: Weaviate gRPC port. Defaults to Config.WEAVIATE_GRPC_PORT.
+            additional_config: Optional HTTP pool and timeout settings
+        """
+        self.url = url or Config.WEAVIATE_URL
+        self.client = weaviate.WeaviateClient(
+            connection_params=ConnectionParams.from_url(
+                self.url, grpc_port or Config.WEAVIATE_GRPC_PORT
+            ),
+            additional_config=additional_config
         )
+        self.client.connect()
+        self._legacy_client: Optional[weaviate.Client] = None
+
+    def close(self) -> None:
+        """Close the connection and release its HTTP and gRPC channels."""
+        self.client.close()
+        self._legacy_client = None
+
+    def __enter__(self) -> "DatabaseConnection":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def legacy_client(self) -> weaviate.Client:
+        """Get a v3 REST/GraphQL client for code not yet moved to the v4 API.
+
+        Deprecated: use ``client`` and the collections API instead.
+
+        Returns:
+            weaviate.Client: A lazily created v3 client for the same instance
+        """
+        warnings.warn(
+            "DatabaseConnection.legacy_client is deprecated; use the v4 collections API "
+            "on DatabaseConnection.client instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if self._legacy_client is None:
+            self._legacy_client = weaviate.Client(url=self.url)
+        return self._legacy_client
 
     def is_healthy(self) -> bool:
         """Check if the database connection is healthy.
-        
+
         Returns:
             bool: True if the connection is healthy, False otherwise.
         """
@@ -36,100 +127,182 @@ class DatabaseConnection:
         except WeaviateBaseError:
             return False
 
-    def create_schema(self) -> None:
+    def get_collection(self, name: str) -> Collection:
+        """Get a collection handle for queries and data operations.
+
+        Args:
+            name: Collection name, e.g. MEMORY_CLASS
+
+        Returns:
+            Collection: The v4 collection object
+        """
+        return self.client.collections.get(name)
+
+    def create_schema(
+        self,
+        compression: Optional[str] = None,
+        **compression_options: Any
+    ) -> None:
         """Create the EUMAS schema in Weaviate.
-        
+
+        Args:
+            compression: Optional compression profile for the Memory vector index
+            **compression_options: Overrides for the quantizer settings
+
         Raises:
             WeaviateBaseError: If schema creation fails.
         """
         # Create Memory class
-        if not self.client.schema.exists(MEMORY_CLASS):
-            self.client.schema.create_class(get_memory_class_schema())
+        if not self.client.collections.exists(MEMORY_CLASS):
+            self.client.collections.create_from_dict(
+                get_memory_class_schema(compression, **compression_options)
+            )
 
         # Create ArchetypeMemoryRelation class
-        if not self.client.schema.exists(ARCHETYPE_MEMORY_RELATION_CLASS):
-            self.client.schema.create_class(get_archetype_memory_relation_schema())
+        if not self.client.collections.exists(ARCHETYPE_MEMORY_RELATION_CLASS):
+            self.client.collections.create_from_dict(get_archetype_memory_relation_schema())
 
     def delete_schema(self) -> None:
         """Delete the EUMAS schema from Weaviate.
-        
+
         Note: Delete ArchetypeMemoryRelation first to handle reference constraints.
-        
+
         Raises:
             WeaviateBaseError: If schema deletion fails.
         """
-        if self.client.schema.exists(ARCHETYPE_MEMORY_RELATION_CLASS):
-            self.client.schema.delete_class(ARCHETYPE_MEMORY_RELATION_CLASS)
-        if self.client.schema.exists(MEMORY_CLASS):
-            self.client.schema.delete_class(MEMORY_CLASS)
+        if self.client.collections.exists(ARCHETYPE_MEMORY_RELATION_CLASS):
+            self.client.collections.delete(ARCHETYPE_MEMORY_RELATION_CLASS)
+        if self.client.collections.exists(MEMORY_CLASS):
+            self.client.collections.delete(MEMORY_CLASS)
 
     def reset_schema(self) -> None:
         """Reset the EUMAS schema in Weaviate.
-        
+
         This deletes the existing schema and creates a new one.
-        
+
         Raises:
             WeaviateBaseError: If schema reset fails.
         """
         self.delete_schema()
         self.create_schema()
-        
+
     def get_graphql_client(self):
         """Get the GraphQL client for complex graph queries.
-        
+
+        Deprecated: GraphQL queries go through the v3 ``legacy_client``; use the
+        collections API or ``client.graphql_raw_query`` instead.
+
         Returns:
             weaviate.gql.get.GetBuilder: GraphQL query builder
         """
-        return self.client.query.get
+        return self.legacy_client.query.get
 
     def validate_schema(self) -> bool:
         """Validate that the existing schema matches the expected configuration.
-        
+
         Returns:
             bool: True if schema is valid, False otherwise.
         """
         try:
             for class_name in [MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS]:
-                if not self.client.schema.exists(class_name):
+                if not self.client.collections.exists(class_name):
                     return False
-                
-                existing = self.client.schema.get(class_name)
-                expected = (get_memory_class_schema() if class_name == MEMORY_CLASS 
-                          else get_archetype_memory_relation_schema())
-                
+
+                existing = self.client.collections.export_config(class_name).to_dict()
+                expected = (get_memory_class_schema() if class_name == MEMORY_CLASS
+                            else get_archetype_memory_relation_schema())
+
                 # Compare core properties
                 existing_props = {p["name"]: p for p in existing["properties"]}
                 expected_props = {p["name"]: p for p in expected["properties"]}
-                
+
                 if set(existing_props.keys()) != set(expected_props.keys()):
                     return False
-                
+
+                # Filtered scans page on the creation time
+                if not existing.get("invertedIndexConfig", {}).get("indexTimestamps"):
+                    return False
+
             return True
         except WeaviateBaseError:
             return False
 
-    def get_batch_client(self, batch_size: int = 100) -> weaviate.batch.Batch:
-        """Get a batch client for efficient bulk operations.
-        
+    def get_batch_client(self, batch_size: int = 100) -> ClientBatchingContextManager:
+        """Get a batch client for efficient bulk operations over gRPC.
+
+        Use it as a context manager; objects are flushed on exit:
+        ``with connection.get_batch_client() as batch: batch.add_object(...)``.
+
         Args:
             batch_size: Number of objects to process in each batch
-            
+
         Returns:
-            weaviate.batch.Batch: Batch client for bulk operations
+            A fixed-size batch context for ``add_object`` / ``add_reference``
         """
-        return self.client.batch.configure(
-            batch_size=batch_size,
-            dynamic=True,
-            timeout_retries=3
-        )
+        return self.client.batch.fixed_size(batch_size=batch_size)
+
+    def enable_compression(self, profile: str, **compression_options: Any) -> None:
+        """Enable vector compression on the existing Memory collection.
+
+        Weaviate trains the quantizer on the stored vectors and compresses them
+        in place, so existing data does not need to be re-imported. Compression
+        cannot be disabled again afterwards.
+
+        Args:
+            profile: Compression profile, one of MIGRATABLE_PROFILES
+            **compression_options: Overrides for the quantizer settings
+
+        Raises:
+            ValueError: If the profile cannot be enabled on existing data. Binary
+                quantization requires re-creating the collection with
+                ``create_schema(compression="bq")`` and re-importing.
+            WeaviateBaseError: If the update fails.
+        """
+        if profile not in MIGRATABLE_PROFILES:
+            raise ValueError(
+                f"Compression profile {profile!r} cannot be enabled on an existing "
+                f"collection; supported profiles: {', '.join(MIGRATABLE_PROFILES)}"
+            )
+        settings = get_compression_config(profile, **compression_options)[profile]
+        # Each quantizer has its own config type, so build the index config per branch
+        quantizer = Reconfigure.VectorIndex.Quantizer
+        if profile == COMPRESSION_PQ:
+            vector_index = Reconfigure.VectorIndex.hnsw(quantizer=quantizer.pq(
+                centroids=settings.get("centroids"),
+                segments=settings.get("segments"),
+                training_limit=settings.get("trainingLimit"),
+                encoder_type=PQEncoderType(settings["encoder"]["type"]),
+                encoder_distribution=PQEncoderDistribution(settings["encoder"]["distribution"]),
+            ))
+        else:
+            vector_index = Reconfigure.VectorIndex.hnsw(quantizer=quantizer.sq(
+                rescore_limit=settings.get("rescoreLimit"),
+                training_limit=settings.get("trainingLimit"),
+            ))
+        self.get_collection(MEMORY_CLASS).config.update(vector_index_config=vector_index)
+
+    def get_compression_profile(self) -> str:
+        """Get the compression profile enabled on the Memory collection.
+
+        Returns:
+            str: The enabled profile, or "none"
+        """
+        config = self.client.collections.export_config(MEMORY_CLASS).to_dict()
+        index_config = config.get("vectorIndexConfig", {})
+        for profile in COMPRESSION_PROFILES:
+            if index_config.get(profile, {}).get("enabled"):
+                return profile
+        return COMPRESSION_NONE
 
     def get_schema_status(self) -> Dict[str, bool]:
         """Get the current status of schema classes.
-        
+
         Returns:
             Dict[str, bool]: Status of each schema class
         """
         return {
-            MEMORY_CLASS: self.client.schema.exists(MEMORY_CLASS),
-            ARCHETYPE_MEMORY_RELATION_CLASS: self.client.schema.exists(ARCHETYPE_MEMORY_RELATION_CLASS)
+            MEMORY_CLASS: self.client.collections.exists(MEMORY_CLASS),
+            ARCHETYPE_MEMORY_RELATION_CLASS: self.client.collections.exists(
+                ARCHETYPE_MEMORY_RELATION_CLASS
+            )
         }
@@ -0,0 +1,131 @@
+"""
+Constant-memory iteration over whole collections.
+
+Weaviate's ``after`` cursor walks a collection in UUID order but cannot be
+combined with filters, and offset paging is capped by the server's
+QUERY_MAXIMUM_RESULTS. ``iter_objects`` therefore uses the cursor for
+unfiltered scans and keyset pagination on the creation time for filtered
+ones. Only one page is held in memory at a time either way.
+
+``iter_sorted`` keeps a query's own sort order across pages with offset
+paging, for result sets the filter already bounds.
+"""
+
+from datetime import datetime
+from typing import Any, Iterator, Optional, Sequence
+
+from weaviate.classes.query import Filter, MetadataQuery, Sort
+from weaviate.collections.classes.internal import Object
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def iter_objects(
+    collection: Any,
+    filters: Optional[Any] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    return_properties: Optional[Sequence[str]] = None,
+    return_references: Optional[Any] = None,
+    include_vector: bool = False,
+) -> Iterator[Object]:
+    """Stream every object of a collection matching an optional filter.
+
+    Unfiltered scans follow the UUID cursor. Filtered scans are ordered by
+    creation time and resume each page from the last creation time seen;
+    objects sharing that timestamp are skipped by position, so the offset
+    never grows with the collection.
+
+    Args:
+        collection: A v4 collection handle
+        filters: Optional v4 filter
+        page_size: Objects fetched per request
+        return_properties: Properties to return. None returns all of them.
+        return_references: Optional ``QueryReference`` (or list) to resolve
+        include_vector: Whether to return the vectors
+
+    Yields:
+        Object: The matching objects, one page in memory at a time
+
+    Raises:
+        ValueError: If page_size is smaller than 1
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+
+    options = {
+        "limit": page_size,
+        "include_vector": include_vector,
+        "return_properties": return_properties,
+        "return_references": return_references,
+    }
+
+    if filters is None:
+        after = None
+        while True:
+            page = collection.query.fetch_objects(after=after, **options).objects
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1].uuid
+
+    boundary: Optional[datetime] = None
+    seen_at_boundary = 0
+    while True:
+        page_filters = filters
+        if boundary is not None:
+            page_filters = filters & Filter.by_creation_time().greater_or_equal(boundary)
+        page = collection.query.fetch_objects(
+            filters=page_filters,
+            offset=seen_at_boundary or None,
+            sort=Sort.by_creation_time().by_id(),
+            return_metadata=MetadataQuery(creation_time=True),
+            **options
+        ).objects
+
+        for obj in page:
+            created = obj.metadata.creation_time
+            if created == boundary:
+                seen_at_boundary += 1
+            else:
+                boundary, seen_at_boundary = created, 1
+            yield obj
+        if len(page) < page_size:
+            return
+
+
+def iter_sorted(
+    collection: Any,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    **query: Any
+) -> Iterator[Object]:
+    """Stream every result of a sorted query, one page at a time.
+
+    Offset paging preserves the query's sort, which the keyset scan of
+    ``iter_objects`` replaces by the creation time. The sort should end on a
+    unique key such as ``.by_id()`` so ties keep their order across pages.
+    Offsets are capped by the server's QUERY_MAXIMUM_RESULTS, so use it only
+    for filters matching a bounded number of objects.
+
+    Args:
+        collection: A v4 collection handle
+        page_size: Objects fetched per request
+        **query: Further ``fetch_objects`` arguments, without limit or offset
+
+    Yields:
+        Object: The matching objects in sort order
+
+    Raises:
+        ValueError: If page_size is smaller than 1
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+
+    offset = 0
+    while True:
+        page = collection.query.fetch_objects(
+            offset=offset or None, limit=page_size, **query
+        ).objects
+        yield from page
+        if len(page) < page_size:
+            return
+        offset += len(page)
@@ -0,0 +1,513 @@
+"""
+Time decay of memory priority.
+
+Older memories fade unless reinforced. A memory is reinforced whenever a later
+relation links to it as its ``relatedMemory``, i.e. a newer memory recalled it.
+Its ``memoryPriority`` is recomputed from the priority it was stored with
+(``basePriority``), its reinforcements and the time since it was stored or
+last reinforced:
+
+    priority = base * (1 + reinforcement_weight * ln(1 + reinforcements))
+                    * 0.5 ** (age / half_life)
+
+The half-life is scaled by the archetypes' ``*_decay_modifier`` values from
+``archetype_metadata.yaml``, averaged with the memory's per-archetype
+significance as weights, so emotionally significant memories (Ella-M, 1.5)
+fade slower than creative ones (Ella-D, 0.7).
+
+``run_decay`` streams memories in large pages and recomputes each page as
+NumPy columns. Only priorities that moved by at least ``threshold`` are
+written back. Given the time of the previous run it is incremental: only
+relations created since then are read, and memories whose priority is already
+below the threshold are skipped unless they were reinforced, since decay
+alone cannot move them by the threshold any more. Run it on a schedule:
+
+    python -m eumas.database.decay --state decay_state.json --workers 16
+
+A memory below the threshold whose half-life grew because it gained
+significance is not revisited by incremental runs; schedule an occasional
+full run (without ``--state``) to pick such memories up.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from collections import namedtuple
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import yaml
+from loguru import logger
+from weaviate.classes.config import DataType, Property
+from weaviate.classes.query import Filter
+from weaviate.collections.classes.internal import Object
+
+from eumas.config import Config
+from eumas.database.connection import DatabaseConnection
+from eumas.database.cursor import iter_objects
+from eumas.database.ingest import update_properties
+from eumas.database.records import project, record_type, to_record
+from eumas.database.schema import (
+    ARCHETYPES,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    BASE_PRIORITY_PROPERTY,
+    LAST_REINFORCED_PROPERTY,
+    MEMORY_CLASS,
+    REINFORCEMENT_COUNT_PROPERTY,
+    get_decay_properties,
+    significance_property,
+)
+from eumas.database.significance import chunk_ids
+
+DEFAULT_THRESHOLD = 0.01
+DEFAULT_HALF_LIFE_DAYS = 30.0
+DEFAULT_REINFORCEMENT_WEIGHT = 0.25
+
+# Memories per page; a page is one request and one vectorized recompute
+DECAY_PAGE_SIZE = 5000
+
+DECAY_MODIFIER_SUFFIX = "_decay_modifier"
+
+_DAY = 86400.0
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_WEIGHT_FIELDS = tuple(significance_property(archetype) for archetype in ARCHETYPES)
+DECAY_FIELDS = (
+    "timestamp",
+    "memoryPriority",
+    BASE_PRIORITY_PROPERTY,
+    REINFORCEMENT_COUNT_PROPERTY,
+    LAST_REINFORCED_PROPERTY,
+) + _WEIGHT_FIELDS
+
+# Reinforcement events per memory: row per UUID, event count and latest epoch seconds
+Reinforcements = namedtuple("Reinforcements", ["rows", "counts", "latest"])
+
+
+def load_decay_modifiers(path: Optional[str] = None) -> Dict[str, float]:
+    """Read the per-archetype decay modifiers from the archetype metadata.
+
+    Any ``prioritization`` entry ending in ``_decay_modifier`` counts, e.g.
+    Ella-D's ``creativity_decay_modifier``.
+
+    Args:
+        path: YAML file, ``Config.ARCHETYPE_METADATA_PATH`` by default
+
+    Returns:
+        Dict[str, float]: Modifier per archetype that defines one
+
+    Raises:
+        ValueError: If the file names an unknown archetype or a modifier is
+            not positive
+    """
+    with open(path or Config.ARCHETYPE_METADATA_PATH, encoding="utf-8") as stream:
+        metadata = yaml.safe_load(stream) or {}
+
+    modifiers = {}
+    for archetype in metadata.get("archetypes_metadata") or []:
+        name = archetype.get("name")
+        for rule in archetype.get("prioritization") or []:
+            for key, value in rule.items():
+                if not key.endswith(DECAY_MODIFIER_SUFFIX):
+                    continue
+                if name not in ARCHETYPES:
+                    raise ValueError(f"Invalid archetype: {name}")
+                if float(value) <= 0:
+                    raise ValueError(f"{key} of {name} must be positive, got {value}")
+                modifiers[name] = float(value)
+    return modifiers
+
+
+class DecayModel:
+    """Vectorized memory priority decay.
+
+    Attributes:
+        modifiers: Half-life multiplier per archetype, in ``ARCHETYPES`` order
+        half_life_days: Half-life of a memory without archetype weights
+        reinforcement_weight: Priority boost per log reinforcement
+    """
+
+    __slots__ = ("modifiers", "half_life_days", "reinforcement_weight")
+
+    def __init__(
+        self,
+        modifiers: Optional[Dict[str, float]] = None,
+        half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+        reinforcement_weight: float = DEFAULT_REINFORCEMENT_WEIGHT
+    ) -> None:
+        if half_life_days <= 0:
+            raise ValueError(f"half_life_days must be positive, got {half_life_days}")
+        if reinforcement_weight < 0:
+            raise ValueError(
+                f"reinforcement_weight must not be negative, got {reinforcement_weight}"
+            )
+        modifiers = modifiers or {}
+        self.modifiers = np.array([modifiers.get(archetype, 1.0) for archetype in ARCHETYPES])
+        self.half_life_days = half_life_days
+        self.reinforcement_weight = reinforcement_weight
+
+    @classmethod
+    def from_metadata(cls, path: Optional[str] = None, **kwargs: Any) -> "DecayModel":
+        """Create a model with the modifiers of an archetype metadata file."""
+        return cls(load_decay_modifiers(path), **kwargs)
+
+    def half_lives(self, weights: np.ndarray) -> np.ndarray:
+        """Get the half-life in seconds per memory.
+
+        Args:
+            weights: One row per memory and one non-negative weight per archetype
+
+        Returns:
+            np.ndarray: The base half-life scaled by the weighted mean modifier,
+                or by 1.0 for memories without weights
+        """
+        total = weights.sum(axis=1)
+        modifier = np.divide(
+            weights @ self.modifiers, total, out=np.ones(len(weights)), where=total > 0
+        )
+        return self.half_life_days * _DAY * modifier
+
+    def priorities(
+        self,
+        base: np.ndarray,
+        anchor: np.ndarray,
+        reinforcements: np.ndarray,
+        weights: np.ndarray,
+        now: float
+    ) -> np.ndarray:
+        """Compute the decayed priorities of a column of memories.
+
+        Args:
+            base: Priority before decay
+            anchor: Epoch seconds of storage or of the last reinforcement
+            reinforcements: Number of reinforcements
+            weights: Archetype weights, see ``half_lives``
+            now: Epoch seconds to decay to
+
+        Returns:
+            np.ndarray: Priorities in [0, 1]
+        """
+        age = np.maximum(now - anchor, 0.0)
+        boost = 1.0 + self.reinforcement_weight * np.log1p(reinforcements)
+        priority: np.ndarray = np.clip(
+            base * boost * np.exp2(-age / self.half_lives(weights)), 0.0, 1.0
+        )
+        return priority
+
+
+def reinforcement_projection() -> Tuple[Dict[str, Any], Type[Any]]:
+    """Build the relation projection reinforcements are read from.
+
+    Returns:
+        Tuple[Dict, Type[Any]]: Query arguments and the record class
+    """
+    query: Dict[str, Any] = {}
+    record = project(query, ("relatedMemory",), references=("relatedMemory",))
+    return query, record
+
+
+def reinforcement_filter(since: Optional[datetime], until: datetime) -> Any:
+    """Build the filter matching the relations created in [since, until).
+
+    Consecutive runs pass the previous ``until`` as ``since``, so their windows
+    never overlap and every relation is counted once.
+    """
+    return (
+        Filter.by_ref_count("relatedMemory").greater_than(0)
+        & Filter.by_creation_time().greater_or_equal(since or _EPOCH)
+        & Filter.by_creation_time().less_than(until)
+    )
+
+
+def collect_reinforcements(relations: Iterable[Object]) -> Reinforcements:
+    """Count the reinforcements per related memory.
+
+    Args:
+        relations: Relations with the fields of ``reinforcement_projection``
+            and their creation time
+
+    Returns:
+        Reinforcements: Count and latest time per reinforced memory
+    """
+    _, record = reinforcement_projection()
+    rows: Dict[str, int] = {}
+    memory, created = array("q"), array("d")
+    for relation in relations:
+        target = to_record(relation, record).relatedMemory
+        creation_time = relation.metadata.creation_time if relation.metadata else None
+        if target is None or creation_time is None:
+            continue
+        memory.append(rows.setdefault(target, len(rows)))
+        created.append(creation_time.timestamp())
+
+    index = np.frombuffer(memory, dtype=np.int64)
+    latest = np.full(len(rows), -np.inf)
+    np.maximum.at(latest, index, np.frombuffer(created, dtype=np.float64))
+    return Reinforcements(rows, np.bincount(index, minlength=len(rows)), latest)
+
+
+def _column(records: Sequence[Tuple], field: str) -> np.ndarray:
+    # None becomes NaN
+    return np.array([getattr(record, field) for record in records], dtype=np.float64)
+
+
+def _epochs(records: Sequence[Tuple], field: str) -> np.ndarray:
+    return np.array(
+        [value.timestamp() if value is not None else np.nan
+         for value in (getattr(record, field) for record in records)],
+        dtype=np.float64
+    )
+
+
+def decay_updates(
+    memories: Sequence[Object],
+    model: DecayModel,
+    reinforcements: Reinforcements,
+    now: float,
+    threshold: float = DEFAULT_THRESHOLD,
+    absolute: bool = False
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Recompute the priorities of a page of memories.
+
+    Args:
+        memories: Memories with the ``DECAY_FIELDS`` properties
+        model: The decay model
+        reinforcements: Reinforcements not yet stored on the memories
+        now: Epoch seconds to decay to
+        threshold: Smallest priority change worth writing
+        absolute: ``reinforcements`` is a full recount that replaces the
+            stored counts instead of adding to them
+
+    Returns:
+        List[Tuple[str, Dict]]: (uuid, changed properties) per memory to update
+    """
+    record = record_type(DECAY_FIELDS)
+    records = [to_record(memory, record) for memory in memories]
+    if not records:
+        return []
+
+    current = _column(records, "memoryPriority")
+    base = _column(records, BASE_PRIORITY_PROPERTY)
+    unbased = np.isnan(base)
+    base = np.nan_to_num(np.where(unbased, current, base))
+    stored_counts = np.nan_to_num(_column(records, REINFORCEMENT_COUNT_PROPERTY))
+    stored_last = _epochs(records, LAST_REINFORCED_PROPERTY)
+    weights = np.nan_to_num(np.column_stack([_column(records, field) for field in _WEIGHT_FIELDS]))
+
+    rows = np.array([reinforcements.rows.get(record.id, -1) for record in records])
+    reinforced = rows >= 0
+    if absolute:
+        counts = np.zeros(len(records))
+        last = np.full(len(records), np.nan)
+    else:
+        counts = stored_counts.copy()
+        last = stored_last.copy()
+    counts[reinforced] += reinforcements.counts[rows[reinforced]]
+    last[reinforced] = np.fmax(last[reinforced], reinforcements.latest[rows[reinforced]])
+    if absolute:
+        same_last = (last == stored_last) | (np.isnan(last) & np.isnan(stored_last))
+        recounted = (counts != stored_counts) | ~same_last
+    else:
+        recounted = reinforced
+
+    anchor = np.fmax(last, _epochs(records, "timestamp"))
+    anchor = np.where(np.isnan(anchor), now, anchor)
+    priority = model.priorities(base, anchor, counts, weights, now)
+
+    # NaN comparisons are False, so memories without a priority are written too
+    moved = ~(np.abs(priority - current) < threshold)
+    updates = []
+    for row in np.flatnonzero(moved | unbased | recounted):
+        properties: Dict[str, Any] = {"memoryPriority": float(priority[row])}
+        if unbased[row]:
+            properties[BASE_PRIORITY_PROPERTY] = float(base[row])
+        if recounted[row]:
+            properties[REINFORCEMENT_COUNT_PROPERTY] = int(counts[row])
+            properties[LAST_REINFORCED_PROPERTY] = (
+                None if np.isnan(last[row]) else datetime.fromtimestamp(last[row], timezone.utc)
+            )
+        updates.append((records[row].id, properties))
+    return updates
+
+
+def _pages(objects: Iterator[Object], size: int) -> Iterator[List[Object]]:
+    while True:
+        page = list(islice(objects, size))
+        if not page:
+            return
+        yield page
+
+
+def ensure_decay_properties(collection: Any) -> List[str]:
+    """Add the decay properties to a Memory collection created without them.
+
+    Args:
+        collection: The v4 Memory collection handle
+
+    Returns:
+        List[str]: Names of the added properties
+    """
+    data_types = {"number": DataType.NUMBER, "int": DataType.INT, "date": DataType.DATE}
+    existing = {prop.name for prop in collection.config.get().properties}
+    added = []
+    for prop in get_decay_properties():
+        if prop["name"] in existing:
+            continue
+        collection.config.add_property(Property(
+            name=prop["name"],
+            data_type=data_types[prop["dataType"][0]],
+            description=prop["description"]
+        ))
+        added.append(prop["name"])
+    return added
+
+
+def run_decay(
+    client: Any,
+    model: Optional[DecayModel] = None,
+    since: Optional[datetime] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    page_size: int = DECAY_PAGE_SIZE,
+    max_workers: int = 8,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Decay the priority of every memory that moved by the threshold.
+
+    Without ``since`` every relation and memory is scanned, which also sets
+    ``basePriority`` on memories stored before it existed and replaces the
+    stored reinforcement counts with the recount, so repeated full runs are
+    idempotent and also repair counts lost to failed updates. With the ``now``
+    of the previous run as ``since``, only relations created from ``since`` up
+    to ``now`` are read and only memories at or above the threshold, plus the
+    reinforced ones, are recomputed. Relations created during a run fall into
+    the next run's window. A memory below the threshold whose half-life grew
+    through new significance is only revisited by a full run. Priorities are
+    recomputed from ``basePriority`` rather than from their previous value, so
+    rounding never accumulates and a priority whose update failed is
+    corrected by the next run. Reinforcements whose update failed are lost.
+
+    Args:
+        client: A connected v4 ``weaviate.WeaviateClient``
+        model: The decay model, ``DecayModel.from_metadata()`` by default
+        since: Time of the previous run
+        threshold: Smallest priority change worth writing
+        page_size: Objects read per request and memories recomputed at once
+        max_workers: Concurrent update requests
+        now: Time to decay to, the current time by default
+
+    Returns:
+        Dict[str, Any]: Relations and memories scanned, memories reinforced,
+            updated and failed, "now" to pass as the next ``since``, and
+            elapsed seconds
+
+    Raises:
+        ValueError: If threshold is not positive
+    """
+    if threshold <= 0:
+        raise ValueError(f"threshold must be positive, got {threshold}")
+    started = time.perf_counter()
+    model = model or DecayModel.from_metadata()
+    now = now or datetime.now(timezone.utc)
+    memories = client.collections.get(MEMORY_CLASS)
+    relations = client.collections.get(ARCHETYPE_MEMORY_RELATION_CLASS)
+    added = ensure_decay_properties(memories)
+    if added:
+        logger.info(f"Added Memory properties {added}")
+
+    counts = {"relations": 0, "memories": 0}
+
+    def counted(objects: Iterable[Object], name: str) -> Iterator[Object]:
+        for obj in objects:
+            counts[name] += 1
+            yield obj
+
+    query, _ = reinforcement_projection()
+    reinforcements = collect_reinforcements(counted(iter_objects(
+        relations, filters=reinforcement_filter(since, now), page_size=page_size, **query
+    ), "relations"))
+    logger.info(
+        f"Scanned {counts['relations']} relations reinforcing {len(reinforcements.rows)} memories"
+    )
+
+    # Below the threshold, decay alone can no longer move a priority by it
+    filters = None if since is None else Filter.by_property("memoryPriority").greater_or_equal(
+        threshold
+    )
+    epoch = now.timestamp()
+
+    def updates() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        pending = set(reinforcements.rows)
+        scan = iter_objects(
+            memories, filters=filters, page_size=page_size, return_properties=list(DECAY_FIELDS)
+        )
+        for page in _pages(counted(scan, "memories"), page_size):
+            pending.difference_update(str(memory.uuid) for memory in page)
+            yield from decay_updates(
+                page, model, reinforcements, epoch, threshold, absolute=since is None
+            )
+
+        # Reinforced memories the filtered scan skipped
+        for chunk in chunk_ids(pending if filters is not None else (), page_size):
+            page = memories.query.fetch_objects(
+                filters=Filter.by_id().contains_any(chunk),
+                limit=len(chunk),
+                return_properties=list(DECAY_FIELDS)
+            ).objects
+            counts["memories"] += len(page)
+            yield from decay_updates(page, model, reinforcements, epoch, threshold)
+
+    report = update_properties(memories, updates(), max_workers=max_workers)
+    result = {
+        **counts,
+        "reinforced": len(reinforcements.rows),
+        "updated": report.imported,
+        "failed": len(report.failed),
+        "now": now.isoformat(),
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Memory decay finished: {result}")
+    return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the memory decay command line."""
+    parser = argparse.ArgumentParser(description="Decay Memory priorities.")
+    parser.add_argument(
+        "--state", help="JSON file keeping the time of the last run; omit for a full run"
+    )
+    parser.add_argument("--metadata", help="archetype metadata YAML")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--half-life-days", type=float, default=DEFAULT_HALF_LIFE_DAYS)
+    parser.add_argument("--page-size", type=int, default=DECAY_PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent update requests")
+    args = parser.parse_args(argv)
+
+    since = None
+    if args.state and os.path.exists(args.state):
+        with open(args.state, encoding="utf-8") as stream:
+            since = datetime.fromisoformat(json.load(stream)["last_run"])
+
+    model = DecayModel.from_metadata(args.metadata, half_life_days=args.half_life_days)
+    with DatabaseConnection() as connection:
+        result = run_decay(
+            connection.client,
+            model,
+            since=since,
+            threshold=args.threshold,
+            page_size=args.page_size,
+            max_workers=args.workers
+        )
+    if args.state:
+        with open(args.state, "w", encoding="utf-8") as stream:
+            json.dump({"last_run": result["now"]}, stream)
+    print(result)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,521 @@
+"""
+In-process index of the memory relation graph.
+
+``GraphIndex`` mirrors every ``evaluatedMemory -> relatedMemory`` edge of the
+ArchetypeMemoryRelation collection in NumPy arrays, so neighbourhood, cluster
+and PageRank questions run locally instead of as nested reference queries.
+Edges are kept as growable columns (source, target, strength, archetype and
+relationship type codes) and compressed into CSR form, by source and by
+target, the first time a query needs it after a change.
+
+The index is bootstrapped from a cursor scan, kept current by
+``MemoryOperations`` when it writes relations, and saved to and loaded from a
+``.npz`` file for fast restarts. Writes made by other processes are not seen
+until the index is rebuilt.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+from weaviate.collections.classes.internal import Object
+
+from eumas.database.cursor import DEFAULT_PAGE_SIZE, iter_objects
+from eumas.database.ingest import relation_uuid
+from eumas.database.records import project, to_record
+from eumas.database.schema import ArchetypeMemoryRelation, ARCHETYPES
+
+# CSRs to read per direction: by source (False) and/or by target (True)
+DIRECTIONS = {"out": (False,), "in": (True,), "both": (False, True)}
+
+
+class CSR(NamedTuple):
+    """Edges by source (or, for the reverse CSR, by target).
+
+    Row i's edges are indices[indptr[i]:indptr[i + 1]] with the matching
+    column values; ``edges`` holds each edge's position in the index's edge
+    columns.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    strength: np.ndarray
+    archetype: np.ndarray
+    relationship_type: np.ndarray
+    edges: np.ndarray
+
+
+_RELATION_FIELDS = (
+    "relationshipStrength", "archetype", "relationshipType", "evaluatedMemory", "relatedMemory"
+)
+
+
+class GraphIndex:
+    """NumPy CSR index of relation edges between memories."""
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize an empty index.
+
+        Args:
+            capacity: Initial number of edge slots; grows as needed
+        """
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._node: Dict[str, int] = {}
+        self._types: List[str] = []
+        self._type_code: Dict[str, int] = {}
+        self._relation_ids: List[Optional[str]] = []
+        self._edge: Dict[str, int] = {}
+
+        self._source = np.empty(capacity, dtype=np.int64)
+        self._target = np.empty(capacity, dtype=np.int64)
+        self._strength = np.empty(capacity, dtype=np.float64)
+        self._archetype = np.empty(capacity, dtype=np.int8)
+        self._type = np.empty(capacity, dtype=np.int16)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._size = 0
+
+        self._csr: Optional[CSR] = None
+        self._reverse: Optional[CSR] = None
+
+    @property
+    def node_count(self) -> int:
+        """Get the number of indexed memories."""
+        return len(self._ids)
+
+    @property
+    def edge_count(self) -> int:
+        """Get the number of indexed relations."""
+        return len(self._edge)
+
+    def _node_index(self, memory_id: str) -> int:
+        index = self._node.get(memory_id)
+        if index is None:
+            index = self._node[memory_id] = len(self._ids)
+            self._ids.append(memory_id)
+        return index
+
+    def _grow(self) -> None:
+        capacity = max(2 * len(self._alive), 1024)
+        for name in ("_source", "_target", "_strength", "_archetype", "_type", "_alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def add_edge(
+        self,
+        relation_id: str,
+        source: str,
+        target: Optional[str],
+        strength: Optional[float],
+        archetype: Optional[str] = None,
+        relationship_type: Optional[str] = None
+    ) -> bool:
+        """Add or replace the edge of one relation.
+
+        Args:
+            relation_id: UUID of the relation; writing it again replaces the edge
+            source: UUID of the evaluated memory
+            target: UUID of the related memory. Relations without one
+                evaluate a single memory and have no edge.
+            strength: Relationship strength, 0.0 when missing
+            archetype: Archetype that evaluated the relation
+            relationship_type: Free-text relationship type
+
+        Returns:
+            bool: Whether an edge was indexed
+        """
+        if not source or not target:
+            return False
+        with self._lock:
+            row = self._edge.get(relation_id)
+            if row is None:
+                if self._size == len(self._alive):
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._edge[relation_id] = row
+                self._relation_ids.append(relation_id)
+
+            if relationship_type is None:
+                type_code = -1
+            elif relationship_type in self._type_code:
+                type_code = self._type_code[relationship_type]
+            else:
+                type_code = self._type_code[relationship_type] = len(self._types)
+                self._types.append(relationship_type)
+
+            self._source[row] = self._node_index(source)
+            self._target[row] = self._node_index(target)
+            self._strength[row] = strength or 0.0
+            self._archetype[row] = ARCHETYPES.index(archetype) if archetype in ARCHETYPES else -1
+            self._type[row] = type_code
+            self._alive[row] = True
+            self._csr = self._reverse = None
+        return True
+
+    def add_relation(
+        self,
+        relation: ArchetypeMemoryRelation,
+        relation_id: Optional[str] = None
+    ) -> bool:
+        """Index a relation written by this process.
+
+        Args:
+            relation: The stored relation
+            relation_id: Its UUID; defaults to the deterministic batch UUID
+
+        Returns:
+            bool: Whether an edge was indexed
+        """
+        return self.add_edge(
+            relation_id or relation_uuid(relation),
+            relation.evaluated_memory_id,
+            relation.related_memory_id,
+            relation.relationship_strength,
+            relation.archetype,
+            relation.relationship_type,
+        )
+
+    def add_objects(self, relations: Iterable[Object]) -> int:
+        """Index relation objects read from Weaviate.
+
+        Args:
+            relations: Objects with the properties and references of
+                ``from_collection``'s scan
+
+        Returns:
+            int: Number of edges indexed
+        """
+        record = project({}, _RELATION_FIELDS, references=("evaluatedMemory", "relatedMemory"))
+        count = 0
+        for obj in relations:
+            values = to_record(obj, record)
+            count += self.add_edge(
+                values.id,
+                values.evaluatedMemory,
+                values.relatedMemory,
+                values.relationshipStrength,
+                values.archetype,
+                values.relationshipType,
+            )
+        return count
+
+    def remove_edge(self, relation_id: str) -> bool:
+        """Remove the edge of a relation.
+
+        Returns:
+            bool: Whether the relation was indexed
+        """
+        with self._lock:
+            row = self._edge.pop(relation_id, None)
+            if row is None:
+                return False
+            self._alive[row] = False
+            self._relation_ids[row] = None
+            self._csr = self._reverse = None
+        return True
+
+    @classmethod
+    def from_collection(cls, collection: Any, page_size: int = DEFAULT_PAGE_SIZE) -> "GraphIndex":
+        """Build an index from a cursor scan of the relation collection.
+
+        Args:
+            collection: The v4 ArchetypeMemoryRelation collection handle
+            page_size: Relations fetched per request
+
+        Returns:
+            GraphIndex: The populated index
+        """
+        query: Dict[str, Any] = {}
+        project(query, _RELATION_FIELDS, references=("evaluatedMemory", "relatedMemory"))
+        index = cls()
+        count = index.add_objects(iter_objects(collection, page_size=page_size, **query))
+        logger.info(f"Indexed {count} relation edges between {index.node_count} memories")
+        return index
+
+    def _build(self, by: np.ndarray, to: np.ndarray) -> CSR:
+        rows = np.flatnonzero(self._alive[:self._size])
+        order = rows[np.argsort(by[rows], kind="stable")]
+        indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(by[order], minlength=self.node_count), out=indptr[1:])
+        return CSR(
+            indptr, to[order], self._strength[order], self._archetype[order],
+            self._type[order], order,
+        )
+
+    def csr(self, reverse: bool = False) -> CSR:
+        """Get the edges in CSR form, rebuilt if the index changed.
+
+        Args:
+            reverse: Index edges by target instead of by source
+
+        Returns:
+            CSR: Read-only snapshot arrays; row i is the memory ``ids[i]``
+        """
+        with self._lock:
+            if self._csr is None or self._reverse is None:
+                self._csr = self._build(self._source, self._target)
+                self._reverse = self._build(self._target, self._source)
+            return self._reverse if reverse else self._csr
+
+    @property
+    def ids(self) -> List[str]:
+        """Get the memory UUID of each CSR row."""
+        return self._ids
+
+    @property
+    def relationship_types(self) -> Sequence[str]:
+        """Get the relationship type of each code in ``CSR.relationship_type``."""
+        return tuple(self._types)
+
+    def _direction_csrs(self, direction: str) -> List[CSR]:
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction {direction!r}, expected one of {list(DIRECTIONS)}")
+        return [self.csr(reverse) for reverse in DIRECTIONS[direction]]
+
+    def _snapshot(self, direction: str, memory_id: str) -> Tuple[List[CSR], Optional[int]]:
+        """Get the CSRs of a direction together with a memory's row.
+
+        Both are read under the lock, so a memory added concurrently is
+        either part of the snapshot or has no row in it (None).
+        """
+        with self._lock:
+            csrs = self._direction_csrs(direction)
+            node = self._node.get(memory_id)
+        if node is not None and node >= len(csrs[0].indptr) - 1:
+            node = None
+        return csrs, node
+
+    def _edge_mask(
+        self,
+        csr: CSR,
+        span: slice,
+        min_strength: float,
+        archetype: Optional[str]
+    ) -> np.ndarray:
+        mask: np.ndarray = csr.strength[span] >= min_strength
+        if archetype is not None:
+            mask &= csr.archetype[span] == ARCHETYPES.index(archetype)
+        return mask
+
+    def neighbors(
+        self,
+        memory_id: str,
+        direction: str = "out",
+        min_strength: float = 0.0,
+        archetype: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Get the memories connected to a memory, strongest first.
+
+        Args:
+            memory_id: UUID of the memory
+            direction: "out" for related memories, "in" for the memories
+                that relate to it, or "both"
+            min_strength: Minimum relationship strength
+            archetype: Only edges evaluated by this archetype
+
+        Returns:
+            List[Tuple[str, float]]: (memory UUID, strength) per edge
+
+        Raises:
+            ValueError: If direction is unknown
+        """
+        csrs, node = self._snapshot(direction, memory_id)
+        if node is None:
+            return []
+
+        target_parts, strength_parts = [], []
+        for csr in csrs:
+            span = slice(csr.indptr[node], csr.indptr[node + 1])
+            mask = self._edge_mask(csr, span, min_strength, archetype)
+            target_parts.append(csr.indices[span][mask])
+            strength_parts.append(csr.strength[span][mask])
+        targets, strengths = np.concatenate(target_parts), np.concatenate(strength_parts)
+        order = np.argsort(-strengths, kind="stable")
+        return [(self._ids[i], float(s)) for i, s in zip(targets[order], strengths[order])]
+
+    def strongest(
+        self,
+        memory_id: str,
+        k: int = 10,
+        direction: str = "both"
+    ) -> List[Tuple[str, float]]:
+        """Get the k strongest links of a memory, see ``neighbors``."""
+        return self.neighbors(memory_id, direction)[:k]
+
+    def traverse(
+        self,
+        memory_id: str,
+        max_depth: int = 2,
+        min_strength: float = 0.0,
+        direction: str = "both"
+    ) -> Dict[str, int]:
+        """Find the memories within a number of hops, breadth-first.
+
+        Args:
+            memory_id: UUID of the start memory
+            max_depth: Maximum number of hops
+            min_strength: Edges below this strength are not followed
+            direction: Edge direction to follow, see ``neighbors``
+
+        Raises:
+            ValueError: If direction is unknown
+
+        Returns:
+            Dict[str, int]: Hop distance per reached memory UUID, including
+                the start memory at 0. Empty if the memory has no edges.
+        """
+        csrs, start = self._snapshot(direction, memory_id)
+        if start is None:
+            return {}
+
+        depth = np.full(len(csrs[0].indptr) - 1, -1, dtype=np.int64)
+        depth[start] = 0
+        frontier = np.array([start])
+        for level in range(1, max_depth + 1):
+            reached = []
+            for csr in csrs:
+                starts, ends = csr.indptr[frontier], csr.indptr[frontier + 1]
+                # Edge positions of every frontier row, without a Python loop
+                lengths = ends - starts
+                positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+                positions += np.arange(lengths.sum())
+                keep = csr.strength[positions] >= min_strength
+                reached.append(csr.indices[positions[keep]])
+            frontier = np.unique(np.concatenate(reached))
+            frontier = frontier[depth[frontier] < 0]
+            if not len(frontier):
+                break
+            depth[frontier] = level
+        return {self._ids[i]: int(depth[i]) for i in np.flatnonzero(depth >= 0)}
+
+    def components(self, min_strength: float = 0.0) -> List[List[str]]:
+        """Find the connected clusters of memories, ignoring edge direction.
+
+        Args:
+            min_strength: Edges below this strength do not connect memories
+
+        Returns:
+            List[List[str]]: Memory UUIDs per cluster, largest cluster first.
+                Memories whose edges are all weaker form clusters of one.
+        """
+        csr = self.csr()
+        count = len(csr.indptr) - 1
+        source = np.repeat(np.arange(count), np.diff(csr.indptr))
+        keep = csr.strength >= min_strength
+        source, target = source[keep], csr.indices[keep]
+
+        # Propagate the smallest node index through each cluster
+        labels = np.arange(count)
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, source, labels[target])
+            np.minimum.at(labels, target, labels[source])
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                break
+
+        order = np.argsort(labels, kind="stable")
+        groups = np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+        groups.sort(key=len, reverse=True)
+        return [[self._ids[i] for i in group] for group in groups if len(group)]
+
+    def pagerank(
+        self,
+        damping: float = 0.85,
+        min_strength: float = 0.0,
+        archetype: Optional[str] = None,
+        weighted: bool = True,
+        tol: float = 1e-8,
+        max_iter: int = 100
+    ) -> Dict[str, float]:
+        """Score memories by PageRank over the relation edges.
+
+        A memory ranks high when strongly related memories point to it.
+        Memories without outgoing edges spread their rank uniformly.
+
+        Args:
+            damping: Probability of following an edge rather than jumping
+            min_strength: Ignore edges below this strength
+            archetype: Only edges evaluated by this archetype
+            weighted: Split a memory's rank by edge strength rather than evenly
+            tol: Stop once the L1 change of the ranks falls below this
+            max_iter: Maximum number of power iterations
+
+        Returns:
+            Dict[str, float]: Score per memory UUID, summing to 1
+        """
+        csr = self.csr()
+        count = len(csr.indptr) - 1
+        if not count:
+            return {}
+        source = np.repeat(np.arange(count), np.diff(csr.indptr))
+        keep = self._edge_mask(csr, slice(None), min_strength, archetype)
+        source, target = source[keep], csr.indices[keep]
+        weight = csr.strength[keep] if weighted else np.ones(len(source))
+
+        out_weight = np.bincount(source, weights=weight, minlength=count)
+        dangling = out_weight == 0
+        share = weight / np.where(dangling, 1.0, out_weight)[source]
+
+        rank = np.full(count, 1.0 / count)
+        for _ in range(max_iter):
+            spread = np.bincount(target, weights=rank[source] * share, minlength=count)
+            updated = (1 - damping) / count + damping * (spread + rank[dangling].sum() / count)
+            converged = np.abs(updated - rank).sum() < tol
+            rank = updated
+            if converged:
+                break
+        return dict(zip(self._ids, rank.tolist()))
+
+    def save(self, path: str) -> None:
+        """Write the index to an ``.npz`` file.
+
+        Args:
+            path: Target file
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            np.savez(
+                path,
+                ids=np.array(self._ids, dtype=str),
+                types=np.array(self._types, dtype=str),
+                relation_ids=np.array([self._relation_ids[row] for row in rows], dtype=str),
+                source=self._source[rows],
+                target=self._target[rows],
+                strength=self._strength[rows],
+                archetype=self._archetype[rows],
+                relationship_type=self._type[rows],
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "GraphIndex":
+        """Read an index written by ``save``.
+
+        Args:
+            path: Source file
+
+        Returns:
+            GraphIndex: The restored index
+        """
+        with np.load(path, allow_pickle=False) as data:
+            size = len(data["relation_ids"])
+            index = cls(capacity=max(size, 1024))
+            index._ids = data["ids"].tolist()
+            index._node = {memory_id: i for i, memory_id in enumerate(index._ids)}
+            index._types = data["types"].tolist()
+            index._type_code = {name: i for i, name in enumerate(index._types)}
+            relation_ids: List[str] = data["relation_ids"].tolist()
+            index._relation_ids = list(relation_ids)
+            index._edge = {relation_id: i for i, relation_id in enumerate(relation_ids)}
+            index._source[:size] = data["source"]
+            index._target[:size] = data["target"]
+            index._strength[:size] = data["strength"]
+            index._archetype[:size] = data["archetype"]
+            index._type[:size] = data["relationship_type"]
+            index._alive[:size] = True
+            index._size = size
+        return index
@@ -0,0 +1,307 @@
+"""
+Streaming batch ingestion for memories and relations.
+
+``StreamingIngestor`` consumes any iterable lazily and feeds the v4 gRPC
+batcher, which blocks once its buffer holds two batches. A slow server thus
+throttles the producer instead of letting the import grow in memory. Every
+object gets a deterministic UUID derived from its content, so re-running an
+interrupted import overwrites what was already written instead of duplicating it.
+"""
+
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from weaviate.util import generate_uuid5
+
+from eumas.database.schema import (
+    ArchetypeMemoryRelation,
+    Memory,
+    MEMORY_CLASS,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    ensure_utc,
+)
+
+# (uuid, properties, vector, references) for one batch object
+BatchItem = Tuple[str, Dict[str, Any], Optional[Sequence[float]], Optional[Dict[str, str]]]
+
+
+def memory_uuid(memory: Memory) -> str:
+    """Get the deterministic UUID of a memory.
+
+    The UUID is derived from the user, session, timestamp and exchanged texts,
+    which together identify one interaction.
+
+    Args:
+        memory: Memory instance
+
+    Returns:
+        str: A uuid5 string
+    """
+    identity = (
+        memory.user_id,
+        memory.session_id,
+        ensure_utc(memory.timestamp).isoformat(),
+        memory.user_prompt,
+        memory.agent_reply,
+    )
+    return generate_uuid5(identity, MEMORY_CLASS)
+
+
+def relation_uuid(relation: ArchetypeMemoryRelation) -> str:
+    """Get the deterministic UUID of a relation.
+
+    An archetype evaluates a memory, or a pair of memories, at most once, so
+    the archetype and the referenced memory IDs identify the relation.
+
+    Args:
+        relation: ArchetypeMemoryRelation instance
+
+    Returns:
+        str: A uuid5 string
+    """
+    identity = (relation.archetype, relation.evaluated_memory_id, relation.related_memory_id or "")
+    return generate_uuid5(identity, ARCHETYPE_MEMORY_RELATION_CLASS)
+
+
+def _memory_item(memory: Memory) -> BatchItem:
+    data = memory.to_weaviate_object()
+    return memory_uuid(memory), data["properties"], data["vector"], None
+
+
+def _relation_item(relation: ArchetypeMemoryRelation) -> BatchItem:
+    data = relation.to_weaviate_object()
+    return relation_uuid(relation), data["properties"], None, data["references"]
+
+
+class IngestReport:
+    """Outcome and throughput of one streaming import."""
+
+    def __init__(self, skipped: int = 0) -> None:
+        self.skipped = skipped
+        self.submitted = 0
+        self.failed: List[Dict[str, str]] = []
+        self.aborted = False
+        self.elapsed = 0.0
+
+    @property
+    def processed(self) -> int:
+        """Input items consumed, including skipped ones; pass as ``start`` to resume."""
+        return self.skipped + self.submitted
+
+    @property
+    def imported(self) -> int:
+        """Objects the server accepted."""
+        return self.submitted - len(self.failed)
+
+    @property
+    def objects_per_second(self) -> float:
+        """Import throughput over the submitted objects."""
+        return self.submitted / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the report as a plain dict, e.g. for logging."""
+        return {
+            "processed": self.processed,
+            "submitted": self.submitted,
+            "imported": self.imported,
+            "failed": len(self.failed),
+            "aborted": self.aborted,
+            "elapsed": round(self.elapsed, 3),
+            "objects_per_second": round(self.objects_per_second, 1),
+        }
+
+
+class StreamingIngestor:
+    """Imports memories and relations from iterators through the gRPC batcher."""
+
+    def __init__(
+        self,
+        client: Any,
+        batch_size: int = 200,
+        concurrent_requests: int = 2,
+        max_errors: Optional[int] = None,
+        progress_every: int = 10000,
+        on_progress: Optional[Callable[[IngestReport], None]] = None,
+    ) -> None:
+        """Initialize the ingestor.
+
+        Args:
+            client: A connected v4 ``weaviate.WeaviateClient``
+            batch_size: Objects per gRPC batch request
+            concurrent_requests: Batch requests in flight at once
+            max_errors: Stop reading input once more objects than this have
+                failed. None never stops early.
+            progress_every: Submitted objects between progress reports
+            on_progress: Called with the running report every ``progress_every``
+                objects, e.g. to persist ``report.processed`` as a checkpoint
+        """
+        self.client = client
+        self.batch_size = batch_size
+        self.concurrent_requests = concurrent_requests
+        self.max_errors = max_errors
+        self.progress_every = progress_every
+        self.on_progress = on_progress
+
+    def ingest_memories(self, memories: Iterable[Memory], start: int = 0) -> IngestReport:
+        """Import memories with deterministic UUIDs.
+
+        Args:
+            memories: Memories to import, consumed lazily
+            start: Number of leading items to skip when resuming an import
+
+        Returns:
+            IngestReport: Counts, failed objects and throughput
+        """
+        items = map(_memory_item, itertools.islice(memories, start, None))
+        return self.ingest_items(MEMORY_CLASS, items, skipped=start)
+
+    def ingest_relations(
+        self,
+        relations: Iterable[ArchetypeMemoryRelation],
+        start: int = 0
+    ) -> IngestReport:
+        """Import relations and their references with deterministic UUIDs.
+
+        Args:
+            relations: Relations to import, consumed lazily
+            start: Number of leading items to skip when resuming an import
+
+        Returns:
+            IngestReport: Counts, failed objects and throughput
+        """
+        items = map(_relation_item, itertools.islice(relations, start, None))
+        return self.ingest_items(ARCHETYPE_MEMORY_RELATION_CLASS, items, skipped=start)
+
+    def ingest_items(
+        self,
+        collection: str,
+        items: Iterable[BatchItem],
+        skipped: int = 0
+    ) -> IngestReport:
+        """Import prepared batch items into a collection.
+
+        Args:
+            collection: Name of the target collection
+            items: (uuid, properties, vector, references) tuples, consumed lazily
+            skipped: Input items the caller already skipped, counted in
+                ``report.processed``
+
+        Returns:
+            IngestReport: Counts, failed objects and throughput
+        """
+        report = IngestReport(skipped=skipped)
+        started = time.perf_counter()
+
+        with self.client.batch.fixed_size(
+            batch_size=self.batch_size,
+            concurrent_requests=self.concurrent_requests
+        ) as batch:
+            for uuid, properties, vector, references in items:
+                # Blocks while the batcher's buffer is full
+                batch.add_object(
+                    collection=collection,
+                    properties=properties,
+                    uuid=uuid,
+                    vector=vector,
+                    references=references
+                )
+                report.submitted += 1
+
+                if self.max_errors is not None and batch.number_errors > self.max_errors:
+                    report.aborted = True
+                    logger.error(
+                        f"Aborting {collection} import after {batch.number_errors} failed objects"
+                    )
+                    break
+                if report.submitted % self.progress_every == 0:
+                    report.elapsed = time.perf_counter() - started
+                    logger.info(f"{collection} import progress: {report.as_dict()}")
+                    if self.on_progress:
+                        self.on_progress(report)
+
+        report.elapsed = time.perf_counter() - started
+        report.failed = [
+            {"uuid": str(error.original_uuid or error.object_.uuid), "message": error.message}
+            for error in self.client.batch.failed_objects
+        ]
+        for error in report.failed[:10]:
+            logger.warning(f"Failed to import {collection} {error['uuid']}: {error['message']}")
+        logger.info(f"{collection} import finished: {report.as_dict()}")
+        return report
+
+
+def update_properties(
+    collection: Any,
+    updates: Iterable[Tuple[str, Dict[str, Any]]],
+    max_workers: int = 8,
+) -> IngestReport:
+    """Apply partial property updates to existing objects.
+
+    The batch API replaces whole objects, vectors included, so partial updates
+    are sent as individual PATCH requests, ``max_workers`` at a time. Updates
+    are consumed lazily and at most twice that many are in flight. With one
+    worker they are sent from the calling thread, without a thread pool.
+
+    Args:
+        collection: A v4 collection handle
+        updates: (uuid, properties) pairs with only the changed properties
+        max_workers: Concurrent update requests
+
+    Returns:
+        IngestReport: Submitted and failed updates and throughput
+    """
+    report = IngestReport()
+    started = time.perf_counter()
+    if max_workers <= 1:
+        _update_serially(collection, updates, report)
+    else:
+        _update_concurrently(collection, updates, report, max_workers)
+
+    report.elapsed = time.perf_counter() - started
+    for error in report.failed[:10]:
+        logger.warning(f"Failed to update {error['uuid']}: {error['message']}")
+    return report
+
+
+def _update_serially(
+    collection: Any,
+    updates: Iterable[Tuple[str, Dict[str, Any]]],
+    report: IngestReport
+) -> None:
+    for uuid, properties in updates:
+        report.submitted += 1
+        try:
+            collection.data.update(uuid=uuid, properties=properties)
+        except Exception as error:
+            report.failed.append({"uuid": str(uuid), "message": str(error)})
+
+
+def _update_concurrently(
+    collection: Any,
+    updates: Iterable[Tuple[str, Dict[str, Any]]],
+    report: IngestReport,
+    max_workers: int
+) -> None:
+    def update(uuid: str, properties: Dict[str, Any]) -> None:
+        collection.data.update(uuid=uuid, properties=properties)
+
+    def collect(done: Iterable[Future]) -> None:
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                report.failed.append({"uuid": pending.pop(future), "message": str(error)})
+            else:
+                pending.pop(future)
+
+    pending: Dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for uuid, properties in updates:
+            if len(pending) >= 2 * max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[executor.submit(update, uuid, properties)] = str(uuid)
+            report.submitted += 1
+        collect(wait(pending).done)
@@ -0,0 +1,176 @@
+"""
+Breadth-first traversal of the memory relation graph.
+
+``get_memory_network`` explores a memory's neighbourhood one depth level at a
+time. Each level costs one relation query covering the whole frontier, paged
+in strength order, and the visited memories are fetched together at the end,
+so a traversal of depth d takes d + 1 queries however many memories it
+reaches. The helpers here hold the traversal state shared by the sync and
+async operations.
+"""
+
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type
+
+from weaviate.classes.query import Filter, QueryReference, Sort
+from weaviate.collections.classes.internal import Object
+
+from eumas.database.records import project, to_record
+
+# Memory fields returned for network nodes unless the caller projects others
+NETWORK_FIELDS = ("userPrompt", "memoryPriority")
+
+# A relation from the evaluated memory (source) to the related memory (target)
+Edge = namedtuple("Edge", ["source", "target", "strength", "archetype", "relationship_type"])
+
+
+class MemoryNetwork:
+    """Nodes and edges reached from a root memory.
+
+    Attributes:
+        root: UUID of the root memory
+        depths: Hop distance from the root per memory UUID
+        nodes: Memory record per UUID, see ``eumas.database.records``
+        adjacency: Outgoing edges per source memory UUID
+    """
+
+    __slots__ = ("root", "depths", "nodes", "adjacency", "_relation_ids")
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.depths: Dict[str, int] = {root: 0}
+        self.nodes: Dict[str, Any] = {}
+        self.adjacency: Dict[str, List[Edge]] = {}
+        self._relation_ids: Set[str] = set()
+
+    @property
+    def edges(self) -> List[Edge]:
+        """Get every edge of the network."""
+        return [edge for edges in self.adjacency.values() for edge in edges]
+
+    def neighbors(self, memory_id: str) -> List[str]:
+        """Get the memories connected to a memory in either direction."""
+        outgoing = [edge.target for edge in self.adjacency.get(memory_id, [])]
+        incoming = [edge.source for edge in self.edges if edge.target == memory_id]
+        return outgoing + incoming
+
+    def expand(self, relations: Iterable[Object], depth: int, max_nodes: int) -> List[str]:
+        """Add one level of relations and return the newly reached memories.
+
+        Relations are taken in order, strongest first, so once ``max_nodes``
+        new memories have been reached, weaker edges to further new memories
+        are dropped. Edges between already visited memories are always kept,
+        but their ends are not expanded again.
+
+        Args:
+            relations: Relations touching the frontier, with both references
+            depth: Depth of the memories reached by this level
+            max_nodes: Maximum number of new memories for this level
+
+        Returns:
+            List[str]: UUIDs of the next frontier
+        """
+        frontier: List[str] = []
+        for relation in relations:
+            relation_id = str(relation.uuid)
+            source = _reference_id(relation, "evaluatedMemory")
+            target = _reference_id(relation, "relatedMemory")
+            if source is None or target is None or relation_id in self._relation_ids:
+                continue
+
+            new = [node for node in dict.fromkeys((source, target)) if node not in self.depths]
+            if len(frontier) + len(new) > max_nodes:
+                continue
+            for node in new:
+                self.depths[node] = depth
+                frontier.append(node)
+
+            self._relation_ids.add(relation_id)
+            self.adjacency.setdefault(source, []).append(Edge(
+                source,
+                target,
+                relation.properties.get("relationshipStrength"),
+                relation.properties.get("archetype"),
+                relation.properties.get("relationshipType"),
+            ))
+        return frontier
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the network as plain data, e.g. for JSON.
+
+        Returns:
+            Dict[str, Any]: "root", "nodes" mapping UUID to its depth and
+                fields, and "edges" as dicts
+        """
+        return {
+            "root": self.root,
+            "nodes": {
+                node: {
+                    "depth": depth,
+                    **{
+                        key: value for key, value in self.nodes[node]._asdict().items()
+                        if key != "id"
+                    }
+                } if node in self.nodes else {"depth": depth}
+                for node, depth in self.depths.items()
+            },
+            "edges": [edge._asdict() for edge in self.edges],
+        }
+
+
+def _reference_id(obj: Object, name: str) -> Optional[str]:
+    reference = obj.references.get(name) if obj.references else None
+    if reference is None or not reference.objects:
+        return None
+    return str(reference.objects[0].uuid)
+
+
+def network_level_query(frontier: Sequence[str], min_strength: float) -> Dict[str, Any]:
+    """Build the relation query of one traversal level.
+
+    A memory pair can have any number of relations, so the query has no
+    limit; page through it with ``iter_sorted`` to keep the strength order.
+
+    Args:
+        frontier: UUIDs of the memories to expand
+        min_strength: Minimum relationship strength of an edge
+
+    Returns:
+        Dict[str, Any]: ``fetch_objects`` arguments without limit
+    """
+    frontier = list(frontier)
+    touches_frontier = (
+        Filter.by_ref("evaluatedMemory").by_id().contains_any(frontier)
+        | Filter.by_ref("relatedMemory").by_id().contains_any(frontier)
+    )
+    return {
+        "filters": (
+            touches_frontier
+            & Filter.by_property("relationshipStrength").greater_or_equal(min_strength)
+        ),
+        "sort": Sort.by_property("relationshipStrength", ascending=False).by_id(),
+        "return_properties": ["relationshipStrength", "archetype", "relationshipType"],
+        "return_references": [
+            QueryReference(link_on="evaluatedMemory", return_properties=False),
+            QueryReference(link_on="relatedMemory", return_properties=False),
+        ],
+    }
+
+
+def network_nodes_query(node_ids: Sequence[str], fields: Sequence[str]) -> Tuple[Dict, Type[Any]]:
+    """Build the memory query fetching the nodes of a network.
+
+    Returns:
+        Tuple[Dict, Type[Any]]: ``fetch_objects`` arguments and the record class
+    """
+    query: Dict[str, Any] = {
+        "filters": Filter.by_id().contains_any(list(node_ids)),
+        "limit": len(node_ids),
+    }
+    return query, project(query, fields)
+
+
+def add_nodes(network: MemoryNetwork, memories: Iterable[Object], record: Type[Any]) -> None:
+    """Store fetched memories as network nodes."""
+    for memory in memories:
+        network.nodes[str(memory.uuid)] = to_record(memory, record)
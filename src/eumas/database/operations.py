@@ -1,382 +1,1108 @@
 """Database operations for EUMAS, including graph queries and memory analysis."""
 
-from typing import Dict, List, Optional, Tuple
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type, TypeVar,
+    Union, cast
+)
 from datetime import datetime
 
 import weaviate
-from weaviate.gql.get import GetBuilder
+from weaviate.classes.config import ConsistencyLevel
+from weaviate.classes.query import Filter, HybridFusion, MetadataQuery, QueryReference, Sort
+from weaviate.collections.classes.filters import _Filters
+from weaviate.collections.classes.internal import Object
 
+from eumas.database.compat import to_legacy_dict, to_legacy_dicts
+from eumas.database.connection import DatabaseConnection
+from eumas.database.cursor import DEFAULT_PAGE_SIZE, iter_objects, iter_sorted
+from eumas.database.graph_index import GraphIndex
+from eumas.database.ingest import IngestReport, StreamingIngestor, memory_uuid, relation_uuid
+from eumas.database.network import (
+    NETWORK_FIELDS,
+    MemoryNetwork,
+    add_nodes,
+    network_level_query,
+    network_nodes_query,
+)
+from eumas.database.records import project, to_record, to_records
+from eumas.database.significance import (
+    evaluations_filter,
+    interaction_significance,
+    refresh_significance,
+    significance_column,
+    significance_query,
+)
+from eumas.database.query_cache import (
+    QueryCache,
+    Scope,
+    make_key,
+    memory_write_scope,
+    relation_write_scope,
+)
+from eumas.embeddings.generator import EmbeddingGenerator
 from eumas.database.schema import (
     Memory,
     ArchetypeMemoryRelation,
     MEMORY_CLASS,
     ARCHETYPE_MEMORY_RELATION_CLASS,
     ARCHETYPES,
+    SIGNIFICANCE_ARCHETYPE_PROPERTY,
+    ensure_utc,
 )
+from eumas.utils.errors import DatabaseError
+
+T = TypeVar("T")
+
+# Fields returned for memories and relations unless a query needs others
+MEMORY_FIELDS = ["userPrompt", "agentReply", "contextTags", "timestamp", "memoryPriority"]
+SEARCH_FIELDS = ["userPrompt", "agentReply", "timestamp"]
+# Properties searched by the keyword half of hybrid search, with their boosts
+HYBRID_PROPERTIES = {"userPrompt": 1.0, "agentReply": 1.0, "contextTags": 1.0}
+FUSION_TYPES = {"ranked": HybridFusion.RANKED, "relative_score": HybridFusion.RELATIVE_SCORE}
+RELATION_FIELDS = [
+    "relationshipStrength",
+    "relationshipType",
+    "archetype",
+    "archetypePriority",
+    "spokenAnnotation",
+]
+
+
+# Query builders shared by MemoryOperations and AsyncMemoryOperations. Each
+# returns the keyword arguments for one ``query.fetch_objects`` call.
+
+
+def significant_relations_query(
+    memory_ids: Sequence[str],
+    min_relationship_strength: float,
+    archetype_filter: Optional[str]
+) -> Dict[str, Any]:
+    """Build the query for the matching relations of ranked significant memories.
+
+    A memory can have any number of relations per archetype, so the query has
+    no limit; page through it with ``iter_sorted``.
+    """
+    filters = evaluations_filter(memory_ids) & Filter.by_property(
+        "relationshipStrength"
+    ).greater_than(min_relationship_strength)
+    if archetype_filter:
+        filters = filters & Filter.by_property("archetype").equal(archetype_filter)
+
+    return {
+        "filters": filters,
+        "sort": Sort.by_property("relationshipStrength", ascending=False).by_id(),
+        "return_properties": RELATION_FIELDS,
+        "return_references": QueryReference(link_on="evaluatedMemory", return_properties=False),
+    }
+
+
+def attach_relations(memories: Iterable[Object], relations: Iterable[Object]) -> List[Dict]:
+    """Attach relations, in their order, to the memories they evaluate.
+
+    Args:
+        memories: Memories in result order
+        relations: Relations returned with their evaluatedMemory reference
+
+    Returns:
+        List[Dict]: Memories with their relations under "relations"
+    """
+    results = {str(memory.uuid): {**to_legacy_dict(memory), "relations": []} for memory in memories}
+    for relation in relations:
+        evaluated = relation.references.get("evaluatedMemory") if relation.references else None
+        if evaluated is None or not evaluated.objects:
+            continue
+        memory = results.get(str(evaluated.objects[0].uuid))
+        if memory is not None:
+            memory["relations"].append(to_legacy_dict(relation))
+    return list(results.values())
+
+
+def significance_record(
+    memory: Object,
+    record: Type[Any],
+    column: str,
+    archetype_filter: Optional[str]
+) -> Any:
+    """Build the record of a ranked memory.
+
+    relationshipStrength and archetype describe the memory's strongest matching
+    relation and are read from its significance properties.
+    """
+    values = to_record(memory, record)._asdict()
+    if "relationshipStrength" in values:
+        values["relationshipStrength"] = memory.properties.get(column)
+    if "archetype" in values:
+        values["archetype"] = archetype_filter or memory.properties.get(
+            SIGNIFICANCE_ARCHETYPE_PROPERTY
+        )
+    return record(**values)
+
+
+def archetype_perspective_query(
+    archetype: str,
+    context_tag: Optional[str],
+    limit: int
+) -> Dict[str, Any]:
+    """Build the relation query behind ``get_archetype_perspective``."""
+    if archetype not in ARCHETYPES:
+        raise ValueError(f"Invalid archetype: {archetype}")
+
+    filters = Filter.by_property("archetype").equal(archetype)
+    if context_tag:
+        filters = filters & Filter.by_ref("evaluatedMemory").by_property(
+            "contextTags"
+        ).contains_any([context_tag])
+
+    memory_fields = ["userPrompt", "contextTags", "timestamp"]
+    return {
+        "filters": filters,
+        "limit": limit,
+        "return_properties": [
+            "relationshipStrength",
+            "relationshipType",
+            "spokenAnnotation",
+            "archetypePriority"
+        ],
+        "return_references": [
+            QueryReference(link_on="evaluatedMemory", return_properties=memory_fields),
+            QueryReference(link_on="relatedMemory", return_properties=memory_fields)
+        ]
+    }
+
+
+def timerange_filter(start_time: datetime, end_time: datetime) -> _Filters:
+    """Build the memory filter for timestamps between two datetimes, inclusive."""
+    return (
+        Filter.by_property("timestamp").greater_or_equal(ensure_utc(start_time))
+        & Filter.by_property("timestamp").less_or_equal(ensure_utc(end_time))
+    )
+
+
+def context_filter(context_tags: List[str], min_priority: float) -> _Filters:
+    """Build the memory filter for context tags and a minimum priority."""
+    return (
+        Filter.by_property("contextTags").contains_any(context_tags)
+        & Filter.by_property("memoryPriority").greater_or_equal(min_priority)
+    )
+
+
+def timerange_query(start_time: datetime, end_time: datetime, limit: int) -> Dict[str, Any]:
+    """Build the memory query behind ``get_memories_by_timerange``."""
+    return {
+        "filters": timerange_filter(start_time, end_time),
+        "limit": limit,
+        "return_properties": MEMORY_FIELDS
+    }
+
+
+def context_query(context_tags: List[str], min_priority: float, limit: int) -> Dict[str, Any]:
+    """Build the memory query behind ``get_memories_by_context``."""
+    return {
+        "filters": context_filter(context_tags, min_priority),
+        "limit": limit,
+        "return_properties": MEMORY_FIELDS
+    }
+
+
+def memory_filter(
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    filters: Optional[_Filters] = None
+) -> Optional[_Filters]:
+    """Combine the optional memory filters of a search, None if there are none."""
+    conditions = [] if filters is None else [filters]
+    if user_id is not None:
+        conditions.append(Filter.by_property("userId").equal(user_id))
+    if session_id is not None:
+        conditions.append(Filter.by_property("sessionId").equal(session_id))
+    if start_time is not None:
+        conditions.append(Filter.by_property("timestamp").greater_or_equal(ensure_utc(start_time)))
+    if end_time is not None:
+        conditions.append(Filter.by_property("timestamp").less_or_equal(ensure_utc(end_time)))
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else Filter.all_of(conditions)
+
+
+def similar_memories_query(
+    k: int,
+    filters: Optional[_Filters],
+    distance: Optional[float],
+    certainty: Optional[float],
+    ef: Optional[int],
+    return_properties: Sequence[str]
+) -> Dict[str, Any]:
+    """Build the near-vector arguments behind ``search_similar``.
+
+    HNSW searches with ``max(ef, limit)`` candidates and ef is a collection
+    setting, so a per-call ef is applied by raising the limit to it. The caller
+    trims the result back to k.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    if distance is not None and certainty is not None:
+        raise ValueError("Pass either distance or certainty, not both")
+    return {
+        "limit": max(k, ef or 0),
+        "filters": filters,
+        "distance": distance,
+        "certainty": certainty,
+        "return_properties": list(return_properties),
+        "return_metadata": MetadataQuery(distance=True, certainty=certainty is not None)
+    }
+
+
+def hybrid_memories_query(
+    k: int,
+    alpha: float,
+    fusion_type: Union[str, HybridFusion],
+    boosts: Optional[Dict[str, float]],
+    filters: Optional[_Filters],
+    max_vector_distance: Optional[float],
+    return_properties: Sequence[str]
+) -> Dict[str, Any]:
+    """Build the hybrid search arguments behind ``search_hybrid``, except query and vector."""
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    if not 0.0 <= alpha <= 1.0:
+        raise ValueError(f"alpha must be between 0 and 1, got {alpha}")
+    if isinstance(fusion_type, str):
+        if fusion_type not in FUSION_TYPES:
+            raise ValueError(f"Invalid fusion type: {fusion_type}")
+        fusion_type = FUSION_TYPES[fusion_type]
+
+    weights = {**HYBRID_PROPERTIES, **(boosts or {})}
+    return {
+        "alpha": alpha,
+        "fusion_type": fusion_type,
+        "query_properties": [
+            name if weight == 1 else f"{name}^{weight:g}" for name, weight in weights.items()
+        ],
+        "max_vector_distance": max_vector_distance,
+        "limit": k,
+        "filters": filters,
+        "return_properties": list(return_properties),
+        "return_metadata": MetadataQuery(score=True, explain_score=True)
+    }
+
+
+def _fields_key(fields: Optional[Sequence[str]]) -> Optional[str]:
+    # Projections are ordered, so they must not be normalized like tag lists
+    return None if fields is None else ",".join(fields)
 
 
 class MemoryOperations:
-    """Handles memory storage and retrieval operations."""
+    """Handles memory storage and retrieval operations.
+
+    Searches and batch imports run over gRPC through the v4 collections API.
+    Query results keep the v3 GraphQL dict shape, see ``eumas.database.compat``.
+    With a ``QueryCache``, the context, time range, significance and
+    perspective queries are read through it, and every write made through
+    this instance invalidates the cached results it affects.
+    """
+
+    def __init__(
+        self,
+        client: Union[weaviate.WeaviateClient, DatabaseConnection],
+        embedder: Optional[EmbeddingGenerator] = None,
+        cache: Optional[QueryCache] = None,
+        graph: Optional[GraphIndex] = None
+    ):
+        """Initialize with a Weaviate client.
+
+        Args:
+            client: A connected v4 client or a DatabaseConnection
+            embedder: Embeds text queries of ``search_similar``. Created on
+                first use when None.
+            cache: Optional cache for repeated queries. Cached results are
+                shared and must not be mutated.
+            graph: Optional local relation graph, updated with every relation
+                this instance stores
 
-    def __init__(self, client: weaviate.Client):
-        """Initialize with a Weaviate client."""
+        Raises:
+            TypeError: If given a v3 ``weaviate.Client``
+        """
+        if isinstance(client, DatabaseConnection):
+            client = client.client
+        # Excluded by the annotation, but callers migrating from v3 still pass one
+        if isinstance(client, weaviate.Client):  # type: ignore[unreachable]
+            raise TypeError(
+                "MemoryOperations requires a v4 weaviate.WeaviateClient; "
+                "pass DatabaseConnection().client instead of a v3 weaviate.Client"
+            )
         self.client = client
-        self.graphql = client.query.get
+        self.memories = client.collections.get(MEMORY_CLASS)
+        self.relations = client.collections.get(ARCHETYPE_MEMORY_RELATION_CLASS)
+        self._embedder = embedder
+        self.cache = cache
+        self.graph = graph
+
+    @property
+    def embedder(self) -> EmbeddingGenerator:
+        """Get the embedding generator used for text queries."""
+        if self._embedder is None:
+            self._embedder = EmbeddingGenerator()
+        return self._embedder
+
+    def _embed_query(self, text: str) -> List[float]:
+        # A single text embeds to a single float list
+        return cast(List[float], self.embedder.generate(text))
+
+    def _cached(self, key: Tuple, scope: Scope, loader: Callable[[], T]) -> T:
+        if self.cache is None:
+            return loader()
+        return self.cache.get_or_load(key, scope, loader)
+
+    def _invalidate(self, writes: Iterable[Scope]) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(writes)
+
+    def _index_relations(
+        self,
+        relations: Iterable[ArchetypeMemoryRelation],
+        relation_ids: Iterable[str],
+        failed: Iterable[str] = ()
+    ) -> None:
+        if self.graph is None:
+            return
+        failed = set(failed)
+        for relation, relation_id in zip(relations, relation_ids):
+            if relation_id not in failed:
+                self.graph.add_relation(relation, relation_id)
+
+    def _tracked(
+        self,
+        relations: Iterable[ArchetypeMemoryRelation],
+        evaluated: Set[str]
+    ) -> Iterator[ArchetypeMemoryRelation]:
+        """Record and index relations as a streaming import consumes them.
+
+        Relations skipped by ``start`` are included, since a previous run
+        stored them. Failed ones are removed from the graph once the report
+        is known.
+        """
+        for relation in relations:
+            if relation.evaluated_memory_id:
+                evaluated.add(relation.evaluated_memory_id)
+            if self.graph is not None:
+                self.graph.add_relation(relation)
+            yield relation
+
+    def _refresh_significance(self, relations: Iterable[ArchetypeMemoryRelation]) -> None:
+        updated = refresh_significance(
+            self.memories,
+            self.relations,
+            (relation.evaluated_memory_id for relation in relations if relation.evaluated_memory_id)
+        )
+        if updated:
+            # A ranking read between the relation write and the refresh was
+            # cached with the old significance
+            self._invalidate([{"collection": MEMORY_CLASS}])
+
+    @staticmethod
+    def _projection(
+        query: Dict[str, Any],
+        fields: Optional[Sequence[str]],
+        references: Sequence[str] = ()
+    ) -> Callable[[Iterable[Object]], List]:
+        """Apply a caller's projection to a query and get the result converter."""
+        if fields is None:
+            return to_legacy_dicts
+        record = project(query, fields, references)
+        return lambda objects: to_records(objects, record)
 
     def store_memory(self, memory: Memory) -> str:
         """Store a new memory in the database.
-        
+
         Args:
             memory: Memory instance to store
-            
+
         Returns:
             str: UUID of the stored memory
         """
-        return self.client.data_object.create(
-            memory.to_weaviate_object()
-        )
+        data = memory.to_weaviate_object()
+        try:
+            return str(self.memories.data.insert(
+                properties=data["properties"],
+                vector=data["vector"]
+            ))
+        finally:
+            self._invalidate([memory_write_scope(memory)])
 
     def store_memory_relation(self, relation: ArchetypeMemoryRelation) -> str:
         """Store a new memory relation in the database.
-        
+
         Args:
             relation: ArchetypeMemoryRelation instance to store
-            
+
         Returns:
             str: UUID of the stored relation
         """
-        return self.client.data_object.create(
-            relation.to_weaviate_object()
-        )
+        data = relation.to_weaviate_object()
+        try:
+            relation_id = str(self.relations.data.insert(
+                properties=data["properties"],
+                references=data["references"]
+            ))
+        finally:
+            self._invalidate([relation_write_scope(relation)])
+        self._index_relations([relation], [relation_id])
+        self._refresh_significance([relation])
+        return relation_id
 
     def store_memories_batch(self, memories: List[Memory]) -> List[str]:
         """Store multiple memories in batch for better performance.
-        
+
+        Memories get deterministic UUIDs, so retrying a failed call is safe.
+
         Args:
             memories: List of Memory instances to store
-            
+
         Returns:
             List[str]: UUIDs of the stored memories
+
+        Raises:
+            DatabaseError: If any memory failed to import
         """
-        with self.client.batch as batch:
-            batch.configure(batch_size=100, dynamic=True)
-            uuids = []
-            for memory in memories:
-                uuid = batch.add_data_object(
-                    memory.to_weaviate_object()
-                )
-                uuids.append(uuid)
-            return uuids
+        try:
+            report = StreamingIngestor(self.client, batch_size=100).ingest_memories(memories)
+        finally:
+            self._invalidate(memory_write_scope(memory) for memory in memories)
+        self._check_report(report, MEMORY_CLASS)
+        return [memory_uuid(memory) for memory in memories]
 
     def store_relations_batch(self, relations: List[ArchetypeMemoryRelation]) -> List[str]:
         """Store multiple memory relations in batch for better performance.
-        
+
+        Relations get deterministic UUIDs, so retrying a failed call is safe.
+
         Args:
             relations: List of ArchetypeMemoryRelation instances to store
-            
+
         Returns:
             List[str]: UUIDs of the stored relations
+
+        Raises:
+            DatabaseError: If any relation failed to import
         """
-        with self.client.batch as batch:
-            batch.configure(batch_size=100, dynamic=True)
-            uuids = []
-            for relation in relations:
-                uuid = batch.add_data_object(
-                    relation.to_weaviate_object()
+        try:
+            report = StreamingIngestor(self.client, batch_size=100).ingest_relations(relations)
+        finally:
+            self._invalidate(relation_write_scope(relation) for relation in relations)
+        relation_ids = [relation_uuid(relation) for relation in relations]
+        self._index_relations(
+            relations, relation_ids, (failure["uuid"] for failure in report.failed)
+        )
+        self._refresh_significance(relations)
+        self._check_report(report, ARCHETYPE_MEMORY_RELATION_CLASS)
+        return relation_ids
+
+    @staticmethod
+    def _check_report(report: IngestReport, collection: str) -> None:
+        if report.failed:
+            raise DatabaseError(
+                f"{len(report.failed)} of {report.submitted} {collection} objects failed to import",
+                code="BATCH_FAILED",
+                details={"failed": report.failed},
+            )
+
+    def store_evaluated_interaction(
+        self,
+        memory: Memory,
+        relations: Sequence[ArchetypeMemoryRelation],
+        consistency_level: Optional[ConsistencyLevel] = None
+    ) -> Tuple[str, List[str]]:
+        """Store a memory with its archetype relations in a single batch request.
+
+        UUIDs are assigned up front, so the relations can reference the memory
+        before it exists and the memory, relations and references all travel in
+        one gRPC request. The call returns once the server has acknowledged
+        every object. If some objects fail, repeating the call is safe and
+        completes the write, since the UUIDs are deterministic.
+
+        Args:
+            memory: The evaluated Memory
+            relations: Its archetype relations. Relations without an
+                evaluated memory ID are attached to ``memory``.
+            consistency_level: Replicas that must acknowledge the write on a
+                replicated collection, e.g. ``ConsistencyLevel.QUORUM``
+
+        Returns:
+            Tuple[str, List[str]]: UUID of the memory and of each relation
+
+        Raises:
+            DatabaseError: If any object failed to store
+        """
+        memory_id = memory_uuid(memory)
+        for relation in relations:
+            if not relation.evaluated_memory_id:
+                relation.evaluated_memory_id = memory_id
+        relation_ids = [relation_uuid(relation) for relation in relations]
+
+        data = memory.to_weaviate_object()
+        # The memory's significance is known from the relations in hand
+        properties = {**data["properties"], **interaction_significance(memory_id, relations)}
+        try:
+            with self.client.batch.fixed_size(
+                batch_size=len(relations) + 1,
+                concurrent_requests=1,
+                consistency_level=consistency_level
+            ) as batch:
+                batch.add_object(
+                    collection=MEMORY_CLASS,
+                    properties=properties,
+                    uuid=memory_id,
+                    vector=data["vector"]
                 )
-                uuids.append(uuid)
-            return uuids
+                for relation, relation_id in zip(relations, relation_ids):
+                    data = relation.to_weaviate_object()
+                    batch.add_object(
+                        collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+                        properties=data["properties"],
+                        uuid=relation_id,
+                        references=data["references"]
+                    )
+        finally:
+            self._invalidate([
+                memory_write_scope(memory), *(relation_write_scope(r) for r in relations)
+            ])
+
+        failed = self.client.batch.failed_objects
+        self._index_relations(
+            relations, relation_ids, (str(error.original_uuid) for error in failed)
+        )
+        # Only relations evaluating other, existing memories need a refresh
+        self._refresh_significance(
+            relation for relation in relations if relation.evaluated_memory_id != memory_id
+        )
+        if failed:
+            raise DatabaseError(
+                f"{len(failed)} of {len(relations) + 1} objects of interaction "
+                f"{memory_id} failed to store",
+                code="BATCH_FAILED",
+                details={
+                    "memory_id": memory_id,
+                    "failed": [
+                        {"uuid": str(error.original_uuid), "message": error.message}
+                        for error in failed
+                    ]
+                },
+            )
+        return memory_id, relation_ids
+
+    def ingest_memories(
+        self,
+        memories: Iterable[Memory],
+        start: int = 0,
+        **options: Any
+    ) -> IngestReport:
+        """Stream memories of any size into the database.
+
+        Args:
+            memories: Memories to import, consumed lazily
+            start: Number of leading items to skip when resuming an import
+            **options: ``StreamingIngestor`` settings such as batch_size,
+                max_errors or on_progress
+
+        Returns:
+            IngestReport: Counts, per-object failures and objects per second
+        """
+        try:
+            return StreamingIngestor(self.client, **options).ingest_memories(memories, start)
+        finally:
+            # The input is consumed, so drop every cached memory query
+            self._invalidate([{"collection": MEMORY_CLASS}])
+
+    def ingest_relations(
+        self,
+        relations: Iterable[ArchetypeMemoryRelation],
+        start: int = 0,
+        **options: Any
+    ) -> IngestReport:
+        """Stream relations of any size into the database.
+
+        Args:
+            relations: Relations to import, consumed lazily
+            start: Number of leading items to skip when resuming an import
+            **options: ``StreamingIngestor`` settings such as batch_size,
+                max_errors or on_progress
+
+        Returns:
+            IngestReport: Counts, per-object failures and objects per second
+        """
+        evaluated: Set[str] = set()
+        try:
+            report = StreamingIngestor(self.client, **options).ingest_relations(
+                self._tracked(relations, evaluated), start
+            )
+        finally:
+            self._invalidate([{"collection": ARCHETYPE_MEMORY_RELATION_CLASS}])
+        if self.graph is not None:
+            for failure in report.failed:
+                self.graph.remove_edge(failure["uuid"])
+        if refresh_significance(self.memories, self.relations, evaluated):
+            self._invalidate([{"collection": MEMORY_CLASS}])
+        return report
 
     def get_significant_memories(
         self,
         limit: int = 5,
         min_relationship_strength: float = 0.0,
-        archetype_filter: Optional[str] = None
-    ) -> List[Dict]:
+        archetype_filter: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List:
         """Get the most significant memories based on their relationships.
-        
+
+        Memories are ranked by their stored significance, the strongest
+        relationship strength of their evaluations (see
+        ``eumas.database.significance``), so ranking is one sorted property
+        query. The matching relations of the ranked memories are fetched in
+        one further query.
+
         Args:
             limit: Maximum number of memories to return
             min_relationship_strength: Minimum strength threshold for relationships
             archetype_filter: Optional archetype to filter relationships by
-            
+            fields: Optional projection, e.g. ``["relationshipStrength"]``.
+                Memory properties plus relationshipStrength and archetype of
+                the strongest relation. Skips the relation query.
+
         Returns:
-            List[Dict]: List of memories with their relationship metrics
+            List: Memories ordered by their strongest relationship. Dicts with
+                the matching relationships under "relations", or records with
+                ``fields``, see ``eumas.database.records``.
+
+        Raises:
+            ValueError: If archetype_filter is unknown
         """
-        # Build relationship filter
-        where_filter = {
-            "path": ["relationshipStrength"],
-            "operator": "GreaterThan",
-            "valueNumber": min_relationship_strength
-        }
-        
-        if archetype_filter:
-            if archetype_filter not in ARCHETYPES:
-                raise ValueError(f"Invalid archetype: {archetype_filter}")
-            where_filter = {
-                "operator": "And",
-                "operands": [
-                    where_filter,
-                    {
-                        "path": ["archetype"],
-                        "operator": "Equal",
-                        "valueString": archetype_filter
-                    }
-                ]
-            }
-
-        # Build GraphQL query
-        query = (
-            self.graphql
-            .get(MEMORY_CLASS)
-            .with_limit(limit)
-            .with_fields(
-                "userPrompt",
-                "agentReply",
-                "contextTags",
-                "timestamp",
-                "_additional { id }"
-            )
-            .with_additional(
-                "incoming { "
-                f"  {ARCHETYPE_MEMORY_RELATION_CLASS} {{ "
-                "    relationshipStrength "
-                "    archetype "
-                "    archetypePriority "
-                "    spokenAnnotation "
-                "  }} "
-                "}"
-            )
+        column = significance_column(archetype_filter)
+        query = significance_query(
+            limit, min_relationship_strength, archetype_filter, MEMORY_FIELDS
         )
+        record = None
+        if fields is not None:
+            record = project(query, fields)
+            query["return_properties"] = [
+                field for field in query["return_properties"]
+                if field not in ("relationshipStrength", "archetype")
+            ] + [column, SIGNIFICANCE_ARCHETYPE_PROPERTY]
 
-        result = query.do()
-        return result.get("data", {}).get("Get", {}).get(MEMORY_CLASS, [])
+        def load() -> List:
+            memories = self.memories.query.fetch_objects(**query).objects
+            if record is not None:
+                return [
+                    significance_record(memory, record, column, archetype_filter)
+                    for memory in memories
+                ]
+            if not memories:
+                return []
+            relations = iter_sorted(self.relations, **significant_relations_query(
+                [str(memory.uuid) for memory in memories],
+                min_relationship_strength,
+                archetype_filter
+            ))
+            return attach_relations(memories, relations)
+
+        return self._cached(
+            make_key(
+                "significant_memories",
+                limit=limit,
+                min_relationship_strength=min_relationship_strength,
+                archetype=archetype_filter,
+                fields=_fields_key(fields)
+            ),
+            {
+                "collections": {MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS},
+                "archetype": archetype_filter
+            },
+            load
+        )
 
     def get_memory_network(
         self,
         memory_id: str,
         max_depth: int = 2,
-        min_strength: float = 0.5
-    ) -> Dict:
+        min_strength: float = 0.5,
+        max_nodes_per_level: int = 50,
+        fields: Sequence[str] = NETWORK_FIELDS
+    ) -> Optional[MemoryNetwork]:
         """Get the network of memories connected to a given memory.
-        
+
+        Relations are followed in both directions, breadth-first. Each depth
+        level is one query for the whole frontier, paged in strength order,
+        and the memories reached are fetched in one final query.
+
         Args:
             memory_id: UUID of the source memory
-            max_depth: Maximum depth of relationships to traverse
-            min_strength: Minimum relationship strength to include
-            
+            max_depth: Maximum number of hops from the source memory
+            min_strength: Minimum relationship strength of a followed edge
+            max_nodes_per_level: Maximum number of new memories per level,
+                reached through the strongest edges
+            fields: Memory properties of each node record
+
         Returns:
-            Dict: Network of related memories and their relationships
+            Optional[MemoryNetwork]: The nodes, their depths and the edges
+                between them, or None if the memory does not exist
+
+        Raises:
+            ValueError: If max_depth is negative or max_nodes_per_level below 1
         """
-        # Build recursive GraphQL query
-        fields = [
-            "userPrompt",
-            "agentReply",
-            "contextTags",
-            "_additional { id }",
-            f"incoming {{ {ARCHETYPE_MEMORY_RELATION_CLASS} {{ "
-            "  relationshipStrength "
-            "  archetype "
-            "  archetypePriority "
-            "  spokenAnnotation "
-            "  evaluatedMemory { "
-            "    ... on Memory { "
-            "      userPrompt "
-            "      _additional { id } "
-            "    } "
-            "  } "
-            "} }}",
-            f"outgoing {{ {ARCHETYPE_MEMORY_RELATION_CLASS} {{ "
-            "  relationshipStrength "
-            "  archetype "
-            "  archetypePriority "
-            "  spokenAnnotation "
-            "  relatedMemory { "
-            "    ... on Memory { "
-            "      userPrompt "
-            "      _additional { id } "
-            "    } "
-            "  } "
-            "} }}"
-        ]
+        if max_depth < 0 or max_nodes_per_level < 1:
+            raise ValueError("max_depth must be >= 0 and max_nodes_per_level >= 1")
 
-        query = (
-            self.graphql
-            .get(MEMORY_CLASS)
-            .with_id(memory_id)
-            .with_fields(*fields)
-        )
+        network = MemoryNetwork(memory_id)
+        frontier = [memory_id]
+        for depth in range(1, max_depth + 1):
+            if not frontier:
+                break
+            relations = iter_sorted(self.relations, **network_level_query(frontier, min_strength))
+            frontier = network.expand(relations, depth, max_nodes_per_level)
 
-        result = query.do()
-        return result.get("data", {}).get("Get", {}).get(MEMORY_CLASS, [])
+        query, record = network_nodes_query(list(network.depths), fields)
+        add_nodes(network, self.memories.query.fetch_objects(**query).objects, record)
+        if memory_id not in network.nodes:
+            return None
+        return network
 
     def get_archetype_perspective(
         self,
         archetype: str,
         context_tag: Optional[str] = None,
-        limit: int = 10
-    ) -> List[Dict]:
+        limit: int = 10,
+        fields: Optional[Sequence[str]] = None
+    ) -> List:
         """Get memories and their relationships from a specific archetype's perspective.
-        
+
         Args:
             archetype: The archetype to analyze (e.g., "Ella-M")
             context_tag: Optional context tag to filter memories
             limit: Maximum number of memories to return
-            
+            fields: Optional projection of relation properties; the reference
+                names evaluatedMemory and relatedMemory give memory UUIDs
+
         Returns:
-            List[Dict]: Memories and their relationships from the archetype's perspective
+            List: Relations with their memories as dicts, or records with ``fields``
         """
-        if archetype not in ARCHETYPES:
-            raise ValueError(f"Invalid archetype: {archetype}")
-
-        # Build memory filter
-        where_filter = None
-        if context_tag:
-            where_filter = {
-                "path": ["contextTags"],
-                "operator": "ContainsAny",
-                "valueTextArray": [context_tag]
-            }
-
-        # Build GraphQL query
-        query = (
-            self.graphql
-            .get(ARCHETYPE_MEMORY_RELATION_CLASS)
-            .with_fields(
-                "relationshipStrength",
-                "relationshipType",
-                "spokenAnnotation",
-                "archetypePriority",
-                "evaluatedMemory { "
-                "  ... on Memory { "
-                "    userPrompt "
-                "    contextTags "
-                "    timestamp "
-                "    _additional { id } "
-                "  } "
-                "}",
-                "relatedMemory { "
-                "  ... on Memory { "
-                "    userPrompt "
-                "    contextTags "
-                "    timestamp "
-                "    _additional { id } "
-                "  } "
-                "}"
-            )
-            .with_where({
-                "path": ["archetype"],
-                "operator": "Equal",
-                "valueString": archetype
-            })
-            .with_limit(limit)
+        query = archetype_perspective_query(archetype, context_tag, limit)
+        convert = self._projection(query, fields, ("evaluatedMemory", "relatedMemory"))
+        return self._cached(
+            make_key("archetype_perspective", archetype=archetype, context_tag=context_tag,
+                     limit=limit, fields=_fields_key(fields)),
+            {
+                "collections": {MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS},
+                "archetype": archetype,
+                "contextTags": [context_tag] if context_tag else None
+            },
+            lambda: convert(self.relations.query.fetch_objects(**query).objects)
         )
 
-        if where_filter:
-            query = query.with_where({
-                "operator": "And",
-                "operands": [
-                    query._where,  # type: ignore
-                    where_filter
-                ]
-            })
+    def search_similar(
+        self,
+        query: Union[str, Sequence[float]],
+        k: int = 10,
+        filters: Optional[_Filters] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        distance: Optional[float] = None,
+        certainty: Optional[float] = None,
+        ef: Optional[int] = None,
+        return_properties: Sequence[str] = SEARCH_FIELDS,
+        fields: Optional[Sequence[str]] = None
+    ) -> List:
+        """Find the memories nearest to a text or vector.
+
+        Args:
+            query: Text, embedded with ``embedder``, or a query vector
+            k: Number of memories to return
+            filters: Optional extra v4 filter on memory properties
+            user_id: Only search this user's memories
+            session_id: Only search memories of this session
+            start_time: Only search memories at or after this time
+            end_time: Only search memories at or before this time
+            distance: Maximum vector distance of a match
+            certainty: Minimum certainty of a match, for cosine distance
+            ef: Search candidate list size for this call. Raising it above the
+                collection's ef improves recall at the cost of latency; values
+                below it have no effect.
+            return_properties: Properties to return
+            fields: Optional projection returning records instead of dicts,
+                e.g. ``["distance"]`` for IDs and distances only
+
+        Returns:
+            List: Memories nearest first, as dicts with ``distance`` under
+                ``_additional`` or as records with ``fields``
+
+        Raises:
+            ValueError: If k is below one or both thresholds are given
+            EmbeddingError: If a text query could not be embedded
+        """
+        vector = self._embed_query(query) if isinstance(query, str) else query
+        search = similar_memories_query(
+            k,
+            memory_filter(user_id, session_id, start_time, end_time, filters),
+            distance,
+            certainty,
+            ef,
+            return_properties
+        )
+        convert = self._projection(search, fields)
+        response = self.memories.query.near_vector(vector, **search)
+        return convert(response.objects[:k])
+
+    def search_hybrid(
+        self,
+        query: str,
+        k: int = 10,
+        alpha: float = 0.5,
+        fusion_type: Union[str, HybridFusion] = "relative_score",
+        boosts: Optional[Dict[str, float]] = None,
+        vector: Optional[Sequence[float]] = None,
+        filters: Optional[_Filters] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        max_vector_distance: Optional[float] = None,
+        return_properties: Sequence[str] = SEARCH_FIELDS,
+        fields: Optional[Sequence[str]] = None
+    ) -> List:
+        """Find memories by fusing BM25 keyword and vector similarity scores.
+
+        Keyword search covers userPrompt, agentReply and contextTags, so exact
+        names and rare terms are found even when their embedding is not close.
+        Both halves run and are fused in a single query.
 
-        result = query.do()
-        return result.get("data", {}).get("Get", {}).get(ARCHETYPE_MEMORY_RELATION_CLASS, [])
+        Args:
+            query: Search text, used for BM25 and, unless ``vector`` is
+                given, embedded for the vector half
+            k: Number of memories to return
+            alpha: Weight of the vector half, from 0 (keyword only) to 1
+                (vector only)
+            fusion_type: "relative_score", "ranked" or a ``HybridFusion``
+            boosts: Keyword weights by property, e.g. ``{"userPrompt": 2}``.
+                Properties not listed keep weight 1.
+            vector: Precomputed query vector
+            filters: Optional extra v4 filter on memory properties
+            user_id: Only search this user's memories
+            session_id: Only search memories of this session
+            start_time: Only search memories at or after this time
+            end_time: Only search memories at or before this time
+            max_vector_distance: Maximum vector distance for the vector half
+            return_properties: Properties to return
+            fields: Optional projection returning records instead of dicts,
+                e.g. ``["score"]`` for IDs and scores only
+
+        Returns:
+            List: Memories best first, as dicts with ``score`` and
+                ``explain_score`` under ``_additional`` or as records with ``fields``
+
+        Raises:
+            ValueError: If k, alpha or the fusion type is invalid
+            EmbeddingError: If the query could not be embedded
+        """
+        search = hybrid_memories_query(
+            k,
+            alpha,
+            fusion_type,
+            boosts,
+            memory_filter(user_id, session_id, start_time, end_time, filters),
+            max_vector_distance,
+            return_properties
+        )
+        convert = self._projection(search, fields)
+        # The collection has no vectorizer, so the vector half needs a vector
+        if vector is None and alpha > 0:
+            vector = self._embed_query(query)
+        response = self.memories.query.hybrid(query, vector=vector, **search)
+        return convert(response.objects)
 
     def get_memories_by_timerange(
         self,
         start_time: datetime,
         end_time: datetime,
-        limit: int = 100
-    ) -> List[Dict]:
+        limit: int = 100,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List:
         """Get memories within a specific time range.
-        
+
         Args:
-            start_time: Start of time range
-            end_time: End of time range
+            start_time: Start of time range, naive datetimes are taken as UTC
+            end_time: End of time range, naive datetimes are taken as UTC
             limit: Maximum number of memories to return
-            
+            user_id: Only return this user's memories
+            session_id: Only return memories of this session
+            fields: Optional projection returning records instead of dicts,
+                e.g. ``["memoryPriority"]`` for IDs and priorities
+
         Returns:
-            List[Dict]: List of memories within the time range
+            List: Memories within the time range, as dicts or records
         """
-        query = (
-            self.graphql
-            .get(MEMORY_CLASS)
-            .with_where({
-                "operator": "And",
-                "operands": [
-                    {
-                        "path": ["timestamp"],
-                        "operator": "GreaterThanEqual",
-                        "valueDate": start_time.isoformat()
-                    },
-                    {
-                        "path": ["timestamp"],
-                        "operator": "LessThanEqual",
-                        "valueDate": end_time.isoformat()
-                    }
-                ]
-            })
-            .with_fields(
-                "userPrompt",
-                "agentReply",
-                "contextTags",
-                "timestamp",
-                "memoryPriority",
-                "_additional { id }"
-            )
-            .with_limit(limit)
+        query = timerange_query(start_time, end_time, limit)
+        query["filters"] = memory_filter(user_id, session_id, filters=query["filters"])
+        convert = self._projection(query, fields)
+        return self._cached(
+            make_key("memories_by_timerange", start_time=start_time, end_time=end_time,
+                     limit=limit, user_id=user_id, session_id=session_id,
+                     fields=_fields_key(fields)),
+            {
+                "collections": {MEMORY_CLASS},
+                "timerange": (start_time, end_time),
+                "userId": user_id,
+                "sessionId": session_id
+            },
+            lambda: convert(self.memories.query.fetch_objects(**query).objects)
         )
 
-        result = query.do()
-        return result.get("data", {}).get("Get", {}).get(MEMORY_CLASS, [])
-
     def get_memories_by_context(
         self,
         context_tags: List[str],
         min_priority: float = 0.0,
-        limit: int = 100
-    ) -> List[Dict]:
+        limit: int = 100,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List:
         """Get memories matching specific context tags and minimum priority.
-        
+
         Args:
             context_tags: List of context tags to match
             min_priority: Minimum memory priority threshold
             limit: Maximum number of memories to return
-            
+            user_id: Only return this user's memories
+            session_id: Only return memories of this session
+            fields: Optional projection returning records instead of dicts,
+                e.g. ``["memoryPriority"]`` for IDs and priorities
+
         Returns:
-            List[Dict]: List of matching memories
+            List: Matching memories, as dicts or records
         """
-        query = (
-            self.graphql
-            .get(MEMORY_CLASS)
-            .with_where({
-                "operator": "And",
-                "operands": [
-                    {
-                        "path": ["contextTags"],
-                        "operator": "ContainsAny",
-                        "valueTextArray": context_tags
-                    },
-                    {
-                        "path": ["memoryPriority"],
-                        "operator": "GreaterThanEqual",
-                        "valueNumber": min_priority
-                    }
-                ]
-            })
-            .with_fields(
-                "userPrompt",
-                "agentReply",
-                "contextTags",
-                "timestamp",
-                "memoryPriority",
-                "_additional { id }"
-            )
-            .with_limit(limit)
-            .with_additional("score")
+        query = context_query(context_tags, min_priority, limit)
+        query["filters"] = memory_filter(user_id, session_id, filters=query["filters"])
+        convert = self._projection(query, fields)
+        return self._cached(
+            make_key("memories_by_context", context_tags=context_tags, min_priority=min_priority,
+                     limit=limit, user_id=user_id, session_id=session_id,
+                     fields=_fields_key(fields)),
+            {
+                "collections": {MEMORY_CLASS},
+                "contextTags": context_tags,
+                "userId": user_id,
+                "sessionId": session_id
+            },
+            lambda: convert(self.memories.query.fetch_objects(**query).objects)
         )
 
-        result = query.do()
-        return result.get("data", {}).get("Get", {}).get(MEMORY_CLASS, [])
+    def iter_memories(
+        self,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        return_properties: Optional[Sequence[str]] = None,
+        include_vector: bool = False
+    ) -> Iterator[Dict]:
+        """Iterate over every stored memory.
+
+        Memories are streamed page by page in UUID order, so memory use stays
+        constant however large the collection is.
+
+        Args:
+            page_size: Memories fetched per request
+            return_properties: Properties to return. Defaults to all of them.
+            include_vector: Whether to add the vector under ``_additional``
+
+        Yields:
+            Dict: One memory at a time
+        """
+        for obj in iter_objects(
+            self.memories,
+            page_size=page_size,
+            return_properties=return_properties,
+            include_vector=include_vector
+        ):
+            yield to_legacy_dict(obj)
+
+    def iter_relations(
+        self,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        return_properties: Optional[Sequence[str]] = None,
+        return_references: Optional[Any] = None
+    ) -> Iterator[Dict]:
+        """Iterate over every stored memory relation.
+
+        Args:
+            page_size: Relations fetched per request
+            return_properties: Properties to return. Defaults to all of them.
+            return_references: Optional ``QueryReference`` (or list) to resolve
+
+        Yields:
+            Dict: One relation at a time
+        """
+        for obj in iter_objects(
+            self.relations,
+            page_size=page_size,
+            return_properties=return_properties,
+            return_references=return_references
+        ):
+            yield to_legacy_dict(obj)
+
+    def iter_memories_by_timerange(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        return_properties: Optional[Sequence[str]] = MEMORY_FIELDS
+    ) -> Iterator[Dict]:
+        """Iterate over all memories within a time range.
+
+        Unlike ``get_memories_by_timerange`` this is not capped at a limit.
+        Memories are yielded in the order they were stored.
+
+        Args:
+            start_time: Start of time range, naive datetimes are taken as UTC
+            end_time: End of time range, naive datetimes are taken as UTC
+            page_size: Memories fetched per request
+            return_properties: Properties to return. None returns all of them.
+
+        Yields:
+            Dict: One memory at a time
+        """
+        for obj in iter_objects(
+            self.memories,
+            filters=timerange_filter(start_time, end_time),
+            page_size=page_size,
+            return_properties=return_properties
+        ):
+            yield to_legacy_dict(obj)
+
+    def iter_memories_by_context(
+        self,
+        context_tags: List[str],
+        min_priority: float = 0.0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        return_properties: Optional[Sequence[str]] = MEMORY_FIELDS
+    ) -> Iterator[Dict]:
+        """Iterate over all memories matching context tags and minimum priority.
+
+        Unlike ``get_memories_by_context`` this is not capped at a limit.
+        Memories are yielded in the order they were stored.
+
+        Args:
+            context_tags: List of context tags to match
+            min_priority: Minimum memory priority threshold
+            page_size: Memories fetched per request
+            return_properties: Properties to return. None returns all of them.
+
+        Yields:
+            Dict: One memory at a time
+        """
+        for obj in iter_objects(
+            self.memories,
+            filters=context_filter(context_tags, min_priority),
+            page_size=page_size,
+            return_properties=return_properties
+        ):
+            yield to_legacy_dict(obj)
@@ -0,0 +1,292 @@
+"""
+Process-wide pool of Weaviate connections.
+
+Each ``DatabaseConnection`` owns an HTTP connection pool and a gRPC channel,
+so opening one per request pays TCP/TLS setup and the client's startup checks
+on the hot path. ``ConnectionManager`` opens a fixed number of connections once
+and lends them to threads and asyncio tasks.
+"""
+
+import asyncio
+import atexit
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from weaviate.config import AdditionalConfig, ConnectionConfig, Timeout
+
+from eumas.config import Config
+from eumas.database.connection import DatabaseConnection
+from eumas.database.operations import MemoryOperations
+from eumas.utils.errors import DatabaseError
+
+
+class ConnectionManager:
+    """Thread- and asyncio-safe pool of ``DatabaseConnection`` objects.
+
+    Idle connections are handed out most recently used first, so a lightly
+    loaded process keeps reusing the same warm connections. A connection idle
+    for longer than ``max_idle`` seconds is health-checked before reuse and
+    reopened if the server dropped it.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        grpc_port: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        acquire_timeout: float = 30.0,
+        max_idle: float = 60.0,
+        keepalive_connections: int = 20,
+        query_timeout: int = 30,
+        insert_timeout: int = 90,
+    ) -> None:
+        """Initialize the manager without connecting.
+
+        Args:
+            url: Weaviate HTTP URL. Defaults to Config.WEAVIATE_URL.
+            grpc_port: Weaviate gRPC port. Defaults to Config.WEAVIATE_GRPC_PORT.
+            pool_size: Number of connections. Defaults to Config.WEAVIATE_POOL_SIZE.
+            acquire_timeout: Seconds to wait for a free connection
+            max_idle: Idle seconds after which a connection is health-checked
+            keepalive_connections: HTTP keep-alive connections held per client
+            query_timeout: Per-request query timeout in seconds
+            insert_timeout: Per-request insert timeout in seconds
+
+        Raises:
+            ValueError: If pool_size is smaller than 1
+        """
+        self.url = url
+        self.grpc_port = grpc_port
+        self.pool_size = Config.WEAVIATE_POOL_SIZE if pool_size is None else pool_size
+        if self.pool_size < 1:
+            raise ValueError(f"pool_size must be at least 1, got {self.pool_size}")
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self.additional_config = AdditionalConfig(
+            connection=ConnectionConfig(session_pool_connections=keepalive_connections),
+            timeout=Timeout(query=query_timeout, insert=insert_timeout),
+        )
+
+        self._idle: "queue.LifoQueue[Tuple[DatabaseConnection, float]]" = queue.LifoQueue()
+        self._connections: List[DatabaseConnection] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._stats = {"acquired": 0, "waits": 0, "timeouts": 0, "reconnects": 0}
+
+    @property
+    def started(self) -> bool:
+        """Whether the pool holds open connections."""
+        return self._started
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get pool size, idle and in-use connections, and counters for
+        acquisitions, waits for a free connection, timeouts and reconnects."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._connections)
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["size"] - stats["idle"]
+        return stats
+
+    def _connect(self) -> DatabaseConnection:
+        return DatabaseConnection(self.url, self.grpc_port, self.additional_config)
+
+    def startup(self) -> None:
+        """Open all pooled connections. Calling it again is a no-op.
+
+        Raises:
+            WeaviateBaseError: If a connection cannot be opened.
+        """
+        with self._lock:
+            if self._started:
+                return
+            try:
+                for _ in range(self.pool_size):
+                    self._connections.append(self._connect())
+            except Exception:
+                for connection in self._connections:
+                    connection.close()
+                self._connections = []
+                raise
+            for connection in self._connections:
+                self._idle.put((connection, time.monotonic()))
+            self._started = True
+        logger.info(f"Opened {self.pool_size} Weaviate connections")
+
+    def shutdown(self) -> None:
+        """Close all pooled connections.
+
+        Connections still lent out are closed when they are returned.
+        """
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            self._connections = []
+            idle = []
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait()[0])
+                except queue.Empty:
+                    break
+        for connection in idle:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Weaviate connection: {str(e)}")
+        logger.info("Closed Weaviate connection pool")
+
+    def _checkout(self, timeout: Optional[float]) -> DatabaseConnection:
+        """Take an idle connection, reopening it if it went stale.
+
+        Returns:
+            DatabaseConnection: A connection
+
+        Raises:
+            DatabaseError: If no connection becomes free within the timeout.
+        """
+        if not self._started:
+            self.startup()
+        try:
+            connection, idle_since = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self._stats["waits"] += 1
+            wait_for = self.acquire_timeout if timeout is None else timeout
+            try:
+                connection, idle_since = self._idle.get(timeout=wait_for)
+            except queue.Empty:
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise DatabaseError(
+                    f"No Weaviate connection available after {wait_for:.1f}s",
+                    code="POOL_TIMEOUT",
+                    details={"pool_size": self.pool_size},
+                )
+
+        if time.monotonic() - idle_since > self.max_idle and not connection.is_healthy():
+            connection = self._reconnect(connection)
+        with self._lock:
+            self._stats["acquired"] += 1
+        return connection
+
+    def _reconnect(self, stale: DatabaseConnection) -> DatabaseConnection:
+        logger.warning("Reopening stale Weaviate connection")
+        try:
+            stale.close()
+        except Exception:
+            pass
+        try:
+            connection = self._connect()
+        except Exception:
+            # Keep the slot usable; the next checkout retries the health check
+            self._idle.put((stale, 0.0))
+            raise
+        with self._lock:
+            self._connections = [connection if c is stale else c for c in self._connections]
+            self._stats["reconnects"] += 1
+        return connection
+
+    def _checkin(self, connection: DatabaseConnection) -> None:
+        with self._lock:
+            pooled = self._started and any(c is connection for c in self._connections)
+        if pooled:
+            self._idle.put((connection, time.monotonic()))
+        else:
+            connection.close()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[DatabaseConnection]:
+        """Borrow a connection for the duration of a ``with`` block.
+
+        Args:
+            timeout: Seconds to wait for a free connection. Defaults to
+                ``acquire_timeout``.
+
+        Raises:
+            DatabaseError: If no connection becomes free in time.
+        """
+        connection = self._checkout(timeout)
+        try:
+            yield connection
+        finally:
+            self._checkin(connection)
+
+    @asynccontextmanager
+    async def aconnection(
+        self,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[DatabaseConnection]:
+        """Borrow a connection from an asyncio task.
+
+        The checkout, including waiting for a free connection and any health
+        check or reconnect of a stale one, happens in a worker thread so the
+        event loop keeps running. Blocking calls on the borrowed client should be
+        run through ``asyncio.to_thread`` as well.
+
+        Args:
+            timeout: Seconds to wait for a free connection. Defaults to
+                ``acquire_timeout``.
+
+        Raises:
+            DatabaseError: If no connection becomes free in time.
+        """
+        connection = await asyncio.to_thread(self._checkout, timeout)
+        try:
+            yield connection
+        finally:
+            self._checkin(connection)
+
+    @contextmanager
+    def operations(self, timeout: Optional[float] = None) -> Iterator[MemoryOperations]:
+        """Borrow a connection wrapped in ``MemoryOperations``."""
+        with self.connection(timeout) as connection:
+            yield MemoryOperations(connection.client)
+
+    def __enter__(self) -> "ConnectionManager":
+        self.startup()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+
+_manager: Optional[ConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_connection_manager(**options: Any) -> ConnectionManager:
+    """Get the process-wide connection manager, creating it on first use.
+
+    The pool opens lazily on the first borrowed connection, or explicitly via
+    ``startup()``, and is closed at interpreter exit.
+
+    Args:
+        **options: ``ConnectionManager`` arguments, only used on creation
+
+    Returns:
+        ConnectionManager: The shared manager
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ConnectionManager(**options)
+            atexit.register(_manager.shutdown)
+        elif options:
+            logger.warning("Connection manager already exists; ignoring new options")
+        return _manager
+
+
+def shutdown_connection_manager() -> None:
+    """Close and discard the process-wide connection manager."""
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        atexit.unregister(manager.shutdown)
+        manager.shutdown()
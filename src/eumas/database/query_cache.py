@@ -0,0 +1,223 @@
+"""
+Read-through cache for MemoryOperations query results.
+
+Entries are keyed on the query method and its normalized arguments and expire
+after a TTL or when the LRU bound is reached. Every entry records the scope it
+read: the collections, plus the user, session, context tags, time range or
+archetype it filtered on. A write invalidates only the entries whose scope it
+can affect. Storing a memory for one user leaves another user's cached context
+untouched.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple, TypeVar, cast
+
+from eumas.database.schema import (
+    ArchetypeMemoryRelation,
+    Memory,
+    MEMORY_CLASS,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    ensure_utc,
+)
+
+T = TypeVar("T")
+
+# Describes what a cached query read or what a write touched, e.g.
+# {"collections": {"Memory"}, "userId": "u1", "contextTags": {"work"}}
+Scope = Dict[str, Any]
+
+
+def _normalize(value: Any) -> Hashable:
+    """Make an argument hashable, treating lists as unordered sets."""
+    if isinstance(value, datetime):
+        return ensure_utc(value).isoformat()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted({_normalize(item) for item in value}, key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item)) for key, item in value.items()))
+    return cast(Hashable, value)
+
+
+def make_key(method: str, **params: Any) -> Tuple[Hashable, ...]:
+    """Build the cache key of a query.
+
+    Args:
+        method: Name of the query method
+        **params: Its arguments. Lists are order-insensitive and datetimes
+            compare in UTC.
+
+    Returns:
+        Tuple[Hashable, ...]: A hashable key
+    """
+    return (method, _normalize(params))
+
+
+def _affects(write: Scope, scope: Scope) -> bool:
+    """Check whether a write can change the result of a query with the given scope.
+
+    Constraints missing on either side are treated as matching, so unknown
+    writes invalidate conservatively.
+    """
+    if write["collection"] not in scope["collections"]:
+        return False
+    for field in ("userId", "sessionId", "archetype"):
+        if scope.get(field) is not None and write.get(field) is not None:
+            if scope[field] != write[field]:
+                return False
+    if scope.get("contextTags") is not None and write.get("contextTags") is not None:
+        if not set(scope["contextTags"]) & set(write["contextTags"]):
+            return False
+    if scope.get("timerange") is not None and write.get("timestamp") is not None:
+        start, end = scope["timerange"]
+        if not ensure_utc(start) <= ensure_utc(write["timestamp"]) <= ensure_utc(end):
+            return False
+    return True
+
+
+class _Entry:
+    __slots__ = ("value", "expires", "scope", "latency")
+
+    def __init__(self, value: Any, expires: float, scope: Scope, latency: float) -> None:
+        self.value = value
+        self.expires = expires
+        self.scope = scope
+        self.latency = latency
+
+
+class QueryCache:
+    """TTL- and size-bounded LRU of query results with scoped invalidation."""
+
+    def __init__(
+        self,
+        max_items: int = 1024,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_items: Maximum number of cached results
+            ttl: Seconds a result stays valid. Bounds staleness from writes
+                made by other processes, which this cache cannot see.
+            clock: Time source, replaceable in tests
+        """
+        self.max_items = max_items
+        self.ttl = ttl
+        self.clock = clock
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "saved_seconds": 0.0,
+        }
+
+    def get_or_load(self, key: Hashable, scope: Scope, loader: Callable[[], T]) -> T:
+        """Return a cached result or load and cache it.
+
+        Cached results are shared between callers and must not be mutated.
+
+        Args:
+            key: Key from ``make_key``
+            scope: What the query reads, see ``invalidate``
+            loader: Runs the query on a miss
+
+        Returns:
+            T: The cached or freshly loaded result
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["saved_seconds"] += entry.latency
+                    # Stored by a loader for the same key, so of the same type
+                    return cast(T, entry.value)
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            generation = self._generation
+
+        started = time.perf_counter()
+        value = loader()
+        latency = time.perf_counter() - started
+
+        with self._lock:
+            # A write during the load may have made the result stale
+            if generation == self._generation:
+                self._entries[key] = _Entry(value, self.clock() + self.ttl, scope, latency)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_items:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, writes: Iterable[Scope]) -> int:
+        """Drop the cached results the given writes can affect.
+
+        Args:
+            writes: One scope per written object, with its "collection" and
+                any of "userId", "sessionId", "contextTags", "timestamp" and
+                "archetype"
+
+        Returns:
+            int: Number of entries dropped
+        """
+        writes = list(writes)
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key, entry in self._entries.items()
+                if any(_affects(write, entry.scope) for write in writes)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Get cache effectiveness counters.
+
+        Returns:
+            Dict[str, float]: hits, misses, expirations, evictions,
+                invalidations, size, ``hit_ratio`` and ``saved_seconds``, the
+                summed load latency of every hit
+        """
+        with self._lock:
+            stats: Dict[str, float] = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+def memory_write_scope(memory: Memory) -> Scope:
+    """Describe a memory write for ``QueryCache.invalidate``."""
+    return {
+        "collection": MEMORY_CLASS,
+        "userId": memory.user_id,
+        "sessionId": memory.session_id,
+        "contextTags": memory.context_tags,
+        "timestamp": memory.timestamp,
+    }
+
+
+def relation_write_scope(relation: ArchetypeMemoryRelation) -> Scope:
+    """Describe a relation write for ``QueryCache.invalidate``."""
+    return {"collection": ARCHETYPE_MEMORY_RELATION_CLASS, "archetype": relation.archetype}
@@ -0,0 +1,102 @@
+"""
+Compact typed results for projected queries.
+
+Queries that take ``fields`` return only the requested properties and return
+each object as a named tuple rather than a nested dict. Named tuples carry no
+per-instance ``__dict__``, so ranking passes that only need IDs and scores
+neither transfer nor allocate prompt texts and relation blocks.
+
+Fields are the object's property names plus:
+- "id": the object's UUID as a string
+- "distance", "certainty", "score", "explain_score": search metadata, None
+  when the query does not compute it
+- reference names such as "evaluatedMemory": the UUID of the referenced object
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Type
+
+from weaviate.classes.query import QueryReference
+from weaviate.collections.classes.internal import Object
+
+ID_FIELD = "id"
+METADATA_FIELDS = ("distance", "certainty", "score", "explain_score")
+
+
+@lru_cache(maxsize=256)
+def record_type(fields: Tuple[str, ...]) -> Type[Any]:
+    """Get the named tuple class for a projection.
+
+    Args:
+        fields: Requested fields, in order. "id" is always the first field.
+
+    Returns:
+        Type[Any]: A ``Record`` named tuple class, shared by equal projections
+
+    Raises:
+        ValueError: If a field is not a valid identifier or is repeated
+    """
+    names = (ID_FIELD,) + tuple(field for field in fields if field != ID_FIELD)
+    if len(set(names)) != len(names):
+        raise ValueError(f"Repeated fields in projection: {list(fields)}")
+    for name in names:
+        if not name.isidentifier() or name.startswith("_"):
+            raise ValueError(f"Invalid projection field: {name}")
+    return namedtuple("Record", names)
+
+
+def project(
+    query: Dict[str, Any],
+    fields: Sequence[str],
+    references: Sequence[str] = ()
+) -> Type[Any]:
+    """Restrict a ``fetch_objects``-style query to a projection.
+
+    Args:
+        query: Query keyword arguments, updated in place
+        fields: Requested fields
+        references: Reference properties of the queried collection
+
+    Returns:
+        Type[Any]: The record class for ``to_records``
+    """
+    record = record_type(tuple(fields))
+    query["return_properties"] = [
+        field for field in record._fields
+        if field != ID_FIELD and field not in METADATA_FIELDS and field not in references
+    ]
+    query["return_references"] = [
+        QueryReference(link_on=field, return_properties=False)
+        for field in record._fields if field in references
+    ] or None
+    return record
+
+
+def to_record(obj: Object, record: Type[Any]) -> Any:
+    """Convert a v4 result object into a record.
+
+    Args:
+        obj: Object returned by a projected query
+        record: Class from ``record_type`` or ``project``
+
+    Returns:
+        Any: The record, a named tuple with the projection's fields
+    """
+    values: List[Any] = []
+    for field in record._fields:
+        if field == ID_FIELD:
+            values.append(str(obj.uuid))
+        elif field in METADATA_FIELDS:
+            values.append(getattr(obj.metadata, field, None))
+        elif obj.references and field in obj.references:
+            targets = obj.references[field].objects
+            values.append(str(targets[0].uuid) if targets else None)
+        else:
+            values.append((obj.properties or {}).get(field))
+    return record(*values)
+
+
+def to_records(objects: Iterable[Object], record: Type[Any]) -> List[Any]:
+    """Convert several v4 result objects, see ``to_record``."""
+    return [to_record(obj, record) for obj in objects]
@@ -5,8 +5,10 @@ This module defines the Weaviate schema for the EUMAS system, including the Memo
 and ArchetypeMemoryRelation classes with their properties and configurations.
 """
 
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+
+from eumas.database.compression import get_compression_config
 
 MEMORY_CLASS = "Memory"
 ARCHETYPE_MEMORY_RELATION_CLASS = "ArchetypeMemoryRelation"
@@ -14,10 +16,104 @@ ARCHETYPE_MEMORY_RELATION_CLASS = "ArchetypeMemoryRelation"
 # List of supported archetypes
 ARCHETYPES = ["Ella-M", "Ella-O", "Ella-D", "Ella-X", "Ella-H", "Ella-R", "Ella-A", "Ella-F"]
 
-def get_memory_class_schema() -> Dict:
+# Memory properties materializing the strongest relationship strength of the
+# memory's evaluations, overall and per archetype (see eumas.database.significance)
+SIGNIFICANCE_PROPERTY = "significance"
+SIGNIFICANCE_ARCHETYPE_PROPERTY = "significanceArchetype"
+
+# Memory properties the decay engine recomputes memoryPriority from
+# (see eumas.database.decay)
+BASE_PRIORITY_PROPERTY = "basePriority"
+REINFORCEMENT_COUNT_PROPERTY = "reinforcementCount"
+LAST_REINFORCED_PROPERTY = "lastReinforced"
+
+def ensure_utc(value: datetime) -> datetime:
+    """
+    Attach UTC to naive datetimes so they serialize as RFC 3339 dates.
+    
+    Args:
+        value: A naive (assumed UTC) or timezone-aware datetime
+    
+    Returns:
+        datetime: A timezone-aware datetime
+    """
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def significance_property(archetype: str) -> str:
+    """
+    Get the Memory property holding one archetype's strongest relationship.
+
+    Args:
+        archetype: An archetype such as "Ella-M"
+
+    Returns:
+        str: The property name, e.g. "significanceEllaM"
+    """
+    return SIGNIFICANCE_PROPERTY + archetype.replace("-", "")
+
+def get_significance_properties() -> List[Dict]:
+    """
+    Get the Memory property definitions of the significance columns.
+
+    Returns:
+        List[Dict]: Property configurations
+    """
+    return [
+        {
+            "name": SIGNIFICANCE_PROPERTY,
+            "dataType": ["number"],
+            "description": "Strongest relationship strength of the memory's evaluations"
+        },
+        {
+            "name": SIGNIFICANCE_ARCHETYPE_PROPERTY,
+            "dataType": ["string"],
+            "description": "Archetype of the strongest evaluation"
+        }
+    ] + [
+        {
+            "name": significance_property(archetype),
+            "dataType": ["number"],
+            "description": f"Strongest relationship strength of {archetype}'s evaluations"
+        }
+        for archetype in ARCHETYPES
+    ]
+
+def get_decay_properties() -> List[Dict]:
+    """
+    Get the Memory property definitions used by the decay engine.
+
+    Returns:
+        List[Dict]: Property configurations
+    """
+    return [
+        {
+            "name": BASE_PRIORITY_PROPERTY,
+            "dataType": ["number"],
+            "description": "Memory priority before time decay"
+        },
+        {
+            "name": REINFORCEMENT_COUNT_PROPERTY,
+            "dataType": ["int"],
+            "description": "Number of later memories that recalled this memory"
+        },
+        {
+            "name": LAST_REINFORCED_PROPERTY,
+            "dataType": ["date"],
+            "description": "When a later memory last recalled this memory"
+        }
+    ]
+
+def get_memory_class_schema(
+    compression: Optional[str] = None,
+    **compression_options: Any
+) -> Dict:
     """
     Get the schema definition for the Memory class.
     
+    Args:
+        compression: Optional compression profile ("pq", "bq" or "sq")
+        **compression_options: Overrides for the quantizer settings
+    
     Returns:
         Dict: The Memory class schema configuration
     """
@@ -30,7 +126,12 @@ def get_memory_class_schema() -> Dict:
             "ef": 100,
             "efConstruction": 128,
             "maxConnections": 64,
-            "vectorCacheMaxObjects": 500000
+            "vectorCacheMaxObjects": 500000,
+            **get_compression_config(compression, **compression_options)
+        },
+        # Creation-time index used by the filtered scans in eumas.database.cursor
+        "invertedIndexConfig": {
+            "indexTimestamps": True
         },
         "properties": [
             # Base Interaction Properties
@@ -79,7 +180,11 @@ def get_memory_class_schema() -> Dict:
                 "name": "memoryPriority",
                 "dataType": ["number"],
                 "description": "Overall memory priority score"
-            }
+            },
+            # Denormalized relationship significance
+            *get_significance_properties(),
+            # Time decay inputs
+            *get_decay_properties()
         ],
         # Enable graph indexing for efficient relationship queries
         "moduleConfig": {
@@ -103,6 +208,10 @@ def get_archetype_memory_relation_schema() -> Dict:
         "class": ARCHETYPE_MEMORY_RELATION_CLASS,
         "description": "Archetype-specific memory evaluations and relationships",
         "vectorizer": "none",
+        # Creation-time index used by the filtered scans in eumas.database.cursor
+        "invertedIndexConfig": {
+            "indexTimestamps": True
+        },
         "moduleConfig": {
             "graphql": {
                 "enabled": True
@@ -376,9 +485,10 @@ class Memory:
                 "userId": self.user_id,
                 "contextTags": self.context_tags,
                 "tone": self.tone,
-                "timestamp": self.timestamp.isoformat(),
+                "timestamp": ensure_utc(self.timestamp).isoformat(),
                 "duration": self.duration,
-                "memoryPriority": self.memory_priority
+                "memoryPriority": self.memory_priority,
+                BASE_PRIORITY_PROPERTY: self.memory_priority
             },
             "vector": self.vector
         }
@@ -410,25 +520,30 @@ class ArchetypeMemoryRelation:
         self.metrics = metrics
 
     def to_weaviate_object(self) -> Dict:
-        """Convert ArchetypeMemoryRelation instance to Weaviate object format."""
+        """Convert ArchetypeMemoryRelation instance to Weaviate object format.
+        
+        Cross-references are returned separately under "references", mapping
+        each reference property to the target Memory UUID.
+        """
         properties = {
             "archetype": self.archetype,
             "spokenAnnotation": self.spoken_annotation,
-            "archetypePriority": self.archetype_priority,
-            "evaluatedMemory": self.evaluated_memory_id
+            "archetypePriority": self.archetype_priority
         }
+        references = {"evaluatedMemory": self.evaluated_memory_id}
         
         if self.related_memory_id:
             properties.update({
-                "relatedMemory": self.related_memory_id,
                 "relationshipType": self.relationship_type,
                 "relationshipStrength": self.relationship_strength
             })
+            references["relatedMemory"] = self.related_memory_id
         
         # Add all metrics
         properties.update(self.metrics)
         
         return {
             "class": ARCHETYPE_MEMORY_RELATION_CLASS,
-            "properties": properties
+            "properties": properties,
+            "references": references
         }
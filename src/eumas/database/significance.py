@@ -0,0 +1,381 @@
+"""
+Materialized relationship significance on Memory objects.
+
+A memory's significance is the strongest ``relationshipStrength`` among the
+relations that evaluate it, overall (``significance``, with the archetype in
+``significanceArchetype``) and per archetype (``significanceEllaM``, ...).
+Storing these columns on the memory turns "most significant memories" into a
+sorted, filterable property query instead of a scan of relations joined with
+their memories.
+
+``MemoryOperations`` computes the columns of a new memory from the relations
+stored with it, and refreshes the columns of existing memories that a
+relation write touches. ``backfill_significance`` recomputes them for every
+memory, e.g. after an upgrade or after writes made without
+``MemoryOperations``:
+
+    python -m eumas.database.significance --page-size 1000 --workers 16
+"""
+
+import argparse
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from loguru import logger
+from weaviate.classes.config import DataType, Property, Tokenization
+from weaviate.classes.query import Filter, Sort
+from weaviate.collections.classes.internal import Object
+
+from eumas.database.connection import DatabaseConnection
+from eumas.database.cursor import DEFAULT_PAGE_SIZE, iter_objects
+from eumas.database.ingest import update_properties
+from eumas.database.records import project, to_record
+from eumas.database.schema import (
+    ARCHETYPES,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    MEMORY_CLASS,
+    SIGNIFICANCE_ARCHETYPE_PROPERTY,
+    SIGNIFICANCE_PROPERTY,
+    get_significance_properties,
+    significance_property,
+)
+
+SIGNIFICANCE_PROPERTIES = [prop["name"] for prop in get_significance_properties()]
+
+# Memories refreshed per relation query
+REFRESH_CHUNK = 500
+
+_RELATION_FIELDS = ("relationshipStrength", "archetype", "evaluatedMemory")
+
+
+def significance_column(archetype: Optional[str]) -> str:
+    """Get the property to rank by, overall or for one archetype.
+
+    Raises:
+        ValueError: If the archetype is unknown
+    """
+    if archetype is None:
+        return SIGNIFICANCE_PROPERTY
+    if archetype not in ARCHETYPES:
+        raise ValueError(f"Invalid archetype: {archetype}")
+    return significance_property(archetype)
+
+
+def significance_query(
+    limit: int,
+    min_strength: float,
+    archetype: Optional[str],
+    return_properties: Sequence[str]
+) -> Dict[str, Any]:
+    """Build the memory query ranking by a significance column.
+
+    Args:
+        limit: Maximum number of memories
+        min_strength: Only memories with a relationship stronger than this
+        archetype: Rank by this archetype's column instead of the overall one
+        return_properties: Memory properties to return
+
+    Returns:
+        Dict[str, Any]: ``fetch_objects`` arguments
+    """
+    column = significance_column(archetype)
+    return {
+        "filters": Filter.by_property(column).greater_than(min_strength),
+        "sort": Sort.by_property(column, ascending=False),
+        "limit": limit,
+        "return_properties": list(return_properties),
+    }
+
+
+def relation_projection() -> Tuple[Dict[str, Any], Type[Any]]:
+    """Build the relation projection that significance is computed from.
+
+    Returns:
+        Tuple[Dict, Type[Any]]: Query arguments and the record class
+    """
+    query: Dict[str, Any] = {}
+    record = project(query, _RELATION_FIELDS, references=("evaluatedMemory",))
+    return query, record
+
+
+def strength_matrix(relations: Iterable[Object], rows: Dict[str, int]) -> np.ndarray:
+    """Collect the strongest relationship per memory and archetype.
+
+    Args:
+        relations: Relations with the fields of ``relation_projection``
+        rows: Row per memory UUID, extended with the memories seen
+
+    Returns:
+        np.ndarray: One row per memory and one column per archetype, 0.0
+            where the archetype has no relation with a strength
+    """
+    _, record = relation_projection()
+    memory, archetype, strength = array("q"), array("b"), array("d")
+    for relation in relations:
+        values = to_record(relation, record)
+        if (
+            values.evaluatedMemory is None
+            or values.relationshipStrength is None
+            or values.archetype not in ARCHETYPES
+        ):
+            continue
+        memory.append(rows.setdefault(values.evaluatedMemory, len(rows)))
+        archetype.append(ARCHETYPES.index(values.archetype))
+        strength.append(values.relationshipStrength)
+
+    # Scatter into the flattened matrix, one cell per (memory, archetype)
+    matrix = np.zeros(len(rows) * len(ARCHETYPES))
+    cells = np.frombuffer(memory, dtype=np.int64) * len(ARCHETYPES)
+    cells += np.frombuffer(archetype, dtype=np.int8)
+    np.maximum.at(matrix, cells, np.frombuffer(strength, dtype=np.float64))
+    return matrix.reshape(len(rows), len(ARCHETYPES))
+
+
+def significance_values(strengths: np.ndarray) -> Dict[str, Any]:
+    """Get the significance properties of one memory's strength row."""
+    best = int(np.argmax(strengths))
+    top = float(strengths[best])
+    return {
+        SIGNIFICANCE_PROPERTY: top,
+        SIGNIFICANCE_ARCHETYPE_PROPERTY: ARCHETYPES[best] if top > 0 else None,
+        **{
+            significance_property(name): float(value)
+            for name, value in zip(ARCHETYPES, strengths)
+        }
+    }
+
+
+def interaction_significance(memory_id: str, relations: Iterable[Any]) -> Dict[str, Any]:
+    """Compute the significance properties of a new memory from its relations.
+
+    Args:
+        memory_id: UUID of the memory
+        relations: ``ArchetypeMemoryRelation`` instances stored with it.
+            Like ``strength_matrix``, only relations to a related memory count,
+            since only those store a strength; relations evaluating other
+            memories are ignored.
+
+    Returns:
+        Dict[str, Any]: Properties to store on the memory
+    """
+    strengths = np.zeros(len(ARCHETYPES))
+    for relation in relations:
+        if (
+            relation.evaluated_memory_id != memory_id
+            or not relation.related_memory_id
+            or relation.relationship_strength is None
+            or relation.archetype not in ARCHETYPES
+        ):
+            continue
+        column = ARCHETYPES.index(relation.archetype)
+        strengths[column] = max(strengths[column], relation.relationship_strength)
+    return significance_values(strengths)
+
+
+def changed_properties(current: Optional[Dict[str, Any]], values: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the values that differ from the stored ones."""
+    current = current or {}
+    return {name: value for name, value in values.items() if current.get(name) != value}
+
+
+def significance_updates(
+    relations: Iterable[Object],
+    memories: Iterable[Object]
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Compute the changed significance properties of some memories.
+
+    Args:
+        relations: Every relation evaluating the memories
+        memories: The memories with their stored significance properties
+
+    Returns:
+        List[Tuple[str, Dict]]: (uuid, changed properties) per memory to update
+    """
+    rows: Dict[str, int] = {}
+    matrix = strength_matrix(relations, rows)
+    empty = np.zeros(len(ARCHETYPES))
+    updates = []
+    for memory in memories:
+        row = rows.get(str(memory.uuid))
+        values = significance_values(matrix[row] if row is not None else empty)
+        changes = changed_properties(memory.properties, values)
+        if changes:
+            updates.append((str(memory.uuid), changes))
+    return updates
+
+
+def chunk_ids(memory_ids: Iterable[str], size: int = REFRESH_CHUNK) -> Iterator[List[str]]:
+    """Split UUIDs into distinct chunks of at most ``size``."""
+    ids = list(dict.fromkeys(memory_ids))
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def memories_query(memory_ids: Sequence[str]) -> Dict[str, Any]:
+    """Build the query reading the stored significance of some memories."""
+    return {
+        "filters": Filter.by_id().contains_any(list(memory_ids)),
+        "limit": len(memory_ids),
+        "return_properties": SIGNIFICANCE_PROPERTIES,
+    }
+
+
+def evaluations_filter(memory_ids: Sequence[str]) -> Any:
+    """Build the filter matching the relations that evaluate some memories."""
+    return Filter.by_ref("evaluatedMemory").by_id().contains_any(list(memory_ids))
+
+
+def refresh_significance(
+    memories: Any,
+    relations: Any,
+    memory_ids: Iterable[str],
+    chunk_size: int = REFRESH_CHUNK
+) -> int:
+    """Recompute the significance properties of some memories.
+
+    Per chunk of memories this costs one scan of their relations, one read of
+    their stored values and one update per memory whose values changed.
+
+    Args:
+        memories: The v4 Memory collection handle
+        relations: The v4 ArchetypeMemoryRelation collection handle
+        memory_ids: UUIDs of the memories whose relations changed
+        chunk_size: Memories per relation query
+
+    Returns:
+        int: Number of memories updated
+    """
+    query, _ = relation_projection()
+    updated = 0
+    for chunk in chunk_ids(memory_ids, chunk_size):
+        updates = significance_updates(
+            iter_objects(relations, filters=evaluations_filter(chunk), **query),
+            memories.query.fetch_objects(**memories_query(chunk)).objects,
+        )
+        if updates:
+            # A single relation write usually changes one memory; skip the pool
+            report = update_properties(memories, updates, max_workers=min(len(updates), 8))
+            updated += report.imported
+            if report.failed:
+                logger.warning(
+                    f"Significance of {len(report.failed)} memories not updated; "
+                    "run backfill_significance to repair"
+                )
+    return updated
+
+
+def ensure_significance_properties(collection: Any) -> List[str]:
+    """Add the significance properties to a Memory collection created without them.
+
+    Args:
+        collection: The v4 Memory collection handle
+
+    Returns:
+        List[str]: Names of the added properties
+    """
+    existing = {prop.name for prop in collection.config.get().properties}
+    added = []
+    for prop in get_significance_properties():
+        if prop["name"] in existing:
+            continue
+        if prop["dataType"] == ["number"]:
+            collection.config.add_property(Property(
+                name=prop["name"], data_type=DataType.NUMBER, description=prop["description"]
+            ))
+        else:
+            collection.config.add_property(Property(
+                name=prop["name"],
+                data_type=DataType.TEXT,
+                tokenization=Tokenization.FIELD,
+                description=prop["description"]
+            ))
+        added.append(prop["name"])
+    return added
+
+
+def backfill_significance(
+    client: Any,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_workers: int = 8
+) -> Dict[str, Any]:
+    """Recompute the significance properties of every memory.
+
+    Relations are scanned once into a NumPy matrix of strongest strengths per
+    memory and archetype. The memories are then scanned and only the ones
+    whose stored values differ are updated. Safe to run again at any time.
+
+    Args:
+        client: A connected v4 ``weaviate.WeaviateClient``
+        page_size: Objects read per request
+        max_workers: Concurrent update requests
+
+    Returns:
+        Dict[str, Any]: Relations and memories scanned, memories updated,
+            failed updates and elapsed seconds
+    """
+    started = time.perf_counter()
+    memories = client.collections.get(MEMORY_CLASS)
+    relations = client.collections.get(ARCHETYPE_MEMORY_RELATION_CLASS)
+    added = ensure_significance_properties(memories)
+    if added:
+        logger.info(f"Added Memory properties {added}")
+
+    query, _ = relation_projection()
+    counts = {"relations": 0, "memories": 0}
+
+    def counted(objects: Iterable[Object], name: str) -> Iterator[Object]:
+        for obj in objects:
+            counts[name] += 1
+            yield obj
+
+    rows: Dict[str, int] = {}
+    matrix = strength_matrix(
+        counted(iter_objects(relations, page_size=page_size, **query), "relations"), rows
+    )
+    logger.info(f"Scanned {counts['relations']} relations evaluating {len(rows)} memories")
+
+    empty = np.zeros(len(ARCHETYPES))
+
+    def updates() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        scan = iter_objects(
+            memories, page_size=page_size, return_properties=SIGNIFICANCE_PROPERTIES
+        )
+        for memory in counted(scan, "memories"):
+            row = rows.get(str(memory.uuid))
+            changes = changed_properties(
+                memory.properties, significance_values(matrix[row] if row is not None else empty)
+            )
+            if changes:
+                yield str(memory.uuid), changes
+
+    report = update_properties(memories, updates(), max_workers=max_workers)
+    result = {
+        **counts,
+        "updated": report.imported,
+        "failed": len(report.failed),
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Significance backfill finished: {result}")
+    return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the significance backfill command line."""
+    parser = argparse.ArgumentParser(description="Recompute Memory significance properties.")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent update requests")
+    args = parser.parse_args(argv)
+
+    with DatabaseConnection() as connection:
+        result = backfill_significance(
+            connection.client, page_size=args.page_size, max_workers=args.workers
+        )
+    print(result)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
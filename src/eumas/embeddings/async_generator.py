@@ -0,0 +1,196 @@
+"""
+Module for generating embeddings asynchronously using OpenAI's API.
+"""
+
+import asyncio
+from typing import Callable, List, Optional, Union, Dict, Any, cast
+
+from openai import AsyncOpenAI, RateLimitError
+from loguru import logger
+
+from eumas.embeddings.batching import (
+    MAX_BATCH_SIZE,
+    MAX_BATCH_TOKENS,
+    chunk_texts,
+    estimate_tokens,
+)
+from eumas.embeddings.cache import EmbeddingCache
+from eumas.embeddings.rate_limit import AsyncRateLimiter, retry_after_seconds
+from eumas.utils.errors import EmbeddingError
+
+
+class AsyncEmbeddingGenerator:
+    """Asyncio counterpart of ``EmbeddingGenerator`` with RPM/TPM rate limiting."""
+
+    def __init__(
+        self,
+        model: str = "text-embedding-ada-002",
+        cache: Optional[EmbeddingCache] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        token_counter: Optional[Callable[[str], int]] = None
+    ):
+        """Initialize the embedding generator.
+
+        Args:
+            model (str): The OpenAI model to use for generating embeddings.
+                Defaults to "text-embedding-ada-002".
+            cache (Optional[EmbeddingCache]): Cache consulted before calling the API.
+                Only cache misses are sent to the API. Defaults to None.
+            rate_limiter (Optional[AsyncRateLimiter]): Limiter shared by every
+                request of this generator. Defaults to the limiter's default quotas.
+            max_batch_size (int): Maximum number of texts per API request.
+            max_batch_tokens (int): Maximum estimated tokens per API request.
+            max_concurrency (int): Maximum number of API requests in flight for
+                a single call. Defaults to 4.
+            max_retries (int): Retries after a 429 response before giving up.
+            token_counter (Optional[Callable[[str], int]]): Function used to count
+                tokens. Defaults to a byte-length estimate.
+        """
+        self.model = model
+        self.cache = cache
+        self.rate_limiter = rate_limiter or AsyncRateLimiter()
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.token_counter = token_counter or estimate_tokens
+        # The SDK's own retries would swallow 429s before the limiter sees them
+        self.client = AsyncOpenAI(max_retries=0)
+
+    async def generate(
+        self,
+        text: Union[str, List[str]]
+    ) -> Union[List[float], List[List[float]]]:
+        """Generate embeddings for the given text(s).
+
+        Args:
+            text (Union[str, List[str]]): The text(s) to generate embeddings for.
+                Can be a single string or a list of strings.
+
+        Returns:
+            Union[List[float], List[List[float]]]: The generated embeddings.
+                If input is a single string, returns a single embedding vector.
+                If input is a list of strings, returns a list of embedding vectors.
+
+        Raises:
+            EmbeddingError: If the embedding generation fails.
+        """
+        try:
+            texts = [text] if isinstance(text, str) else text
+
+            if self.cache is not None:
+                # SQLite reads and commits block, so keep them off the event loop
+                embeddings = await asyncio.to_thread(self.cache.get_many, self.model, texts)
+            else:
+                embeddings = [None] * len(texts)
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+            if missing:
+                # Embed each distinct text once and fan the vectors back out
+                unique: Dict[str, int] = {}
+                for i in missing:
+                    unique.setdefault(texts[i], len(unique))
+                unique_texts = list(unique)
+
+                generated = await self._embed(unique_texts)
+                for i in missing:
+                    embeddings[i] = generated[unique[texts[i]]]
+
+                if self.cache is not None:
+                    await asyncio.to_thread(
+                        self.cache.put_many, self.model, unique_texts, generated
+                    )
+
+            # Every slot is filled now
+            vectors = cast(List[List[float]], embeddings)
+            return vectors[0] if isinstance(text, str) else vectors
+
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {str(e)}")
+            raise EmbeddingError(f"Failed to generate embeddings: {str(e)}")
+
+    async def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, dispatching their batches concurrently.
+
+        Args:
+            texts (List[str]): The texts to send to the API.
+
+        Returns:
+            List[List[float]]: The embeddings, in input order.
+        """
+        batches = chunk_texts(
+            texts, self.max_batch_size, self.max_batch_tokens, self.token_counter
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(batch: List[int]) -> List[List[float]]:
+            async with semaphore:
+                return await self._create([texts[i] for i in batch])
+
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+
+        embeddings: List[List[float]] = [None] * len(texts)  # type: ignore
+        for batch, generated in zip(batches, results):
+            for i, embedding in zip(batch, generated):
+                embeddings[i] = embedding
+        return embeddings
+
+    async def _create(self, texts: List[str]) -> List[List[float]]:
+        """Send a single rate-limited embeddings request, retrying on 429.
+
+        Args:
+            texts (List[str]): The texts for one request.
+
+        Returns:
+            List[List[float]]: The embeddings, in input order.
+        """
+        tokens = sum(self.token_counter(text) for text in texts)
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(tokens)
+            try:
+                response = await self.client.embeddings.create(
+                    input=texts,
+                    model=self.model
+                )
+            except RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                self.rate_limiter.penalize(retry_after_seconds(e, default=2.0 ** attempt))
+                continue
+
+            usage = getattr(response, "usage", None)
+            total_tokens = getattr(usage, "total_tokens", None)
+            if isinstance(total_tokens, int):
+                self.rate_limiter.reconcile(tokens, total_tokens)
+
+            return [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
+
+        raise EmbeddingError("Exhausted retries after rate limiting")
+
+    async def generate_with_metadata(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Generate embeddings for text and include metadata.
+
+        Args:
+            text (str): The text to generate embeddings for.
+            metadata (Dict[str, Any], optional): Additional metadata to include.
+                Defaults to None.
+
+        Returns:
+            Dict[str, Any]: Dictionary containing the embedding, text, metadata,
+                and model information.
+        """
+        embedding = await self.generate(text)
+        return {
+            "embedding": embedding,
+            "text": text,
+            "metadata": metadata or {},
+            "model": self.model
+        }
@@ -0,0 +1,64 @@
+"""
+Helpers for splitting embedding inputs into API-sized batches.
+"""
+
+from typing import Callable, List, Optional, Sequence
+
+# OpenAI limits for a single embeddings request
+MAX_BATCH_SIZE = 2048
+MAX_BATCH_TOKENS = 300000
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text without a tokenizer.
+
+    English text averages about four bytes per token, so three bytes per token
+    deliberately over-counts to keep batches safely under the request limit.
+
+    Args:
+        text (str): The input text.
+
+    Returns:
+        int: Estimated token count, at least 1.
+    """
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+def chunk_texts(
+    texts: Sequence[str],
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_batch_tokens: int = MAX_BATCH_TOKENS,
+    token_counter: Optional[Callable[[str], int]] = None,
+) -> List[List[int]]:
+    """Split texts into batches that respect per-request item and token limits.
+
+    Args:
+        texts (Sequence[str]): The input texts.
+        max_batch_size (int): Maximum number of texts per batch.
+        max_batch_tokens (int): Maximum estimated tokens per batch. A single text
+            above the limit is placed in a batch of its own.
+        token_counter (Optional[Callable[[str], int]]): Function used to count
+            tokens. Defaults to ``estimate_tokens``.
+
+    Returns:
+        List[List[int]]: Batches of indices into ``texts``, in input order.
+    """
+    count = token_counter or estimate_tokens
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, text in enumerate(texts):
+        tokens = count(text)
+        if current and (
+            len(current) >= max_batch_size or current_tokens + tokens > max_batch_tokens
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,320 @@
+"""
+Two-tier, content-addressed cache for embedding vectors.
+
+Vectors are keyed on ``(model, sha256(normalized text))``. Lookups go through an
+in-process LRU first and fall back to an optional on-disk SQLite store, so
+embeddings survive restarts and are shared between processes using the same file.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing so trivially different inputs share a key.
+
+    Args:
+        text (str): The raw input text.
+
+    Returns:
+        str: NFC-normalized text with runs of whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_key(text: str) -> str:
+    """Get the content hash used as the cache key for a text.
+
+    Args:
+        text (str): The raw input text.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest of the normalized text.
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """In-process LRU in front of an optional SQLite store of embedding vectors."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_items: int = 10000,
+        max_disk_items: int = 1000000,
+        dimension: Optional[int] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path (Optional[str]): SQLite file for the persistent tier. When None,
+                only the in-process tier is used.
+            max_memory_items (int): Maximum number of vectors held in memory.
+            max_disk_items (int): Maximum number of vectors kept on disk. The least
+                recently used entries are evicted once the limit is exceeded.
+            dimension (Optional[int]): Expected vector dimension. When None, the
+                dimension is learned per model from the first stored vector.
+        """
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.dimension = dimension
+
+        self._memory: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._dimensions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "invalid": 0,
+        }
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # Rows on disk, kept up to date on writes so eviction never counts the table
+        self._disk_size = 0
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "  model TEXT NOT NULL,"
+                "  key TEXT NOT NULL,"
+                "  dim INTEGER NOT NULL,"
+                "  vector BLOB NOT NULL,"
+                "  accessed REAL NOT NULL,"
+                "  PRIMARY KEY (model, key)"
+                ")"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)"
+            )
+            self._conn.commit()
+            (self._disk_size,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    def _expected_dimension(self, model: str) -> Optional[int]:
+        return self.dimension or self._dimensions.get(model)
+
+    def _is_valid(self, model: str, vector: Sequence[float]) -> bool:
+        expected = self._expected_dimension(model)
+        return expected is None or len(vector) == expected
+
+    def _remember(self, model: str, key: str, vector: List[float]) -> None:
+        self._memory[(model, key)] = vector
+        self._memory.move_to_end((model, key))
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Look up the embedding of a single text.
+
+        Args:
+            model (str): The embedding model name.
+            text (str): The input text.
+
+        Returns:
+            Optional[List[float]]: The cached vector, or None on a miss.
+        """
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up the embeddings of several texts.
+
+        Args:
+            model (str): The embedding model name.
+            texts (Sequence[str]): The input texts.
+
+        Returns:
+            List[Optional[List[float]]]: Cached vectors in input order, with None
+                for every miss. Each hit is a fresh copy the caller may mutate.
+        """
+        keys = [text_key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(keys)
+
+        with self._lock:
+            disk_lookups: Dict[str, List[int]] = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get((model, key))
+                if vector is not None:
+                    self._memory.move_to_end((model, key))
+                    results[i] = list(vector)
+                    self._stats["memory_hits"] += 1
+                else:
+                    disk_lookups.setdefault(key, []).append(i)
+
+            if disk_lookups and self._conn is not None:
+                for key, vector in self._read_disk(model, list(disk_lookups)).items():
+                    if not self._is_valid(model, vector):
+                        logger.warning(
+                            f"Discarding cached embedding with dimension {len(vector)} "
+                            f"for model {model}"
+                        )
+                        self._stats["invalid"] += 1
+                        self._delete_disk(model, key)
+                        continue
+                    self._remember(model, key, vector)
+                    for i in disk_lookups[key]:
+                        results[i] = list(vector)
+                        self._stats["disk_hits"] += 1
+
+            hits = sum(1 for vector in results if vector is not None)
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(results) - hits
+
+        return results
+
+    def put(self, model: str, text: str, vector: Sequence[float]) -> None:
+        """Store the embedding of a single text.
+
+        Args:
+            model (str): The embedding model name.
+            text (str): The input text.
+            vector (Sequence[float]): The embedding vector.
+
+        Raises:
+            ValueError: If the vector does not have the expected dimension.
+        """
+        self.put_many(model, [text], [vector])
+
+    def put_many(
+        self,
+        model: str,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+    ) -> None:
+        """Store the embeddings of several texts.
+
+        Args:
+            model (str): The embedding model name.
+            texts (Sequence[str]): The input texts.
+            vectors (Sequence[Sequence[float]]): The embedding vectors, aligned
+                with ``texts``.
+
+        Raises:
+            ValueError: If any vector does not have the expected dimension.
+        """
+        with self._lock:
+            rows = []
+            now = time.time()
+            for text, vector in zip(texts, vectors):
+                if self._expected_dimension(model) is None:
+                    self._dimensions[model] = len(vector)
+                if not self._is_valid(model, vector):
+                    raise ValueError(
+                        f"Embedding dimension {len(vector)} does not match expected "
+                        f"dimension {self._expected_dimension(model)} for model {model}"
+                    )
+                # Plain floats in memory, copied on every hit, so callers never share them
+                values = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+                key = text_key(text)
+                self._remember(model, key, values)
+                rows.append((model, key, len(values), array("f", values).tobytes(), now))
+
+            if rows and self._conn is not None:
+                keys = list({row[1] for row in rows})
+                self._disk_size += len(keys) - len(self._stored_keys(model, keys))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, key, dim, vector, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict_disk()
+                self._conn.commit()
+
+    def _read_disk(self, model: str, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        assert self._conn is not None
+        # Stay well below SQLite's host parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                [model, *chunk],
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE embeddings SET accessed = ? WHERE model = ? AND key = ?",
+                [(now, model, key) for key in found],
+            )
+            self._conn.commit()
+        return found
+
+    def _stored_keys(self, model: str, keys: List[str]) -> List[str]:
+        assert self._conn is not None
+        stored: List[str] = []
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            stored.extend(key for (key,) in self._conn.execute(
+                f"SELECT key FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                [model, *chunk],
+            ))
+        return stored
+
+    def _delete_disk(self, model: str, key: str) -> None:
+        assert self._conn is not None
+        cursor = self._conn.execute(
+            "DELETE FROM embeddings WHERE model = ? AND key = ?", (model, key)
+        )
+        self._disk_size -= cursor.rowcount
+        self._conn.commit()
+
+    def _evict_disk(self) -> None:
+        assert self._conn is not None
+        excess = self._disk_size - self.max_disk_items
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN ("
+                "  SELECT rowid FROM embeddings ORDER BY accessed ASC LIMIT ?"
+                ")",
+                (excess,),
+            )
+            self._disk_size -= excess
+            self._stats["evictions"] += excess
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current tier sizes.
+
+        Returns:
+            Dict[str, int]: Counters for hits, misses, memory_hits, disk_hits,
+                evictions and invalid entries, plus memory_size and disk_size.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._memory)
+            stats["disk_size"] = self._disk_size
+        return stats
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._dimensions.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+                self._disk_size = 0
+
+    def close(self) -> None:
+        """Close the on-disk store."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._disk_size = 0
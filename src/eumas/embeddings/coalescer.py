@@ -0,0 +1,188 @@
+"""
+Micro-batching front end that coalesces single-text embedding calls.
+
+Concurrent callers each asking for one embedding are collected for a few
+milliseconds (or until a batch is full) and served by a single API request.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from eumas.embeddings.generator import EmbeddingGenerator
+from eumas.utils.errors import EmbeddingError
+
+
+class EmbeddingCoalescer:
+    """Coalesces concurrent single-text requests into batched generator calls."""
+
+    def __init__(
+        self,
+        generator: EmbeddingGenerator,
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 64
+    ):
+        """Initialize the coalescer and start its dispatch thread.
+
+        Args:
+            generator (EmbeddingGenerator): Generator used for the batched calls.
+            max_wait_ms (float): Longest time a request waits for others to join
+                its batch. Defaults to 5 ms.
+            max_batch_size (int): Batch size that triggers an immediate dispatch.
+                Defaults to 64.
+        """
+        self.generator = generator
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        # (text, future, arrival time) in arrival order
+        self._pending: List[Tuple[str, Future, float]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stats = {"requests": 0, "batches": 0}
+
+        self._thread = threading.Thread(
+            target=self._run, name="embedding-coalescer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, text: str) -> "Future[List[float]]":
+        """Queue a text for the next batch.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            Future[List[float]]: Future resolved with the embedding, or with an
+                ``EmbeddingError`` if the batch fails.
+
+        Raises:
+            EmbeddingError: If the coalescer has been closed.
+        """
+        future: "Future[List[float]]" = Future()
+        with self._condition:
+            if self._closed:
+                raise EmbeddingError("Coalescer is closed")
+            self._pending.append((text, future, time.monotonic()))
+            self._stats["requests"] += 1
+            self._condition.notify()
+        return future
+
+    def generate(self, text: str) -> List[float]:
+        """Generate an embedding, blocking until its batch completes.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+
+        Raises:
+            EmbeddingError: If the embedding generation fails.
+        """
+        return self.submit(text).result()
+
+    async def agenerate(self, text: str) -> List[float]:
+        """Generate an embedding without blocking the event loop.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+
+        Raises:
+            EmbeddingError: If the embedding generation fails.
+        """
+        return await asyncio.wrap_future(self.submit(text))
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Get request and batch counters.
+
+        Returns:
+            Dict[str, float]: Requests received, batches sent and the mean
+                number of requests per batch.
+        """
+        with self._condition:
+            stats: Dict[str, float] = dict(self._stats)
+        stats["mean_batch_size"] = (
+            stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        """Dispatch any queued requests and stop the dispatch thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def __enter__(self) -> "EmbeddingCoalescer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _next_batch(self) -> List[Tuple[str, Future, float]]:
+        """Wait for a batch to fill up or for its oldest request to time out."""
+        with self._condition:
+            while True:
+                if self._pending:
+                    # Leftovers of a full batch keep their own arrival time
+                    remaining = self._pending[0][2] + self.max_wait - time.monotonic()
+                    if (
+                        self._closed
+                        or remaining <= 0
+                        or len(self._pending) >= self.max_batch_size
+                    ):
+                        batch = self._pending[:self.max_batch_size]
+                        self._pending = self._pending[self.max_batch_size:]
+                        # Requests cancelled by their caller, e.g. on a timeout, are
+                        # dropped; the rest can no longer be cancelled
+                        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+                        if not batch:
+                            continue
+                        self._stats["batches"] += 1
+                        return batch
+                    self._condition.wait(remaining)
+                elif self._closed:
+                    return []
+                else:
+                    self._condition.wait()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            texts = [text for text, _, _ in batch]
+            try:
+                embeddings = self.generator.generate(texts)
+            except Exception as e:
+                logger.error(f"Coalesced embedding batch of {len(batch)} failed: {str(e)}")
+                error = e if isinstance(e, EmbeddingError) else EmbeddingError(str(e))
+                for _, future, _ in batch:
+                    _resolve(future, error=error)
+                continue
+            for (_, future, _), embedding in zip(batch, embeddings):
+                _resolve(future, result=embedding)
+
+
+def _resolve(
+    future: Future,
+    result: Optional[List[float]] = None,
+    error: Optional[BaseException] = None
+) -> None:
+    # A future that cannot be resolved must not stop the dispatch thread
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except Exception as e:
+        logger.warning(f"Failed to resolve coalesced embedding request: {str(e)}")
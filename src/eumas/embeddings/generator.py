@@ -1,39 +1,144 @@
 """
-Module for generating embeddings using OpenAI's API.
+Module for generating embeddings using OpenAI's API or a local backend.
 """
 
-from typing import List, Union, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Union, Dict, Any, cast
 
+import numpy as np
 from openai import OpenAI
 from loguru import logger
 
+from eumas.embeddings.batching import MAX_BATCH_SIZE, MAX_BATCH_TOKENS, chunk_texts
+from eumas.config import Config
+from eumas.embeddings.cache import EmbeddingCache
+from eumas.embeddings.providers import (
+    PROVIDERS,
+    EmbeddingProvider,
+    OpenAIEmbeddingProvider,
+)
+from eumas.embeddings.reduction import truncate_embeddings
 from eumas.utils.errors import EmbeddingError
 
 
 class EmbeddingGenerator:
-    """Class for generating embeddings using OpenAI's API."""
+    """Class for generating embeddings using OpenAI's API or a local backend."""
 
-    def __init__(self, model: str = "text-embedding-ada-002"):
+    def __init__(
+        self,
+        model: str = "text-embedding-ada-002",
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_workers: int = 4,
+        token_counter: Optional[Callable[[str], int]] = None,
+        dimensions: Optional[int] = None,
+        reduction: str = "api",
+        provider: Optional[EmbeddingProvider] = None
+    ):
         """Initialize the embedding generator.
 
         Args:
             model (str): The OpenAI model to use for generating embeddings.
                 Defaults to "text-embedding-ada-002".
+            cache (Optional[EmbeddingCache]): Cache consulted before calling the API.
+                Only cache misses are sent to the API. Defaults to None.
+            max_batch_size (int): Maximum number of texts per API request.
+            max_batch_tokens (int): Maximum estimated tokens per API request.
+            max_workers (int): Maximum number of API requests in flight when a
+                call is split into several batches. Defaults to 4.
+            token_counter (Optional[Callable[[str], int]]): Function used to count
+                tokens when splitting batches. Defaults to a byte-length estimate.
+            dimensions (Optional[int]): Reduced embedding size. Defaults to None,
+                which keeps the model's native size.
+            reduction (str): How ``dimensions`` is applied. "api" passes it to
+                models that support the ``dimensions`` parameter; "truncate" keeps
+                the leading dimensions locally and renormalizes, for Matryoshka-style
+                models. Defaults to "api".
+            provider (Optional[EmbeddingProvider]): Backend producing the vectors.
+                Defaults to the backend named by ``Config.EMBEDDING_PROVIDER``.
+
+        Raises:
+            ValueError: If ``reduction`` or the configured provider is unknown.
         """
+        if reduction not in ("api", "truncate"):
+            raise ValueError(f"Invalid reduction: {reduction}")
+
         self.model = model
-        self.client = OpenAI()
+        self.dimensions = dimensions
+        self.reduction = reduction
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_workers = max_workers
+        self.token_counter = token_counter
+
+        self.client = None
+        if provider is None:
+            name = Config.EMBEDDING_PROVIDER.lower()
+            if name == OpenAIEmbeddingProvider.name:
+                self.client = OpenAI()
+                provider = OpenAIEmbeddingProvider(self.client)
+            elif name in PROVIDERS:
+                provider = PROVIDERS[name]()
+            else:
+                raise ValueError(f"Invalid embedding provider: {Config.EMBEDDING_PROVIDER}")
+        self.provider = provider
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"requested": 0, "embedded": 0}
+
+    @property
+    def cache_namespace(self) -> str:
+        """Get the cache namespace, which separates backends and reduced sizes.
+
+        Returns:
+            str: The model name, prefixed with the backend unless it is OpenAI
+                and suffixed with the dimension when reduced.
+        """
+        namespace = self.model
+        if self.provider.name != OpenAIEmbeddingProvider.name:
+            namespace = f"{self.provider.name}:{namespace}"
+        if self.dimensions:
+            namespace = f"{namespace}@{self.dimensions}"
+        return namespace
 
-    def generate(self, text: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Get counters of texts sent for embedding after cache lookups.
+
+        Returns:
+            Dict[str, float]: ``requested`` texts, ``embedded`` unique texts
+                actually sent to the provider, and ``dedup_ratio``, the fraction
+                of requested texts saved by in-batch deduplication.
+        """
+        with self._stats_lock:
+            stats: Dict[str, float] = dict(self._stats)
+        stats["dedup_ratio"] = (
+            1 - stats["embedded"] / stats["requested"] if stats["requested"] else 0.0
+        )
+        return stats
+
+    def generate(
+        self,
+        text: Union[str, List[str]],
+        as_array: bool = False
+    ) -> Union[List[float], List[List[float]], np.ndarray]:
         """Generate embeddings for the given text(s).
 
         Args:
             text (Union[str, List[str]]): The text(s) to generate embeddings for.
                 Can be a single string or a list of strings.
+            as_array (bool): Return a contiguous float32 ndarray instead of Python
+                lists. Embeddings are then requested base64-encoded and decoded
+                straight into the array. Defaults to False.
 
         Returns:
-            Union[List[float], List[List[float]]]: The generated embeddings.
+            Union[List[float], List[List[float]], np.ndarray]: The generated embeddings.
                 If input is a single string, returns a single embedding vector.
                 If input is a list of strings, returns a list of embedding vectors.
+                With ``as_array``, these are float32 arrays of shape (d,) and (n, d).
 
         Raises:
             EmbeddingError: If the embedding generation fails.
@@ -42,26 +147,99 @@ class EmbeddingGenerator:
             # Convert single string to list for consistent handling
             texts = [text] if isinstance(text, str) else text
 
-            # Generate embeddings using OpenAI API
-            response = self.client.embeddings.create(
-                input=texts,
-                model=self.model
-            )
+            # Serve what we can from the cache and only send the misses to the API
+            embeddings: List[Optional[Sequence[float]]]
+            if self.cache is not None:
+                embeddings = list(self.cache.get_many(self.cache_namespace, texts))
+            else:
+                embeddings = [None] * len(texts)
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+            if missing:
+                # Embed each distinct text once and fan the vectors back out
+                unique: Dict[str, int] = {}
+                for i in missing:
+                    unique.setdefault(texts[i], len(unique))
+                unique_texts = list(unique)
+                with self._stats_lock:
+                    self._stats["requested"] += len(missing)
+                    self._stats["embedded"] += len(unique_texts)
+
+                generated = self._embed(unique_texts, as_array)
+                for i in missing:
+                    embeddings[i] = generated[unique[texts[i]]]
+
+                if self.cache is not None:
+                    self.cache.put_many(self.cache_namespace, unique_texts, generated)
 
-            # Extract embeddings from response
-            embeddings = [data.embedding for data in response.data]
+            # Every slot is filled now; rows are float lists unless as_array
+            if as_array:
+                matrix = _stack(cast(List[Sequence[float]], embeddings))
+                return matrix[0] if isinstance(text, str) else matrix
 
             # Return single embedding if input was single string
-            return embeddings[0] if isinstance(text, str) else embeddings
+            vectors = cast(List[List[float]], embeddings)
+            return vectors[0] if isinstance(text, str) else vectors
 
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {str(e)}")
             raise EmbeddingError(f"Failed to generate embeddings: {str(e)}")
 
+    def _embed(self, texts: List[str], as_array: bool = False) -> List[Sequence[float]]:
+        """Embed texts, splitting them into concurrently dispatched batches if needed.
+
+        Args:
+            texts (List[str]): The texts to send to the API.
+            as_array (bool): Request base64 encoding and decode to float32 rows.
+
+        Returns:
+            List[Sequence[float]]: The embeddings, in input order.
+        """
+        batches = chunk_texts(
+            texts, self.max_batch_size, self.max_batch_tokens, self.token_counter
+        )
+        if len(batches) == 1:
+            return self._create(texts, as_array)
+
+        logger.debug(f"Splitting {len(texts)} texts into {len(batches)} embedding requests")
+        embeddings: List[Sequence[float]] = [None] * len(texts)  # type: ignore
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            results = executor.map(
+                lambda batch: self._create([texts[i] for i in batch], as_array), batches
+            )
+            for batch, generated in zip(batches, results):
+                for i, embedding in zip(batch, generated):
+                    embeddings[i] = embedding
+        return embeddings
+
+    def _create(self, texts: List[str], as_array: bool = False) -> List[Sequence[float]]:
+        """Embed a single batch with the provider.
+
+        Args:
+            texts (List[str]): The texts for one request.
+            as_array (bool): Return float32 rows instead of float lists.
+
+        Returns:
+            List[Sequence[float]]: The embeddings, in input order.
+        """
+        embeddings = self.provider.embed(
+            texts,
+            self.model,
+            dimensions=self.dimensions if self.reduction == "api" else None,
+            as_array=as_array
+        )
+
+        if self.dimensions and self.reduction == "truncate":
+            truncated = truncate_embeddings(embeddings, self.dimensions)
+            rows: List[Sequence[float]] = list(truncated) if as_array else truncated.tolist()
+            return rows
+        return embeddings
+
     def generate_with_metadata(
         self,
         text: str,
-        metadata: Dict[str, Any] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        as_array: bool = False
     ) -> Dict[str, Any]:
         """Generate embeddings for text and include metadata.
 
@@ -69,15 +247,34 @@ class EmbeddingGenerator:
             text (str): The text to generate embeddings for.
             metadata (Dict[str, Any], optional): Additional metadata to include.
                 Defaults to None.
+            as_array (bool): Return the embedding as a float32 ndarray.
+                Defaults to False.
 
         Returns:
             Dict[str, Any]: Dictionary containing the embedding, text, metadata,
                 and model information.
         """
-        embedding = self.generate(text)
+        embedding = self.generate(text, as_array=True) if as_array else self.generate(text)
         return {
             "embedding": embedding,
             "text": text,
             "metadata": metadata or {},
             "model": self.model
         }
+
+
+def _stack(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """Copy embedding rows into one contiguous float32 matrix.
+
+    Args:
+        embeddings (Sequence[Sequence[float]]): Rows as arrays or float lists.
+
+    Returns:
+        np.ndarray: Float32 array of shape (n, d).
+    """
+    if not embeddings:
+        return np.empty((0, 0), dtype=np.float32)
+    matrix = np.empty((len(embeddings), len(embeddings[0])), dtype=np.float32)
+    for i, embedding in enumerate(embeddings):
+        matrix[i] = embedding
+    return matrix
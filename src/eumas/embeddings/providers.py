@@ -0,0 +1,178 @@
+"""
+Embedding backends used by ``EmbeddingGenerator``.
+
+A provider turns one batch of texts into vectors. Caching, batching and
+dimension reduction stay in the generator, so every backend gets them for free.
+"""
+
+import base64
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingProvider(ABC):
+    """Interface for embedding backends."""
+
+    #: Name used to select the backend through ``Config.EMBEDDING_PROVIDER``
+    name: str = ""
+
+    @abstractmethod
+    def embed(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int] = None,
+        as_array: bool = False
+    ) -> List[Sequence[float]]:
+        """Embed one batch of texts.
+
+        Args:
+            texts (List[str]): The texts for one request.
+            model (str): The model requested by the generator.
+            dimensions (Optional[int]): Requested output size, if the backend
+                can produce reduced embeddings natively.
+            as_array (bool): Return float32 arrays instead of float lists.
+
+        Returns:
+            List[Sequence[float]]: One vector per text, in input order.
+        """
+
+    def with_timeout(self, timeout: float) -> "EmbeddingProvider":
+        """Get a provider whose requests give up after ``timeout`` seconds.
+
+        Used by ``ResilientEmbeddingProvider`` so that abandoned attempts end by
+        themselves. Backends without network requests return themselves.
+
+        Args:
+            timeout (float): Seconds a single request may take.
+
+        Returns:
+            EmbeddingProvider: A provider sending bounded, non-retried requests.
+        """
+        return self
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Backend calling the OpenAI embeddings API."""
+
+    name = "openai"
+
+    def __init__(self, client: Any):
+        """Initialize the provider.
+
+        Args:
+            client (Any): An ``openai.OpenAI`` client.
+        """
+        self.client = client
+
+    def with_timeout(self, timeout: float) -> "OpenAIEmbeddingProvider":
+        """Get a provider whose client times out and never retries on its own."""
+        return OpenAIEmbeddingProvider(
+            self.client.with_options(timeout=timeout, max_retries=0)
+        )
+
+    def embed(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int] = None,
+        as_array: bool = False
+    ) -> List[Sequence[float]]:
+        """Embed one batch of texts with a single API request.
+
+        With ``as_array``, embeddings are requested base64-encoded and decoded
+        straight into float32 arrays.
+        """
+        options: Dict[str, Any] = {}
+        if as_array:
+            options["encoding_format"] = "base64"
+        if dimensions:
+            options["dimensions"] = dimensions
+
+        # Generate embeddings using OpenAI API
+        response = self.client.embeddings.create(
+            input=texts,
+            model=model,
+            **options
+        )
+
+        # Extract embeddings from response
+        rows = sorted(response.data, key=lambda data: data.index)
+        if as_array:
+            # float32 rows stand in for float lists, see ``EmbeddingProvider.embed``
+            arrays: List[Any] = [decode_base64(data.embedding) for data in rows]
+            return arrays
+        return [data.embedding for data in rows]
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic local backend based on feature hashing.
+
+    Words and word bigrams are hashed into signed buckets and the result is
+    L2-normalized. Texts sharing vocabulary get similar vectors, which is enough
+    for offline pipelines, CI and benchmarks, at a few microseconds per text
+    with no network access. The ``model`` argument is ignored.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 1536):
+        """Initialize the provider.
+
+        Args:
+            dimension (int): Output size when the generator does not request
+                one. Defaults to 1536 to match text-embedding-ada-002.
+        """
+        self.dimension = dimension
+
+    def embed(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int] = None,
+        as_array: bool = False
+    ) -> List[Sequence[float]]:
+        """Embed one batch of texts locally."""
+        size = dimensions or self.dimension
+        matrix = np.zeros((len(texts), size), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_PATTERN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = int.from_bytes(
+                    hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+                )
+                matrix[row, digest % size] += 1.0 if digest >> 63 else -1.0
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        vectors: List[Sequence[float]] = list(matrix) if as_array else matrix.tolist()
+        return vectors
+
+
+PROVIDERS = {
+    OpenAIEmbeddingProvider.name: OpenAIEmbeddingProvider,
+    HashingEmbeddingProvider.name: HashingEmbeddingProvider,
+}
+
+
+def decode_base64(encoded: Union[str, Sequence[float]]) -> np.ndarray:
+    """Decode a base64 embedding from the API into a float32 vector.
+
+    Args:
+        encoded (Union[str, Sequence[float]]): Base64 string of little-endian
+            float32 values. Float lists are accepted for providers that ignore
+            ``encoding_format``.
+
+    Returns:
+        np.ndarray: The embedding as a float32 array of shape (d,).
+    """
+    if isinstance(encoded, str):
+        return np.frombuffer(base64.b64decode(encoded), dtype="<f4")
+    return np.asarray(encoded, dtype=np.float32)
@@ -0,0 +1,154 @@
+"""
+Rate limiting for asynchronous embedding requests.
+
+The limiter tracks requests-per-minute and tokens-per-minute in two separate
+token buckets and pauses every caller after the provider answers with a 429.
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+from loguru import logger
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 1.0):
+        """Initialize the bucket.
+
+        Args:
+            rate_per_minute (float): Quota replenished per minute.
+            burst_seconds (float): Seconds worth of quota the bucket can hold,
+                which bounds how far callers can burst ahead of the average rate.
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add the quota accrued since the last refill.
+
+        Args:
+            now (float): Current monotonic time.
+        """
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Get the time until ``amount`` can be taken from the bucket.
+
+        Args:
+            amount (float): Quota needed. Amounts above the capacity are treated
+                as a full bucket so oversized requests can still proceed.
+
+        Returns:
+            float: Seconds to wait, 0 if the quota is available now.
+        """
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.rate)
+
+    def take(self, amount: float) -> None:
+        """Consume quota from the bucket. The level may go negative.
+
+        Args:
+            amount (float): Quota to consume.
+        """
+        self.level -= amount
+
+
+class AsyncRateLimiter:
+    """Keeps concurrent callers within request and token per-minute quotas."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 3000,
+        tokens_per_minute: float = 1000000,
+        burst_seconds: float = 1.0,
+    ):
+        """Initialize the rate limiter.
+
+        Args:
+            requests_per_minute (float): Request quota (RPM).
+            tokens_per_minute (float): Token quota (TPM).
+            burst_seconds (float): Seconds worth of quota that may be spent at once.
+        """
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.blocked_until = 0.0
+        # Created on first use: on Python 3.9 a lock binds to the loop current
+        # at construction, which may not be the loop that later awaits it
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of ``tokens`` tokens fits in both quotas.
+
+        Callers are served in arrival order, so waiting callers are released
+        one at a time exactly as quota becomes available.
+
+        Args:
+            tokens (int): Estimated tokens for the request.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(
+                    self.blocked_until - now,
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+                await asyncio.sleep(wait)
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage of a request is known.
+
+        Args:
+            estimated (int): Tokens reserved in ``acquire``.
+            actual (int): Tokens reported by the provider.
+        """
+        self.tokens.take(actual - estimated)
+
+    def penalize(self, retry_after: float) -> None:
+        """Pause all callers after the provider reported throttling.
+
+        Args:
+            retry_after (float): Seconds to wait before the next request.
+        """
+        until = time.monotonic() + retry_after
+        if until > self.blocked_until:
+            logger.warning(f"Embedding requests throttled, pausing for {retry_after:.2f}s")
+            self.blocked_until = until
+
+
+def retry_after_seconds(error: Any, default: float) -> float:
+    """Read the retry delay suggested by a 429 response.
+
+    Args:
+        error (Any): The rate limit exception raised by the client.
+        default (float): Delay to use when the response has no usable header.
+
+    Returns:
+        float: Seconds to wait before retrying.
+    """
+    response = getattr(error, "response", None)
+    headers: Optional[Any] = getattr(response, "headers", None)
+    if headers:
+        for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            value = headers.get(name)
+            if value is None:
+                continue
+            try:
+                return max(0.0, float(value) * scale)
+            except (TypeError, ValueError):
+                continue
+    return default
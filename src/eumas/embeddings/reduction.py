@@ -0,0 +1,104 @@
+"""
+Dimension reduction for embeddings and a recall harness to evaluate it.
+
+Matryoshka-style models (e.g. text-embedding-3-*) front-load information in the
+leading dimensions, so a prefix of the vector renormalized to unit length is a
+usable lower-dimensional embedding.
+"""
+
+from typing import Dict, Iterable, Sequence, Union
+
+import numpy as np
+
+
+def truncate_embeddings(
+    vectors: Union[Sequence[Sequence[float]], np.ndarray],
+    dimensions: int
+) -> np.ndarray:
+    """Keep the leading dimensions of each vector and renormalize to unit length.
+
+    Args:
+        vectors (Union[Sequence[Sequence[float]], np.ndarray]): Embeddings of
+            shape (n, d) or (d,).
+        dimensions (int): Number of leading dimensions to keep.
+
+    Returns:
+        np.ndarray: Float32 array of shape (n, dimensions) or (dimensions,).
+
+    Raises:
+        ValueError: If ``dimensions`` is not between 1 and d.
+    """
+    array = np.asarray(vectors, dtype=np.float32)
+    if not 0 < dimensions <= array.shape[-1]:
+        raise ValueError(
+            f"Cannot truncate {array.shape[-1]}-dimensional embeddings to {dimensions}"
+        )
+    truncated = np.ascontiguousarray(array[..., :dimensions])
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+    normalized: np.ndarray = truncated / np.where(norms == 0, 1, norms)
+    return normalized
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    """Get the exact top-k corpus rows for each query by cosine similarity.
+
+    Args:
+        queries (np.ndarray): Query vectors of shape (q, d).
+        corpus (np.ndarray): Corpus vectors of shape (n, d).
+        k (int): Number of neighbours per query.
+
+    Returns:
+        np.ndarray: Indices into ``corpus`` of shape (q, k), unordered within a row.
+    """
+    corpus = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def recall_at_k(expected: np.ndarray, retrieved: np.ndarray) -> float:
+    """Compute mean recall@k of retrieved neighbours against the expected ones.
+
+    Args:
+        expected (np.ndarray): Ground-truth neighbour indices of shape (q, k).
+        retrieved (np.ndarray): Retrieved neighbour indices of shape (q, k).
+
+    Returns:
+        float: Mean fraction of expected neighbours that were retrieved.
+    """
+    hits = [
+        len(set(truth.tolist()) & set(found.tolist())) / len(truth)
+        for truth, found in zip(expected, retrieved)
+    ]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def evaluate_dimensions(
+    corpus: Sequence[Sequence[float]],
+    queries: Sequence[Sequence[float]],
+    dimensions: Iterable[int],
+    k: int = 10,
+) -> Dict[int, float]:
+    """Measure recall@k of truncated embeddings against full-dimension retrieval.
+
+    Args:
+        corpus (Sequence[Sequence[float]]): Full-dimension corpus embeddings.
+        queries (Sequence[Sequence[float]]): Full-dimension query embeddings.
+        dimensions (Iterable[int]): Candidate reduced dimensions.
+        k (int): Number of neighbours compared per query. Defaults to 10.
+
+    Returns:
+        Dict[int, float]: Recall@k for each candidate dimension.
+    """
+    corpus_array = np.asarray(corpus, dtype=np.float32)
+    query_array = np.asarray(queries, dtype=np.float32)
+    expected = top_k(query_array, corpus_array, k)
+
+    return {
+        d: recall_at_k(
+            expected,
+            top_k(truncate_embeddings(query_array, d), truncate_embeddings(corpus_array, d), k),
+        )
+        for d in dimensions
+    }
@@ -0,0 +1,344 @@
+"""
+Tail-latency and failure handling for embedding providers.
+
+``ResilientEmbeddingProvider`` wraps another provider with an adaptive timeout
+derived from observed latencies, a hedged duplicate request once the primary
+is slower than the observed p95, jittered retries, and a circuit breaker that
+fails fast while the backend is degraded.
+
+Every attempt goes through ``EmbeddingProvider.with_timeout``, so the wrapped
+provider's requests end with the adaptive timeout and are never retried by the
+client library behind the wrapper's back.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from eumas.embeddings.providers import EmbeddingProvider
+from eumas.utils.errors import EmbeddingError
+
+
+class LatencyTracker:
+    """Sliding window of request latencies used to derive timeouts."""
+
+    def __init__(
+        self,
+        window: int = 256,
+        min_samples: int = 20,
+        initial_timeout: float = 10.0,
+        timeout_multiplier: float = 3.0,
+        min_timeout: float = 0.5,
+        max_timeout: float = 30.0,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            window (int): Number of recent latencies kept.
+            min_samples (int): Samples needed before percentiles are trusted.
+            initial_timeout (float): Timeout used until enough samples exist.
+            timeout_multiplier (float): Timeout as a multiple of the p99 latency.
+            min_timeout (float): Lower bound for the adaptive timeout.
+            max_timeout (float): Upper bound for the adaptive timeout.
+        """
+        self.min_samples = min_samples
+        self.initial_timeout = initial_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a successful request in seconds."""
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Get a latency percentile.
+
+        Args:
+            p (float): Percentile between 0 and 100.
+
+        Returns:
+            Optional[float]: The latency in seconds, or None until ``min_samples``
+                latencies have been recorded.
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+    def timeout(self) -> float:
+        """Get the current per-attempt timeout in seconds."""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return self.initial_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Get the delay after which a hedged request is sent, None while warming up."""
+        return self.percentile(95)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures until the backend recovers."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize the circuit breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a single
+                trial request is let through.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Free the trial slot after a request that says nothing about the
+        backend's health, such as a rejected input, keeping state and counters."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit past the threshold."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning("Embedding provider circuit opened")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 8.0) -> float:
+    """Get a full-jitter exponential backoff delay.
+
+    Args:
+        attempt (int): Zero-based retry attempt.
+        base_delay (float): Delay ceiling of the first retry in seconds.
+        max_delay (float): Upper bound of the delay ceiling.
+
+    Returns:
+        float: Random delay between 0 and ``min(max_delay, base_delay * 2**attempt)``.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def is_retryable(error: Exception) -> bool:
+    """Decide whether a failed request is worth retrying.
+
+    Client errors other than timeouts, conflicts and throttling are not, since
+    resending the same request cannot succeed.
+    """
+    status_code = getattr(error, "status_code", None)
+    if not isinstance(status_code, int):
+        return True
+    return status_code in (408, 409, 429) or status_code >= 500
+
+
+class ResilientEmbeddingProvider(EmbeddingProvider):
+    """Provider wrapper adding adaptive timeouts, hedging, retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        latency: Optional[LatencyTracker] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = True,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        max_workers: int = 16,
+        retryable: Callable[[Exception], bool] = is_retryable,
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            provider (EmbeddingProvider): The provider to protect.
+            latency (Optional[LatencyTracker]): Latency tracker. Defaults to a new one.
+            breaker (Optional[CircuitBreaker]): Circuit breaker. Defaults to a new one.
+            hedge (bool): Send a duplicate request once the primary exceeds the
+                observed p95 latency. Defaults to True.
+            max_retries (int): Retries after a failed or timed-out attempt.
+            base_delay (float): Backoff ceiling of the first retry in seconds.
+            max_delay (float): Upper bound of the backoff ceiling in seconds.
+            max_workers (int): Threads available for in-flight and hedged requests.
+            retryable (Callable[[Exception], bool]): Decides which errors are retried.
+        """
+        self.provider = provider
+        self.name = provider.name
+        self.latency = latency or LatencyTracker()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="embedding-hedge"
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "attempts": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "rejected": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get counters for attempts, hedges, hedge wins, timeouts, retries and
+        requests rejected by the open circuit."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def embed(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int] = None,
+        as_array: bool = False
+    ) -> List[Sequence[float]]:
+        """Embed one batch of texts through the wrapped provider.
+
+        Raises:
+            EmbeddingError: If the circuit is open or every attempt failed.
+        """
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise EmbeddingError("Embedding provider circuit is open")
+            try:
+                result = self._attempt(texts, model, dimensions, as_array)
+            except Exception as e:
+                if not self.retryable(e):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise EmbeddingError(
+                        f"Embedding request failed after {attempt + 1} attempts: {str(e)}"
+                    )
+                self._count("retries")
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                logger.warning(f"Embedding attempt {attempt + 1} failed, retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+        raise EmbeddingError("Embedding request failed")
+
+    def _timed(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int],
+        as_array: bool,
+        timeout: float
+    ) -> List[Sequence[float]]:
+        start = time.monotonic()
+        provider = self.provider.with_timeout(timeout)
+        result = provider.embed(texts, model, dimensions=dimensions, as_array=as_array)
+        self.latency.record(time.monotonic() - start)
+        return result
+
+    def _attempt(
+        self,
+        texts: List[str],
+        model: str,
+        dimensions: Optional[int],
+        as_array: bool
+    ) -> List[Sequence[float]]:
+        """Run one attempt, hedging it once it is slower than the observed p95."""
+        self._count("attempts")
+        start = time.monotonic()
+        timeout = self.latency.timeout()
+        hedge_after = self.latency.hedge_delay() if self.hedge else None
+
+        primary = self._executor.submit(
+            self._timed, texts, model, dimensions, as_array, timeout
+        )
+        pending = {primary}
+        hedged: Optional[Future] = None
+        error: Optional[Exception] = None
+
+        while pending:
+            elapsed = time.monotonic() - start
+            if elapsed >= timeout:
+                break
+            wait_for = timeout - elapsed
+            if hedged is None and hedge_after is not None:
+                wait_for = min(wait_for, max(0.0, hedge_after - elapsed))
+
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedged:
+                    self._count("hedge_wins")
+                return result
+
+            if (
+                hedged is None
+                and hedge_after is not None
+                and pending
+                and time.monotonic() - start >= hedge_after
+            ):
+                self._count("hedges")
+                hedged = self._executor.submit(
+                    self._timed, texts, model, dimensions, as_array,
+                    max(0.0, timeout - (time.monotonic() - start))
+                )
+                pending.add(hedged)
+
+        if error is not None and not pending:
+            raise error
+        self._count("timeouts")
+        raise TimeoutError(f"Embedding request timed out after {timeout:.2f}s")
+
+    def close(self) -> None:
+        """Release the worker threads without waiting for abandoned requests."""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,138 @@
+"""Tests for the columnar archive module."""
+
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pytest
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.archive import (
+    archive_collection,
+    export_collection,
+    import_collection,
+    read_batches,
+)
+from eumas.database.schema import MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS
+
+
+def make_object(i, properties, vector=None, references=None, collection=MEMORY_CLASS):
+    """Build the i-th v4 result object."""
+    return Object(
+        uuid=uuid.UUID(int=i + 1),
+        metadata=MetadataReturn(),
+        properties=properties,
+        references={
+            name: _CrossReference._from(objects) for name, objects in (references or {}).items()
+        },
+        vector={"default": vector} if vector is not None else {},
+        collection=collection,
+    )
+
+
+def make_memories(count):
+    """Build memories, every third one without a vector."""
+    return [
+        make_object(i, {
+            "userPrompt": f"prompt {i}",
+            "contextTags": ["work"],
+            "timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "duration": 1.5,
+        }, vector=None if i % 3 == 2 else [0.5, float(i)])
+        for i in range(count)
+    ]
+
+
+def make_client(objects_by_collection, batch=None):
+    """Create a mock client that pages through the given objects."""
+    collections = {}
+    for name, objects in objects_by_collection.items():
+        def fetch_objects(after=None, limit=None, objects=objects, **kwargs):
+            start = 0 if after is None else [o.uuid for o in objects].index(after) + 1
+            return SimpleNamespace(objects=objects[start:start + limit])
+        collection = MagicMock()
+        collection.query.fetch_objects.side_effect = fetch_objects
+        collections[name] = collection
+
+    client = MagicMock()
+    client.collections.get.side_effect = collections.__getitem__
+    if batch is not None:
+        client.batch.fixed_size.return_value.__enter__.return_value = batch
+        client.batch.failed_objects = []
+    return client
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_memories_round_trip(tmp_path, extension):
+    """Test that properties, UUIDs and vectors survive an export and import."""
+    memories = make_memories(5)
+    path = str(tmp_path / f"memories{extension}")
+
+    report = export_collection(make_client({MEMORY_CLASS: memories}), MEMORY_CLASS, path,
+                               batch_rows=2)
+    assert report.rows == 5
+    assert report.bytes > 0
+    assert archive_collection(path) == MEMORY_CLASS
+
+    batch = MagicMock()
+    imported = import_collection(make_client({}, batch), path, batch_rows=2)
+
+    assert imported.submitted == 5
+    sent = [call.kwargs for call in batch.add_object.call_args_list]
+    assert [s["uuid"] for s in sent] == [str(m.uuid) for m in memories]
+    assert sent[1]["vector"] == [0.5, 1.0]
+    assert sent[2]["vector"] is None
+    assert sent[0]["properties"]["contextTags"] == ["work"]
+    assert sent[0]["properties"]["timestamp"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert "agentReply" not in sent[0]["properties"]
+
+
+def test_vectors_are_fixed_size_float32(tmp_path):
+    """Test the archived vector column type."""
+    path = str(tmp_path / "memories.parquet")
+    export_collection(make_client({MEMORY_CLASS: make_memories(3)}), MEMORY_CLASS, path)
+
+    vector_type = next(read_batches(path)).schema.field("vector").type
+    assert vector_type == pa.list_(pa.float32(), 2)
+
+
+def test_relations_keep_references(tmp_path):
+    """Test that references are archived as UUIDs and restored."""
+    memory = make_memories(1)[0]
+    relation = make_object(
+        10, {"archetype": "Ella-M", "relationshipStrength": 0.5},
+        references={"evaluatedMemory": [memory]}, collection=ARCHETYPE_MEMORY_RELATION_CLASS
+    )
+    path = str(tmp_path / "relations.arrow")
+    export_collection(make_client({ARCHETYPE_MEMORY_RELATION_CLASS: [relation]}),
+                      ARCHETYPE_MEMORY_RELATION_CLASS, path)
+
+    batch = MagicMock()
+    import_collection(make_client({}, batch), path)
+
+    sent = batch.add_object.call_args.kwargs
+    assert sent["collection"] == ARCHETYPE_MEMORY_RELATION_CLASS
+    assert sent["references"] == {"evaluatedMemory": str(memory.uuid)}
+    assert sent["properties"] == {"archetype": "Ella-M", "relationshipStrength": 0.5}
+
+
+def test_import_resumes_from_start(tmp_path):
+    """Test that start skips rows across record batches."""
+    memories = make_memories(5)
+    path = str(tmp_path / "memories.arrow")
+    export_collection(make_client({MEMORY_CLASS: memories}), MEMORY_CLASS, path, batch_rows=2)
+
+    batch = MagicMock()
+    report = import_collection(make_client({}, batch), path, start=3)
+
+    assert report.processed == 5
+    sent = [call.kwargs["uuid"] for call in batch.add_object.call_args_list]
+    assert sent == [str(m.uuid) for m in memories[3:]]
+
+
+def test_unknown_format(tmp_path):
+    """Test that unknown extensions are rejected."""
+    with pytest.raises(ValueError):
+        export_collection(MagicMock(), MEMORY_CLASS, str(tmp_path / "memories.csv"))
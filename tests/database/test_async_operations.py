@@ -0,0 +1,250 @@
+"""Tests for the async memory operations module."""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from weaviate.classes.config import ConsistencyLevel
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.async_operations import AsyncMemoryOperations, merge_perspectives
+from eumas.database.ingest import memory_uuid
+from eumas.database.schema import (
+    ArchetypeMemoryRelation,
+    Memory,
+    MEMORY_CLASS,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    ARCHETYPES,
+)
+from eumas.utils.errors import DatabaseError
+
+DELAY = 0.05
+
+
+def make_object(properties, references=None):
+    """Build a v4 result object."""
+    return Object(
+        uuid=uuid.uuid4(),
+        metadata=MetadataReturn(),
+        properties=properties,
+        references={
+            name: _CrossReference._from(objects) for name, objects in (references or {}).items()
+        },
+        vector={},
+        collection=MEMORY_CLASS,
+    )
+
+
+def slow_response(objects):
+    """Create an async query mock that takes DELAY seconds."""
+    async def fetch(**kwargs):
+        await asyncio.sleep(DELAY)
+        return SimpleNamespace(objects=objects)
+    return AsyncMock(side_effect=fetch)
+
+
+@pytest.fixture
+def client():
+    """Create a mock async client with one mock collection per class."""
+    client = MagicMock()
+    collections = {MEMORY_CLASS: MagicMock(), ARCHETYPE_MEMORY_RELATION_CLASS: MagicMock()}
+    client.collections.get.side_effect = collections.__getitem__
+    return client
+
+
+def test_perspective_fan_out_runs_concurrently(client):
+    """Test that all eight perspectives cost about one round trip."""
+    memory = make_object({"userPrompt": "hi"})
+    operations = AsyncMemoryOperations(client)
+    operations.relations.query.fetch_objects = slow_response([
+        make_object({"relationshipStrength": 0.5}, {"evaluatedMemory": [memory]})
+    ])
+
+    start = time.perf_counter()
+    results = asyncio.run(operations.get_all_perspectives(context_tag="work"))
+    elapsed = time.perf_counter() - start
+
+    assert list(results) == ARCHETYPES
+    assert operations.relations.query.fetch_objects.await_count == len(ARCHETYPES)
+    assert elapsed < DELAY * len(ARCHETYPES) / 2
+
+
+def test_max_concurrency_limits_in_flight_queries(client):
+    """Test that the semaphore caps concurrent queries."""
+    in_flight = []
+    peak = []
+
+    async def fetch(**kwargs):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return SimpleNamespace(objects=[])
+
+    operations = AsyncMemoryOperations(client, max_concurrency=2)
+    operations.relations.query.fetch_objects = AsyncMock(side_effect=fetch)
+    assert operations._semaphore is None  # created inside the running loop
+    asyncio.run(operations.get_all_perspectives())
+
+    assert max(peak) == 2
+
+
+def test_merge_perspectives():
+    """Test that relations for the same memory are merged across archetypes."""
+    memory = {"userPrompt": "hi", "_additional": {"id": "m1"}}
+    other = {"userPrompt": "yo", "_additional": {"id": "m2"}}
+    merged = merge_perspectives({
+        "Ella-M": [{"relationshipStrength": 0.4, "evaluatedMemory": [memory]}],
+        "Ella-O": [
+            {"relationshipStrength": 0.2, "evaluatedMemory": [memory]},
+            {"relationshipStrength": 0.9, "evaluatedMemory": [other]},
+        ],
+        "Ella-D": [{"relationshipStrength": 0.1, "evaluatedMemory": []}],
+    })
+
+    assert [entry["_additional"]["id"] for entry in merged] == ["m2", "m1"]
+    assert set(merged[1]["perspectives"]) == {"Ella-M", "Ella-O"}
+    assert "evaluatedMemory" not in merged[1]["perspectives"]["Ella-M"]
+
+
+def test_build_turn_context(client):
+    """Test that context, significance and perspectives are fetched together."""
+    memory = make_object({"userPrompt": "hi"})
+    operations = AsyncMemoryOperations(client)
+    operations.memories.query.fetch_objects = slow_response([memory])
+    operations.relations.query.fetch_objects = slow_response([
+        make_object({"relationshipStrength": 0.7}, {"evaluatedMemory": [memory]})
+    ])
+
+    start = time.perf_counter()
+    context = asyncio.run(operations.build_turn_context(["work"]))
+    elapsed = time.perf_counter() - start
+
+    assert context["context"][0]["userPrompt"] == "hi"
+    assert context["significant"][0]["relations"][0]["relationshipStrength"] == 0.7
+    assert set(context["perspectives"][0]["perspectives"]) == set(ARCHETYPES)
+    assert elapsed < DELAY * 4
+
+
+def test_get_memory_network(client):
+    """Test that the traversal stops once the frontier is empty."""
+    source = make_object({"userPrompt": "source"})
+    operations = AsyncMemoryOperations(client)
+    operations.memories.query.fetch_objects = AsyncMock(
+        return_value=SimpleNamespace(objects=[source])
+    )
+    operations.relations.query.fetch_objects = AsyncMock(return_value=SimpleNamespace(objects=[]))
+
+    network = asyncio.run(operations.get_memory_network(str(source.uuid), max_depth=3))
+
+    assert operations.relations.query.fetch_objects.await_count == 1
+    assert network.nodes[str(source.uuid)].userPrompt == "source"
+    assert network.edges == []
+
+
+def test_store_relations_batch_reports_failures(client):
+    """Test that failed batch objects raise instead of being dropped."""
+    operations = AsyncMemoryOperations(client)
+    operations.relations.data.insert_many = AsyncMock(return_value=SimpleNamespace(
+        has_errors=True,
+        errors={0: SimpleNamespace(message="bad reference")},
+        uuids={},
+    ))
+    operations.relations.query.fetch_objects = AsyncMock(return_value=SimpleNamespace(objects=[]))
+    operations.memories.query.fetch_objects = AsyncMock(return_value=SimpleNamespace(objects=[]))
+    relation = ArchetypeMemoryRelation(
+        "Ella-M", "note", 0.5, str(uuid.uuid4()), None, None, None, {}
+    )
+
+    with pytest.raises(DatabaseError):
+        asyncio.run(operations.store_relations_batch([relation]))
+
+
+def test_invalid_archetype(client):
+    """Test that invalid archetypes are rejected before querying."""
+    operations = AsyncMemoryOperations(client)
+    with pytest.raises(ValueError):
+        asyncio.run(operations.get_archetype_perspective("Ella-Z"))
+
+
+def test_store_evaluated_interaction(client):
+    """Test that memory and relations are written with shared IDs."""
+    operations = AsyncMemoryOperations(client)
+
+    async def insert_many(objects):
+        await asyncio.sleep(DELAY)
+        return SimpleNamespace(
+            has_errors=False, errors={}, uuids={i: o.uuid for i, o in enumerate(objects)}
+        )
+
+    operations.memories.data.insert_many = AsyncMock(side_effect=insert_many)
+    operations.relations.data.insert_many = AsyncMock(side_effect=insert_many)
+    operations.memories.data.update = AsyncMock()
+    operations.relations.query.fetch_objects = AsyncMock()
+    memory = Memory("hi", "yo", "s", "u", [], "calm", datetime(2024, 1, 1), 1.0, [0.1])
+    related = str(uuid.uuid4())
+    relations = [
+        ArchetypeMemoryRelation(archetype, "note", 0.5, None, None, None, None, {})
+        for archetype in ARCHETYPES if archetype != "Ella-O"
+    ]
+    relations.append(
+        ArchetypeMemoryRelation("Ella-O", "note", 0.5, None, related, "follows", 0.6, {})
+    )
+
+    memory_id, relation_ids = asyncio.run(
+        operations.store_evaluated_interaction(memory, relations)
+    )
+
+    # Significance travels with the memory instead of a read and an update
+    [stored] = operations.memories.data.insert_many.call_args.args[0]
+    assert stored.properties["significanceEllaO"] == 0.6
+    assert stored.properties["significanceArchetype"] == "Ella-O"
+    operations.relations.query.fetch_objects.assert_not_awaited()
+    operations.memories.data.update.assert_not_awaited()
+    assert memory_id == memory_uuid(memory)
+    assert len(set(relation_ids)) == len(ARCHETYPES)
+    sent = operations.relations.data.insert_many.call_args.args[0]
+    assert all(o.references["evaluatedMemory"] == memory_id for o in sent)
+
+
+def test_store_evaluated_interaction_skips_relations_of_failed_memory(client):
+    """Test that relations are only sent once their memory is stored."""
+    operations = AsyncMemoryOperations(client)
+    operations.memories.data.insert_many = AsyncMock(return_value=SimpleNamespace(
+        has_errors=True, errors={0: SimpleNamespace(message="boom")}, uuids={}
+    ))
+    operations.relations.data.insert_many = AsyncMock()
+    memory = Memory("hi", "yo", "s", "u", [], "calm", datetime(2024, 1, 1), 1.0, [0.1])
+    relations = [ArchetypeMemoryRelation("Ella-O", "note", 0.5, None, None, None, None, {})]
+
+    with pytest.raises(DatabaseError):
+        asyncio.run(operations.store_evaluated_interaction(memory, relations))
+    operations.relations.data.insert_many.assert_not_awaited()
+
+
+def test_store_evaluated_interaction_consistency_level(client):
+    """Test that the consistency level applies to both writes."""
+    operations = AsyncMemoryOperations(client)
+
+    async def insert_many(objects):
+        return SimpleNamespace(
+            has_errors=False, errors={}, uuids={i: o.uuid for i, o in enumerate(objects)}
+        )
+
+    for collection in (operations.memories, operations.relations):
+        collection.with_consistency_level.return_value.data.insert_many = AsyncMock(
+            side_effect=insert_many
+        )
+    memory = Memory("hi", "yo", "s", "u", [], "calm", datetime(2024, 1, 1), 1.0, [0.1])
+    relations = [ArchetypeMemoryRelation("Ella-O", "note", 0.5, None, None, None, None, {})]
+
+    asyncio.run(operations.store_evaluated_interaction(
+        memory, relations, consistency_level=ConsistencyLevel.QUORUM
+    ))
+    for collection in (operations.memories, operations.relations):
+        collection.with_consistency_level.assert_called_once_with(ConsistencyLevel.QUORUM)
+        collection.with_consistency_level.return_value.data.insert_many.assert_awaited_once()
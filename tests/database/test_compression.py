@@ -0,0 +1,95 @@
+"""Tests for the vector compression module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from eumas.database.compression import (
+    COMPRESSION_PROFILES,
+    estimate_vector_bytes,
+    get_compression_config,
+)
+from eumas.database.connection import DatabaseConnection
+from eumas.database.schema import MEMORY_CLASS, get_memory_class_schema
+
+
+URL = "http://localhost:8080"
+
+
+@pytest.fixture
+def mock_client():
+    """Create a mock v4 Weaviate client."""
+    with patch("weaviate.WeaviateClient") as mock:
+        yield mock.return_value
+
+
+def test_no_compression():
+    """Test that the default schema stays uncompressed."""
+    assert get_compression_config() == {}
+    assert get_compression_config("none") == {}
+    index_config = get_memory_class_schema()["vectorIndexConfig"]
+    assert not any(profile in index_config for profile in COMPRESSION_PROFILES)
+
+
+@pytest.mark.parametrize("profile", ["pq", "bq", "sq"])
+def test_compression_profiles(profile):
+    """Test that each profile enables its quantizer in the Memory schema."""
+    index_config = get_memory_class_schema(compression=profile)["vectorIndexConfig"]
+    assert index_config[profile]["enabled"] is True
+    assert index_config["distance"] == "cosine"
+
+
+def test_compression_options_override_defaults():
+    """Test quantizer setting overrides."""
+    config = get_compression_config("bq", rescoreLimit=500)
+    assert config["bq"]["rescoreLimit"] == 500
+    assert config["bq"]["cache"] is True
+
+
+def test_invalid_profile():
+    """Test that unknown profiles are rejected."""
+    with pytest.raises(ValueError):
+        get_compression_config("lz4")
+
+
+def test_estimate_vector_bytes():
+    """Test per-vector memory estimates."""
+    assert estimate_vector_bytes(None, 1536) == 6144
+    assert estimate_vector_bytes("sq", 1536) == 1536
+    assert estimate_vector_bytes("bq", 1536) == 192
+    assert estimate_vector_bytes("pq", 1536, segments=256) == 256
+
+
+def test_create_schema_with_compression(mock_client):
+    """Test creating the schema with a compression profile."""
+    mock_client.collections.exists.return_value = False
+    DatabaseConnection(url=URL).create_schema(compression="bq")
+    memory_schema = mock_client.collections.create_from_dict.call_args_list[0].args[0]
+    assert memory_schema["vectorIndexConfig"]["bq"]["enabled"] is True
+
+
+def test_enable_compression_migration(mock_client):
+    """Test enabling compression on an existing collection."""
+    connection = DatabaseConnection(url=URL)
+    connection.enable_compression("pq", segments=384)
+
+    mock_client.collections.get.assert_called_with(MEMORY_CLASS)
+    update = mock_client.collections.get.return_value.config.update
+    quantizer = update.call_args.kwargs["vector_index_config"].quantizer
+    assert quantizer.segments == 384
+    assert quantizer.centroids == 256
+
+    with pytest.raises(ValueError):
+        connection.enable_compression("bq")
+
+
+def test_get_compression_profile(mock_client):
+    """Test reading the enabled profile back from the collection config."""
+    export_config = mock_client.collections.export_config.return_value
+    connection = DatabaseConnection(url=URL)
+
+    export_config.to_dict.return_value = get_memory_class_schema(compression="sq")
+    assert connection.get_compression_profile() == "sq"
+
+    export_config.to_dict.return_value = get_memory_class_schema()
+    assert connection.get_compression_profile() == "none"
@@ -1,111 +1,129 @@
 """Tests for the database connection module."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 from weaviate.exceptions import WeaviateBaseError
 
 from eumas.database.connection import DatabaseConnection
-from eumas.database.schema import MEMORY_CLASS_NAME, RELATIONSHIP_CLASS_NAME
+from eumas.database.schema import MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS
+
+URL = "http://localhost:8080"
 
 
 @pytest.fixture
 def mock_client():
-    """Create a mock Weaviate client."""
-    with patch("weaviate.Client") as mock:
+    """Create a mock v4 Weaviate client."""
+    with patch("weaviate.WeaviateClient") as mock:
         yield mock.return_value
 
 
 def test_database_connection_initialization(mock_client):
-    """Test database connection initialization."""
-    connection = DatabaseConnection()
-    assert connection.client == mock_client
+    """Test that the connection builds and connects a v4 client."""
+    with patch("weaviate.WeaviateClient") as client_class:
+        connection = DatabaseConnection(url=URL, grpc_port=50052)
+        params = client_class.call_args.kwargs["connection_params"]
+
+    assert connection.client is client_class.return_value
+    connection.client.connect.assert_called_once()
+    assert params.http.host == "localhost"
+    assert params.http.port == 8080
+    assert params.grpc.port == 50052
+
+
+def test_close(mock_client):
+    """Test that closing and leaving the context manager close the client."""
+    with DatabaseConnection(url=URL):
+        pass
+    mock_client.close.assert_called_once()
 
 
 def test_health_check_success(mock_client):
     """Test successful health check."""
     mock_client.is_ready.return_value = True
-    connection = DatabaseConnection()
+    connection = DatabaseConnection(url=URL)
     assert connection.is_healthy() is True
 
 
 def test_health_check_failure(mock_client):
     """Test failed health check."""
     mock_client.is_ready.side_effect = WeaviateBaseError("Connection failed")
-    connection = DatabaseConnection()
+    connection = DatabaseConnection(url=URL)
     assert connection.is_healthy() is False
 
 
 def test_create_schema_success(mock_client):
     """Test successful schema creation."""
-    # Mock schema existence checks
-    mock_client.schema.exists.side_effect = [False, False]
-    
-    connection = DatabaseConnection()
+    mock_client.collections.exists.return_value = False
+
+    connection = DatabaseConnection(url=URL)
     connection.create_schema()
-    
-    # Verify schema creation calls
-    assert mock_client.schema.create_class.call_count == 2
-    create_calls = mock_client.schema.create_class.call_args_list
-    memory_schema = create_calls[0][0][0]
-    relationship_schema = create_calls[1][0][0]
-    
-    assert memory_schema["class"] == MEMORY_CLASS_NAME
-    assert relationship_schema["class"] == RELATIONSHIP_CLASS_NAME
+
+    create_calls = mock_client.collections.create_from_dict.call_args_list
+    assert [call.args[0]["class"] for call in create_calls] == [
+        MEMORY_CLASS,
+        ARCHETYPE_MEMORY_RELATION_CLASS,
+    ]
 
 
 def test_create_schema_already_exists(mock_client):
-    """Test schema creation when classes already exist."""
-    # Mock schema existence checks
-    mock_client.schema.exists.return_value = True
-    
-    connection = DatabaseConnection()
+    """Test schema creation when collections already exist."""
+    mock_client.collections.exists.return_value = True
+
+    connection = DatabaseConnection(url=URL)
     connection.create_schema()
-    
-    # Verify no creation attempts were made
-    mock_client.schema.create_class.assert_not_called()
+
+    mock_client.collections.create_from_dict.assert_not_called()
 
 
 def test_delete_schema_success(mock_client):
-    """Test successful schema deletion."""
-    # Mock schema existence checks
-    mock_client.schema.exists.return_value = True
-    
-    connection = DatabaseConnection()
+    """Test that relations are deleted before the memories they reference."""
+    mock_client.collections.exists.return_value = True
+
+    connection = DatabaseConnection(url=URL)
     connection.delete_schema()
-    
-    # Verify deletion calls
-    assert mock_client.schema.delete_class.call_count == 2
-    delete_calls = [call[0][0] for call in mock_client.schema.delete_class.call_args_list]
-    assert RELATIONSHIP_CLASS_NAME in delete_calls
-    assert MEMORY_CLASS_NAME in delete_calls
+
+    delete_calls = [call.args[0] for call in mock_client.collections.delete.call_args_list]
+    assert delete_calls == [ARCHETYPE_MEMORY_RELATION_CLASS, MEMORY_CLASS]
 
 
 def test_delete_schema_not_exists(mock_client):
-    """Test schema deletion when classes don't exist."""
-    # Mock schema existence checks
-    mock_client.schema.exists.return_value = False
-    
-    connection = DatabaseConnection()
+    """Test schema deletion when collections don't exist."""
+    mock_client.collections.exists.return_value = False
+
+    connection = DatabaseConnection(url=URL)
     connection.delete_schema()
-    
-    # Verify no deletion attempts were made
-    mock_client.schema.delete_class.assert_not_called()
+
+    mock_client.collections.delete.assert_not_called()
 
 
 def test_reset_schema(mock_client):
     """Test schema reset."""
-    # Mock schema existence checks for delete and create operations
-    mock_client.schema.exists.side_effect = [
-        True,   # Memory class exists (delete)
-        True,   # Relationship class exists (delete)
-        False,  # Memory class doesn't exist (create)
-        False,  # Relationship class doesn't exist (create)
-    ]
-    
-    connection = DatabaseConnection()
+    mock_client.collections.exists.side_effect = [True, True, False, False]
+
+    connection = DatabaseConnection(url=URL)
     connection.reset_schema()
-    
-    # Verify delete and create were called
-    assert mock_client.schema.delete_class.call_count == 2
-    assert mock_client.schema.create_class.call_count == 2
+
+    assert mock_client.collections.delete.call_count == 2
+    assert mock_client.collections.create_from_dict.call_count == 2
+
+
+def test_get_batch_client(mock_client):
+    """Test that batches go through the v4 fixed-size batcher."""
+    connection = DatabaseConnection(url=URL)
+    batch = connection.get_batch_client(batch_size=250)
+
+    mock_client.batch.fixed_size.assert_called_once_with(batch_size=250)
+    assert batch is mock_client.batch.fixed_size.return_value
+
+
+def test_legacy_client_is_deprecated(mock_client):
+    """Test the v3 compatibility client."""
+    connection = DatabaseConnection(url=URL)
+    with patch("weaviate.Client") as legacy_class:
+        with pytest.deprecated_call():
+            legacy = connection.legacy_client
+        with pytest.deprecated_call():
+            assert connection.legacy_client is legacy
+
+    legacy_class.assert_called_once_with(url=URL)
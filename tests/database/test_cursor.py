@@ -0,0 +1,146 @@
+"""Tests for the cursor iteration module."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from weaviate.classes.query import Filter
+from weaviate.collections.classes.internal import MetadataReturn, Object
+
+from eumas.database.cursor import iter_objects, iter_sorted
+from eumas.database.operations import MEMORY_FIELDS, MemoryOperations
+from eumas.database.schema import (
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    MEMORY_CLASS,
+    get_archetype_memory_relation_schema,
+    get_memory_class_schema,
+)
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_objects(creation_seconds):
+    """Build memories created the given number of seconds after EPOCH, in order."""
+    return [
+        Object(
+            uuid=uuid.UUID(int=i + 1),
+            metadata=MetadataReturn(creation_time=EPOCH + timedelta(seconds=second)),
+            properties={"userPrompt": f"prompt {i}"},
+            references=None,
+            vector={"default": [float(i)]},
+            collection=MEMORY_CLASS,
+        )
+        for i, second in enumerate(creation_seconds)
+    ]
+
+
+def uuid_pages(objects):
+    """Serve objects like the ``after`` cursor does."""
+    def fetch_objects(after=None, limit=None, **kwargs):
+        start = 0 if after is None else next(
+            i + 1 for i, obj in enumerate(objects) if obj.uuid == after
+        )
+        return SimpleNamespace(objects=objects[start:start + limit])
+    return fetch_objects
+
+
+def keyset_pages(objects, calls):
+    """Serve objects sorted by creation time, honouring the boundary and offset."""
+    def fetch_objects(filters=None, offset=None, limit=None, **kwargs):
+        calls.append({"filters": filters, "offset": offset})
+        boundary = getattr(filters, "filters", [None])[-1]
+        if getattr(boundary, "target", None) != "_creationTimeUnix":
+            boundary = None
+        matching = [
+            obj for obj in objects
+            if boundary is None or obj.metadata.creation_time >= boundary.value
+        ]
+        start = offset or 0
+        return SimpleNamespace(objects=matching[start:start + limit])
+    return fetch_objects
+
+
+def test_unfiltered_scan_follows_uuid_cursor():
+    """Test that every object is yielded once across full and partial pages."""
+    objects = make_objects(range(7))
+    collection = MagicMock()
+    collection.query.fetch_objects.side_effect = uuid_pages(objects)
+
+    assert list(iter_objects(collection, page_size=3)) == objects
+    afters = [c.kwargs["after"] for c in collection.query.fetch_objects.call_args_list]
+    assert afters == [None, objects[2].uuid, objects[5].uuid]
+
+
+def test_filtered_scan_handles_timestamp_ties():
+    """Test that objects sharing a creation time across pages are neither lost nor repeated."""
+    objects = make_objects([0, 1, 1, 1, 1, 2, 3])
+    calls = []
+    collection = MagicMock()
+    collection.query.fetch_objects.side_effect = keyset_pages(objects, calls)
+
+    filters = Filter.by_property("userPrompt").like("prompt*")
+    result = list(iter_objects(collection, filters=filters, page_size=2))
+
+    assert result == objects
+    # Offsets only count the objects already seen at the boundary timestamp
+    assert [c["offset"] for c in calls] == [None, 1, 3, 1]
+
+
+def test_scan_is_lazy():
+    """Test that pages are fetched only as the iterator is consumed."""
+    collection = MagicMock()
+    collection.query.fetch_objects.side_effect = uuid_pages(make_objects(range(10)))
+
+    iterator = iter_objects(collection, page_size=2)
+    next(iterator)
+    assert collection.query.fetch_objects.call_count == 1
+
+
+def test_sorted_scan_keeps_query_order():
+    """Test that offset paging returns every match in the query's order."""
+    objects = make_objects(range(7))[::-1]
+    calls = []
+
+    def fetch_objects(offset=None, limit=None, **kwargs):
+        calls.append((offset, kwargs["sort"]))
+        start = offset or 0
+        return SimpleNamespace(objects=objects[start:start + limit])
+
+    collection = MagicMock()
+    collection.query.fetch_objects.side_effect = fetch_objects
+
+    assert list(iter_sorted(collection, page_size=3, sort="strength")) == objects
+    assert calls == [(None, "strength"), (3, "strength"), (6, "strength")]
+
+
+@pytest.mark.parametrize(
+    "schema", [get_memory_class_schema(), get_archetype_memory_relation_schema()]
+)
+def test_schema_indexes_creation_time(schema):
+    """Test that both collections index the creation time filtered scans page on."""
+    assert schema["invertedIndexConfig"]["indexTimestamps"] is True
+
+
+def test_invalid_page_size():
+    """Test that a page size below one is rejected."""
+    with pytest.raises(ValueError):
+        list(iter_objects(MagicMock(), page_size=0))
+
+
+def test_iter_memories_by_timerange():
+    """Test that the filtered iterator yields legacy dicts with the projection."""
+    client = MagicMock()
+    collections = {MEMORY_CLASS: MagicMock(), ARCHETYPE_MEMORY_RELATION_CLASS: MagicMock()}
+    client.collections.get.side_effect = collections.__getitem__
+    operations = MemoryOperations(client)
+    operations.memories.query.fetch_objects.side_effect = keyset_pages(make_objects(range(3)), [])
+
+    memories = list(operations.iter_memories_by_timerange(
+        datetime(2024, 1, 1), datetime(2024, 2, 1), page_size=2
+    ))
+
+    assert [m["userPrompt"] for m in memories] == ["prompt 0", "prompt 1", "prompt 2"]
+    kwargs = operations.memories.query.fetch_objects.call_args.kwargs
+    assert kwargs["return_properties"] == MEMORY_FIELDS
@@ -0,0 +1,264 @@
+"""Tests for the memory decay module."""
+
+import operator
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.decay import (
+    DecayModel,
+    Reinforcements,
+    collect_reinforcements,
+    decay_updates,
+    load_decay_modifiers,
+    run_decay,
+)
+from eumas.database.schema import (
+    ARCHETYPES,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    MEMORY_CLASS,
+    get_decay_properties,
+    get_memory_class_schema,
+)
+
+METADATA_PATH = Path(__file__).parents[2] / "docs_startup" / "archetype_metadata.yaml"
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+NO_REINFORCEMENTS = Reinforcements({}, np.zeros(0, dtype=np.int64), np.zeros(0))
+
+
+def make_memory(properties=None):
+    """Build a memory result object."""
+    return Object(
+        uuid=uuid.uuid4(), metadata=MetadataReturn(), properties=properties or {},
+        references=None, vector={}, collection=MEMORY_CLASS,
+    )
+
+
+def make_relation(related, created):
+    """Build a relation recalling a memory at a creation time."""
+    return Object(
+        uuid=uuid.uuid4(),
+        metadata=MetadataReturn(creation_time=created),
+        properties={},
+        references={"relatedMemory": _CrossReference._from([related])},
+        vector={},
+        collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+    )
+
+
+def test_load_decay_modifiers():
+    """Test that every archetype's modifier is read, whatever its key prefix."""
+    modifiers = load_decay_modifiers(str(METADATA_PATH))
+
+    assert set(modifiers) == set(ARCHETYPES)
+    assert modifiers["Ella-M"] == 1.5
+    assert modifiers["Ella-D"] == 0.7
+
+
+def test_load_decay_modifiers_rejects_unknown_archetype(tmp_path):
+    """Test that a modifier for an unknown archetype is an error."""
+    path = tmp_path / "metadata.yaml"
+    path.write_text(
+        "archetypes_metadata:\n"
+        "  - name: Ella-Z\n"
+        "    prioritization:\n"
+        "      - time_decay_modifier: 1.1\n"
+    )
+    with pytest.raises(ValueError):
+        load_decay_modifiers(str(path))
+
+
+def test_schema_has_decay_properties():
+    """Test that the decay inputs are part of the Memory schema."""
+    names = {prop["name"] for prop in get_memory_class_schema()["properties"]}
+    assert {prop["name"] for prop in get_decay_properties()} <= names
+
+
+def test_priorities_halve_per_weighted_half_life():
+    """Test decay by age, archetype weights and reinforcement boost."""
+    model = DecayModel({"Ella-M": 2.0}, half_life_days=10.0, reinforcement_weight=0.5)
+    day = 86400.0
+    weights = np.zeros((3, len(ARCHETYPES)))
+    weights[1, ARCHETYPES.index("Ella-M")] = 0.8
+
+    priorities = model.priorities(
+        base=np.full(3, 0.8),
+        anchor=np.full(3, -10 * day),
+        reinforcements=np.array([0, 0, np.e - 1]),
+        weights=weights,
+        now=0.0,
+    )
+
+    np.testing.assert_allclose(priorities, [0.4, 0.8 * 2 ** -0.5, 0.6])
+    with pytest.raises(ValueError):
+        DecayModel(half_life_days=0)
+
+
+def test_collect_reinforcements():
+    """Test counting recalls and keeping the latest one per memory."""
+    first, second = make_memory(), make_memory()
+    early, late = NOW - timedelta(days=2), NOW - timedelta(days=1)
+
+    reinforcements = collect_reinforcements([
+        make_relation(first, late),
+        make_relation(first, early),
+        make_relation(second, early),
+    ])
+
+    row = reinforcements.rows[str(first.uuid)]
+    assert reinforcements.counts[row] == 2
+    assert reinforcements.latest[row] == late.timestamp()
+    assert reinforcements.counts[reinforcements.rows[str(second.uuid)]] == 1
+
+
+def test_decay_updates_write_only_moved_priorities():
+    """Test that stable priorities are skipped and base priorities are initialized."""
+    model = DecayModel(half_life_days=10.0)
+    fresh = make_memory({"timestamp": NOW, "memoryPriority": 0.5, "basePriority": 0.5})
+    old = make_memory({
+        "timestamp": NOW - timedelta(days=10), "memoryPriority": 0.5, "basePriority": 0.5
+    })
+    legacy = make_memory({"timestamp": NOW, "memoryPriority": 0.7})
+
+    updates = dict(decay_updates(
+        [fresh, old, legacy], model, NO_REINFORCEMENTS, NOW.timestamp()
+    ))
+
+    assert str(fresh.uuid) not in updates
+    assert updates[str(old.uuid)] == {"memoryPriority": pytest.approx(0.25)}
+    assert updates[str(legacy.uuid)] == {"memoryPriority": 0.7, "basePriority": 0.7}
+
+
+def test_decay_updates_apply_reinforcements():
+    """Test that a recall restarts decay and raises the stored count."""
+    model = DecayModel(half_life_days=10.0, reinforcement_weight=0.0)
+    memory = make_memory({
+        "timestamp": NOW - timedelta(days=20),
+        "memoryPriority": 0.2,
+        "basePriority": 0.8,
+        "reinforcementCount": 1,
+    })
+    reinforcements = collect_reinforcements([make_relation(memory, NOW - timedelta(days=10))])
+
+    [(memory_id, properties)] = decay_updates([memory], model, reinforcements, NOW.timestamp())
+
+    assert memory_id == str(memory.uuid)
+    assert properties["memoryPriority"] == pytest.approx(0.4)
+    assert properties["reinforcementCount"] == 2
+    assert properties["lastReinforced"] == NOW - timedelta(days=10)
+
+
+def make_client(memories, relations):
+    """Create a mock client whose collections return fixed pages."""
+    memory_collection = MagicMock()
+    memory_collection.config.get.return_value = SimpleNamespace(properties=[])
+    memory_collection.query.fetch_objects.return_value = SimpleNamespace(objects=memories)
+    relation_collection = MagicMock()
+    relation_collection.query.fetch_objects.return_value = SimpleNamespace(objects=relations)
+    client = MagicMock()
+    client.collections.get.side_effect = {
+        MEMORY_CLASS: memory_collection, ARCHETYPE_MEMORY_RELATION_CLASS: relation_collection
+    }.__getitem__
+    return client, memory_collection
+
+
+def test_run_decay_full_run():
+    """Test that a full run adds the properties and updates the decayed memories."""
+    old = make_memory({
+        "timestamp": NOW - timedelta(days=30), "memoryPriority": 0.5, "basePriority": 0.5
+    })
+    client, memories = make_client([old, make_memory({
+        "timestamp": NOW, "memoryPriority": 0.5, "basePriority": 0.5
+    })], [])
+
+    result = run_decay(client, DecayModel(), page_size=10, max_workers=2, now=NOW)
+
+    assert result["memories"] == 2
+    assert result["updated"] == 1
+    assert result["now"] == NOW.isoformat()
+    assert memories.config.add_property.call_count == len(get_decay_properties())
+    assert memories.data.update.call_args.kwargs["uuid"] == str(old.uuid)
+
+
+def test_run_decay_incremental_fetches_skipped_reinforced_memories():
+    """Test that an incremental run filters the scan and fetches reinforced memories."""
+    faded = make_memory({
+        "timestamp": NOW - timedelta(days=300), "memoryPriority": 0.0, "basePriority": 0.5
+    })
+    client, memories = make_client([], [make_relation(faded, NOW - timedelta(hours=1))])
+    memories.query.fetch_objects.side_effect = [
+        SimpleNamespace(objects=[]), SimpleNamespace(objects=[faded])
+    ]
+
+    result = run_decay(
+        client, DecayModel(), since=NOW - timedelta(days=1), page_size=10, max_workers=2,
+        now=NOW
+    )
+
+    scan, fetch = memories.query.fetch_objects.call_args_list
+    assert scan.kwargs["filters"] is not None
+    assert fetch.kwargs["limit"] == 1
+    assert result["reinforced"] == 1
+    properties = memories.data.update.call_args.kwargs["properties"]
+    assert properties["reinforcementCount"] == 1
+    assert properties["memoryPriority"] > 0.5
+
+
+def matches_creation_time(filters, created):
+    """Evaluate the creation-time conditions of an AND filter like the server."""
+    if hasattr(filters, "filters"):
+        return all(matches_creation_time(part, created) for part in filters.filters)
+    if filters.target != "_creationTimeUnix":
+        return True
+    compare = {"GreaterThanEqual": operator.ge, "LessThan": operator.lt}[filters.operator.value]
+    return compare(created, filters.value)
+
+
+def test_run_decay_counts_relation_at_run_time_once():
+    """Test that consecutive runs read non-overlapping relation windows."""
+    memory = make_memory({"timestamp": NOW, "memoryPriority": 0.5, "basePriority": 0.5})
+    relation = make_relation(memory, NOW)
+    client, memories = make_client([], [])
+    client.collections.get(ARCHETYPE_MEMORY_RELATION_CLASS).query.fetch_objects.side_effect = (
+        lambda **kwargs: SimpleNamespace(
+            objects=[relation] if matches_creation_time(kwargs["filters"], NOW) else []
+        )
+    )
+    memories.query.fetch_objects.return_value = SimpleNamespace(objects=[memory])
+
+    first = run_decay(
+        client, DecayModel(), since=NOW - timedelta(days=1), page_size=10, max_workers=2,
+        now=NOW
+    )
+    second = run_decay(
+        client, DecayModel(), since=datetime.fromisoformat(first["now"]), page_size=10,
+        max_workers=2, now=NOW + timedelta(hours=1)
+    )
+
+    assert first["relations"] + second["relations"] == 1
+    assert second["reinforced"] == 1
+
+
+def test_run_decay_full_runs_are_idempotent():
+    """Test that full runs replace the stored count instead of adding to it."""
+    memory = make_memory({
+        "timestamp": NOW - timedelta(days=30), "memoryPriority": 0.5, "basePriority": 0.5
+    })
+    relations = [make_relation(memory, NOW - timedelta(days=day)) for day in (3, 2, 1)]
+    client, memories = make_client([memory], relations)
+    memories.data.update.side_effect = (
+        lambda uuid, properties: memory.properties.update(properties)
+    )
+
+    for _ in range(3):
+        run_decay(client, DecayModel(), page_size=10, max_workers=2, now=NOW)
+        assert memory.properties["reinforcementCount"] == 3
+
+    assert memory.properties["lastReinforced"] == NOW - timedelta(days=1)
+    assert memories.data.update.call_count == 1
@@ -0,0 +1,141 @@
+"""Tests for the in-process relation graph index."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.graph_index import GraphIndex
+from eumas.database.schema import ARCHETYPE_MEMORY_RELATION_CLASS, MEMORY_CLASS
+
+
+@pytest.fixture
+def graph():
+    """Build a small index: a triangle a-b-c and a separate pair d-e."""
+    graph = GraphIndex(capacity=2)
+    graph.add_edge("r1", "a", "b", 0.9, "Ella-M", "follows")
+    graph.add_edge("r2", "b", "c", 0.4, "Ella-O")
+    graph.add_edge("r3", "c", "a", 0.8, "Ella-M", "follows")
+    graph.add_edge("r4", "d", "e", 0.7, "Ella-D", "contrasts")
+    return graph
+
+
+def make_node():
+    """Build a referenced memory with only a UUID."""
+    return Object(
+        uuid=uuid.uuid4(), metadata=MetadataReturn(), properties={}, references=None,
+        vector={}, collection=MEMORY_CLASS,
+    )
+
+
+def test_neighbors(graph):
+    """Test neighbours by direction, strongest first, with filters."""
+    assert graph.neighbors("b") == [("c", 0.4)]
+    assert graph.neighbors("b", "in") == [("a", 0.9)]
+    assert graph.neighbors("b", "both") == [("a", 0.9), ("c", 0.4)]
+    assert graph.neighbors("a", "both", archetype="Ella-M") == [("b", 0.9), ("c", 0.8)]
+    assert graph.neighbors("a", "both", min_strength=0.85) == [("b", 0.9)]
+    assert graph.neighbors("unknown") == []
+    assert graph.strongest("a", k=1) == [("b", 0.9)]
+
+    with pytest.raises(ValueError):
+        graph.neighbors("a", "sideways")
+
+
+def test_add_edge_replaces_and_skips(graph):
+    """Test that rewriting a relation replaces its edge and unrelated ones are skipped."""
+    assert graph.add_edge("r2", "b", "c", 0.6, "Ella-O")
+    assert not graph.add_edge("r5", "b", None, None, "Ella-M")
+
+    assert graph.edge_count == 4
+    assert graph.neighbors("b") == [("c", 0.6)]
+
+
+@pytest.mark.parametrize("query", ["neighbors", "traverse"])
+def test_memory_added_after_snapshot(graph, query):
+    """Test that a memory added after the CSR snapshot has no row in it."""
+    build = graph.csr
+
+    def csr_then_write(reverse=False):
+        snapshot = build(reverse)
+        graph.add_edge("late", "late-memory", "a", 0.5)  # a concurrent writer
+        return snapshot
+
+    graph.csr = csr_then_write
+    assert not getattr(graph, query)("late-memory")
+
+
+def test_traverse(graph):
+    """Test hop distances with and without strength pruning."""
+    assert graph.traverse("a", max_depth=1) == {"a": 0, "b": 1, "c": 1}
+    assert graph.traverse("b", max_depth=2, min_strength=0.5) == {"b": 0, "a": 1, "c": 2}
+    assert graph.traverse("b", max_depth=2, min_strength=0.5, direction="out") == {"b": 0}
+    assert graph.traverse("unknown") == {}
+
+
+def test_components(graph):
+    """Test connected clusters, largest first."""
+    assert [sorted(group) for group in graph.components()] == [["a", "b", "c"], ["d", "e"]]
+    assert [sorted(group) for group in graph.components(min_strength=0.85)] == [
+        ["a", "b"], ["c"], ["d"], ["e"]
+    ]
+
+
+def test_pagerank(graph):
+    """Test that scores sum to one and favour memories pointed to by strong edges."""
+    ranks = graph.pagerank()
+
+    assert sum(ranks.values()) == pytest.approx(1.0)
+    assert ranks["e"] > ranks["d"]
+    assert ranks["a"] > ranks["e"]
+    assert GraphIndex().pagerank() == {}
+
+
+def test_remove_edge(graph):
+    """Test that removed relations disappear from every query."""
+    assert graph.remove_edge("r4")
+    assert not graph.remove_edge("r4")
+
+    assert graph.edge_count == 3
+    assert graph.neighbors("d", "both") == []
+
+
+def test_save_and_load(graph, tmp_path):
+    """Test that an index round-trips through an npz file."""
+    graph.remove_edge("r1")
+    path = str(tmp_path / "graph.npz")
+    graph.save(path)
+
+    loaded = GraphIndex.load(path)
+
+    assert loaded.edge_count == 3
+    assert loaded.neighbors("a", "both") == graph.neighbors("a", "both")
+    assert loaded.relationship_types == ("follows", "contrasts")
+    loaded.add_edge("r6", "e", "a", 0.5)
+    assert loaded.traverse("d", max_depth=3) == {"d": 0, "e": 1, "a": 2, "c": 3}
+
+
+def test_from_collection():
+    """Test that the index is bootstrapped from a cursor scan."""
+    source, target = make_node(), make_node()
+    relation = Object(
+        uuid=uuid.uuid4(),
+        metadata=MetadataReturn(),
+        properties={"relationshipStrength": 0.7, "archetype": "Ella-M", "relationshipType": None},
+        references={
+            "evaluatedMemory": _CrossReference._from([source]),
+            "relatedMemory": _CrossReference._from([target]),
+        },
+        vector={},
+        collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+    )
+    collection = MagicMock()
+    collection.query.fetch_objects.return_value = SimpleNamespace(objects=[relation])
+
+    graph = GraphIndex.from_collection(collection, page_size=10)
+
+    assert graph.neighbors(str(source.uuid)) == [(str(target.uuid), 0.7)]
+    references = collection.query.fetch_objects.call_args.kwargs["return_references"]
+    assert {ref.link_on for ref in references} == {"evaluatedMemory", "relatedMemory"}
@@ -0,0 +1,159 @@
+"""Tests for the streaming ingestion module."""
+
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from eumas.database.ingest import StreamingIngestor, memory_uuid, relation_uuid
+from eumas.database.operations import MemoryOperations
+from eumas.database.schema import ArchetypeMemoryRelation, Memory, MEMORY_CLASS
+from eumas.utils.errors import DatabaseError
+
+
+class FakeBatch:
+    """Records added objects and fails the UUIDs it is told to."""
+
+    def __init__(self, fail=()):
+        self.objects = []
+        self.fail = set(fail)
+        self.failed_objects = []
+
+    @property
+    def number_errors(self):
+        return len(self.failed_objects)
+
+    def add_object(self, **kwargs):
+        self.objects.append(kwargs)
+        if kwargs["uuid"] in self.fail:
+            self.failed_objects.append(
+                SimpleNamespace(message="invalid", original_uuid=uuid.UUID(kwargs["uuid"]))
+            )
+        return kwargs["uuid"]
+
+
+def make_client(batch):
+    """Create a mock v4 client whose batcher is ``batch``."""
+    client = MagicMock()
+    client.batch.fixed_size.return_value.__enter__.return_value = batch
+    client.batch.failed_objects = batch.failed_objects
+    return client
+
+
+def make_memory(i, **overrides):
+    """Build the i-th Memory instance."""
+    values = dict(
+        user_prompt=f"prompt {i}",
+        agent_reply="reply",
+        session_id="session-1",
+        user_id="user-1",
+        context_tags=[],
+        tone="calm",
+        timestamp=datetime(2024, 1, 1, 12, 0),
+        duration=1.0,
+        vector=[float(i)],
+    )
+    values.update(overrides)
+    return Memory(**values)
+
+
+def make_relation(evaluated_id, archetype="Ella-M"):
+    """Build an ArchetypeMemoryRelation instance."""
+    return ArchetypeMemoryRelation(archetype, "note", 0.5, evaluated_id, None, None, None, {})
+
+
+def test_memory_uuid_is_deterministic():
+    """Test that identical interactions share a UUID and different ones do not."""
+    assert memory_uuid(make_memory(1)) == memory_uuid(make_memory(1))
+    assert memory_uuid(make_memory(1)) != memory_uuid(make_memory(2))
+    # Naive timestamps are UTC, so both spellings identify the same interaction
+    aware = make_memory(1, timestamp=datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc))
+    assert memory_uuid(aware) == memory_uuid(make_memory(1))
+
+
+def test_relation_uuid_is_deterministic():
+    """Test that relation UUIDs depend on archetype and referenced memories."""
+    assert relation_uuid(make_relation("a")) == relation_uuid(make_relation("a"))
+    assert relation_uuid(make_relation("a")) != relation_uuid(make_relation("a", "Ella-O"))
+    assert relation_uuid(make_relation("a")) != relation_uuid(make_relation("b"))
+
+
+def test_ingest_consumes_iterator_lazily():
+    """Test streaming a generator with progress reports."""
+    batch = FakeBatch()
+    progress = []
+    ingestor = StreamingIngestor(
+        make_client(batch), progress_every=2, on_progress=lambda r: progress.append(r.processed)
+    )
+
+    report = ingestor.ingest_memories(make_memory(i) for i in range(5))
+
+    assert report.submitted == report.imported == 5
+    assert progress == [2, 4]
+    assert batch.objects[0]["uuid"] == memory_uuid(make_memory(0))
+    assert batch.objects[0]["collection"] == MEMORY_CLASS
+    assert report.objects_per_second > 0
+
+
+def test_ingest_resumes_from_checkpoint():
+    """Test that start skips already processed input."""
+    batch = FakeBatch()
+    report = StreamingIngestor(make_client(batch)).ingest_memories(
+        (make_memory(i) for i in range(5)), start=3
+    )
+
+    assert report.processed == 5
+    assert report.submitted == 2
+    assert [o["properties"]["userPrompt"] for o in batch.objects] == ["prompt 3", "prompt 4"]
+
+
+def test_ingest_reports_failures():
+    """Test that failed objects are reported with their UUIDs."""
+    failing = memory_uuid(make_memory(1))
+    batch = FakeBatch(fail=[failing])
+
+    report = StreamingIngestor(make_client(batch)).ingest_memories(
+        [make_memory(i) for i in range(3)]
+    )
+
+    assert report.imported == 2
+    assert report.failed == [{"uuid": failing, "message": "invalid"}]
+
+
+def test_ingest_aborts_after_max_errors():
+    """Test that input stops being read once the error budget is spent."""
+    memories = [make_memory(i) for i in range(10)]
+    batch = FakeBatch(fail=[memory_uuid(m) for m in memories])
+
+    report = StreamingIngestor(make_client(batch), max_errors=2).ingest_memories(memories)
+
+    assert report.aborted
+    assert report.submitted == 3
+
+
+def test_ingest_relations_carry_references():
+    """Test that relations are imported with their references."""
+    batch = FakeBatch()
+    StreamingIngestor(make_client(batch)).ingest_relations([make_relation("a")])
+    assert batch.objects[0]["references"] == {"evaluatedMemory": "a"}
+    assert batch.objects[0]["uuid"] == relation_uuid(make_relation("a"))
+
+
+def test_store_memories_batch_raises_on_failures():
+    """Test that MemoryOperations no longer drops failed writes silently."""
+    memories = [make_memory(i) for i in range(2)]
+    batch = FakeBatch(fail=[memory_uuid(memories[1])])
+    operations = MemoryOperations(make_client(batch))
+
+    with pytest.raises(DatabaseError) as error:
+        operations.store_memories_batch(memories)
+    assert error.value.details["failed"][0]["uuid"] == memory_uuid(memories[1])
+
+
+def test_store_memories_batch_returns_deterministic_uuids():
+    """Test that batch stores return the UUIDs they assigned."""
+    memories = [make_memory(i) for i in range(2)]
+    operations = MemoryOperations(make_client(FakeBatch()))
+    assert operations.store_memories_batch(memories) == [memory_uuid(m) for m in memories]
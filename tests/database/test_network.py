@@ -0,0 +1,84 @@
+"""Tests for the memory network traversal helpers."""
+
+import uuid
+
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.network import MemoryNetwork, network_level_query, network_nodes_query
+from eumas.database.schema import ARCHETYPE_MEMORY_RELATION_CLASS
+
+
+def make_node():
+    """Build a referenced memory with only a UUID."""
+    return Object(
+        uuid=uuid.uuid4(), metadata=MetadataReturn(), properties={}, references=None,
+        vector={}, collection="Memory",
+    )
+
+
+def make_edge(source, target, strength=0.8, relation_id=None):
+    """Build a relation result object between two memories."""
+    return Object(
+        uuid=relation_id or uuid.uuid4(),
+        metadata=MetadataReturn(),
+        properties={"relationshipStrength": strength, "archetype": "Ella-M"},
+        references={
+            "evaluatedMemory": _CrossReference._from([source]),
+            "relatedMemory": _CrossReference._from([target]),
+        },
+        vector={},
+        collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+    )
+
+
+def test_expand_caps_new_nodes_per_level():
+    """Test that weaker edges to further new memories are dropped at the cap."""
+    root, a, b, c = (make_node() for _ in range(4))
+    network = MemoryNetwork(str(root.uuid))
+
+    frontier = network.expand(
+        [make_edge(root, a, 0.9), make_edge(b, root, 0.8), make_edge(root, c, 0.7)],
+        depth=1, max_nodes=2,
+    )
+
+    assert frontier == [str(a.uuid), str(b.uuid)]
+    assert str(c.uuid) not in network.depths
+    assert network.neighbors(str(root.uuid)) == [str(a.uuid), str(b.uuid)]
+
+
+def test_expand_handles_cycles():
+    """Test that visited memories are not expanded again and edges are not repeated."""
+    root, a = make_node(), make_node()
+    network = MemoryNetwork(str(root.uuid))
+    relation_id = uuid.uuid4()
+
+    assert network.expand([make_edge(root, a, relation_id=relation_id)], 1, 10) == [str(a.uuid)]
+    assert network.expand([
+        make_edge(root, a, relation_id=relation_id),
+        make_edge(a, root),
+        make_edge(a, a),
+    ], 2, 10) == []
+    assert len(network.edges) == 3
+    assert network.depths == {str(root.uuid): 0, str(a.uuid): 1}
+
+
+def test_network_level_query():
+    """Test that one level query covers the whole frontier, strongest edges first."""
+    frontier = [str(uuid.uuid4()), str(uuid.uuid4())]
+    query = network_level_query(frontier, 0.5)
+
+    assert "limit" not in query
+    assert query["sort"] is not None
+    assert {ref.link_on for ref in query["return_references"]} == {
+        "evaluatedMemory", "relatedMemory"
+    }
+    assert all(ref.return_properties is False for ref in query["return_references"])
+
+
+def test_network_nodes_query():
+    """Test that nodes are fetched in one query with the projected fields."""
+    query, record = network_nodes_query([str(uuid.uuid4()), str(uuid.uuid4())], ["userPrompt"])
+
+    assert query["limit"] == 2
+    assert query["return_properties"] == ["userPrompt"]
+    assert record._fields == ("id", "userPrompt")
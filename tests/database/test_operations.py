@@ -0,0 +1,424 @@
+"""Tests for the memory operations module."""
+
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import weaviate
+from weaviate.classes.query import HybridFusion
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.compat import to_legacy_dict
+from eumas.database.graph_index import GraphIndex
+from eumas.database.ingest import relation_uuid
+from eumas.database.operations import MemoryOperations
+from eumas.database.schema import (
+    ARCHETYPES,
+    ArchetypeMemoryRelation,
+    Memory,
+    MEMORY_CLASS,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+)
+from eumas.utils.errors import DatabaseError
+
+MEMORY_A, MEMORY_B, MEMORY_C = (str(uuid.uuid4()) for _ in range(3))
+
+
+def make_object(properties, references=None, metadata=None, collection=MEMORY_CLASS):
+    """Build a v4 result object."""
+    return Object(
+        uuid=uuid.uuid4(),
+        metadata=metadata or MetadataReturn(),
+        properties=properties,
+        references={
+            name: _CrossReference._from(objects) for name, objects in (references or {}).items()
+        },
+        vector={},
+        collection=collection,
+    )
+
+
+def make_memory(**overrides):
+    """Build a Memory instance."""
+    values = dict(
+        user_prompt="Hello",
+        agent_reply="Hi",
+        session_id="session-1",
+        user_id="user-1",
+        context_tags=["greeting"],
+        tone="warm",
+        timestamp=datetime(2024, 1, 1, 12, 0),
+        duration=1.5,
+        vector=[0.1, 0.2],
+    )
+    values.update(overrides)
+    return Memory(**values)
+
+
+def make_relation(evaluated_id, related_id=None, strength=None):
+    """Build an ArchetypeMemoryRelation instance."""
+    return ArchetypeMemoryRelation(
+        archetype="Ella-M",
+        spoken_annotation="note",
+        archetype_priority=0.7,
+        evaluated_memory_id=evaluated_id,
+        related_memory_id=related_id,
+        relationship_type="follows" if related_id else None,
+        relationship_strength=strength,
+        metrics={"empathyLevel": 0.9},
+    )
+
+
+@pytest.fixture
+def client():
+    """Create a mock v4 client with one mock collection per class."""
+    client = MagicMock()
+    collections = {MEMORY_CLASS: MagicMock(), ARCHETYPE_MEMORY_RELATION_CLASS: MagicMock()}
+    client.collections.get.side_effect = collections.__getitem__
+    return client
+
+
+@pytest.fixture
+def operations(client):
+    """Create memory operations on the mock client."""
+    return MemoryOperations(client)
+
+
+def test_rejects_v3_client():
+    """Test that a v3 client is refused with guidance."""
+    legacy = MagicMock(spec=weaviate.Client)
+    with pytest.raises(TypeError, match="v4"):
+        MemoryOperations(legacy)
+
+
+def test_store_memory(operations):
+    """Test that memories are inserted with their vector and a UTC timestamp."""
+    memory_id = uuid.uuid4()
+    operations.memories.data.insert.return_value = memory_id
+
+    assert operations.store_memory(make_memory()) == str(memory_id)
+    kwargs = operations.memories.data.insert.call_args.kwargs
+    assert kwargs["vector"] == [0.1, 0.2]
+    assert kwargs["properties"]["timestamp"] == "2024-01-01T12:00:00+00:00"
+
+
+def test_store_memory_relation(operations):
+    """Test that relation references are passed separately from properties."""
+    operations.store_memory_relation(make_relation(MEMORY_A, MEMORY_B, 0.8))
+
+    kwargs = operations.relations.data.insert.call_args.kwargs
+    assert kwargs["references"] == {"evaluatedMemory": MEMORY_A, "relatedMemory": MEMORY_B}
+    assert "evaluatedMemory" not in kwargs["properties"]
+    assert kwargs["properties"]["relationshipStrength"] == 0.8
+    assert kwargs["properties"]["empathyLevel"] == 0.9
+
+
+def test_store_memories_batch(client, operations):
+    """Test that memory batches use the v4 batcher."""
+    batch = client.batch.fixed_size.return_value.__enter__.return_value
+    batch.add_object.side_effect = [uuid.uuid4(), uuid.uuid4()]
+
+    uuids = operations.store_memories_batch([make_memory(), make_memory()])
+
+    assert len(uuids) == 2
+    assert batch.add_object.call_args.kwargs["collection"] == MEMORY_CLASS
+
+
+def test_store_relations_batch(client, operations):
+    """Test that relation batches carry references."""
+    batch = client.batch.fixed_size.return_value.__enter__.return_value
+    batch.add_object.return_value = uuid.uuid4()
+
+    operations.store_relations_batch([make_relation(MEMORY_A)])
+
+    kwargs = batch.add_object.call_args.kwargs
+    assert kwargs["collection"] == ARCHETYPE_MEMORY_RELATION_CLASS
+    assert kwargs["references"] == {"evaluatedMemory": MEMORY_A}
+
+
+def test_relation_writes_update_graph(client):
+    """Test that stored relations reach the graph index unless they failed."""
+    graph = GraphIndex()
+    operations = MemoryOperations(client, graph=graph)
+    stored, failed = make_relation(MEMORY_A, MEMORY_B, 0.8), make_relation(MEMORY_A, MEMORY_C, 0.6)
+    client.batch.failed_objects = [
+        SimpleNamespace(message="boom", original_uuid=relation_uuid(failed), object_=None)
+    ]
+
+    with pytest.raises(DatabaseError):
+        operations.store_relations_batch([stored, failed])
+    operations.relations.data.insert.return_value = uuid.uuid4()
+    operations.store_memory_relation(make_relation(MEMORY_C, MEMORY_A, 0.5))
+
+    assert graph.neighbors(MEMORY_A, "both") == [(MEMORY_B, 0.8), (MEMORY_C, 0.5)]
+
+
+def test_get_significant_memories_ranks_by_stored_significance(operations):
+    """Test that memories are ranked by a property and their relations attached."""
+    first = make_object({"userPrompt": "first"})
+    second = make_object({"userPrompt": "second"})
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(
+        objects=[first, second]
+    )
+    operations.relations.query.fetch_objects.return_value = SimpleNamespace(objects=[
+        make_object({"relationshipStrength": 0.9}, {"evaluatedMemory": [first]}),
+        make_object({"relationshipStrength": 0.8}, {"evaluatedMemory": [second]}),
+        make_object({"relationshipStrength": 0.7}, {"evaluatedMemory": [first]}),
+    ])
+
+    memories = operations.get_significant_memories(
+        limit=2, min_relationship_strength=0.5, archetype_filter="Ella-M"
+    )
+
+    assert [m["userPrompt"] for m in memories] == ["first", "second"]
+    assert [r["relationshipStrength"] for r in memories[0]["relations"]] == [0.9, 0.7]
+    ranked = operations.memories.query.fetch_objects.call_args.kwargs
+    assert ranked["filters"].target == "significanceEllaM"
+    assert ranked["filters"].value == 0.5
+    assert ranked["sort"] is not None
+    assert ranked["limit"] == 2
+    assert operations.relations.query.fetch_objects.call_count == 1
+
+    with pytest.raises(ValueError):
+        operations.get_significant_memories(archetype_filter="Ella-Z")
+
+
+def test_get_significant_memories_keeps_every_relation(operations):
+    """Test that memories with many relations per archetype keep all of them."""
+    memory = make_object({"userPrompt": "busy"})
+    relations = [
+        make_object({"relationshipStrength": 0.9}, {"evaluatedMemory": [memory]})
+        for _ in range(2 * len(ARCHETYPES))
+    ]
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(objects=[memory])
+    operations.relations.query.fetch_objects.return_value = SimpleNamespace(objects=relations)
+
+    [result] = operations.get_significant_memories(limit=1, archetype_filter="Ella-M")
+
+    assert len(result["relations"]) == len(relations)
+    assert operations.relations.query.fetch_objects.call_args.kwargs["limit"] > len(relations)
+
+
+def test_get_significant_memories_empty(operations):
+    """Test that no relation query is sent when no memory qualifies."""
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(objects=[])
+
+    assert operations.get_significant_memories() == []
+    operations.relations.query.fetch_objects.assert_not_called()
+
+
+def test_relation_writes_refresh_significance(client, operations):
+    """Test that a relation write updates only the changed significance properties."""
+    memory = make_object({"significance": 0.4, "significanceEllaM": 0.4})
+    memory_id = str(memory.uuid)
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(objects=[memory])
+    operations.relations.query.fetch_objects.return_value = SimpleNamespace(objects=[
+        make_object(
+            {"relationshipStrength": 0.8, "archetype": "Ella-M"},
+            {"evaluatedMemory": [memory]},
+            collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+        )
+    ])
+    operations.relations.data.insert.return_value = uuid.uuid4()
+
+    operations.store_memory_relation(make_relation(memory_id, MEMORY_B, 0.8))
+
+    update = operations.memories.data.update.call_args.kwargs
+    assert update["uuid"] == memory_id
+    assert update["properties"]["significance"] == 0.8
+    assert update["properties"]["significanceEllaM"] == 0.8
+    assert update["properties"]["significanceArchetype"] == "Ella-M"
+    assert update["properties"]["significanceEllaO"] == 0.0
+
+
+def test_get_memory_network(operations):
+    """Test that each depth level is one query for the whole frontier."""
+    root, a, b, c = (make_object({"userPrompt": name}) for name in ("root", "a", "b", "c"))
+
+    def edge(source, target, strength):
+        return make_object(
+            {"relationshipStrength": strength, "archetype": "Ella-M"},
+            {"evaluatedMemory": [source], "relatedMemory": [target]},
+        )
+
+    b_root = edge(b, root, 0.8)
+    operations.relations.query.fetch_objects.side_effect = [
+        SimpleNamespace(objects=[edge(root, a, 0.9), b_root]),
+        SimpleNamespace(objects=[edge(a, c, 0.7), b_root, edge(a, root, 0.6)]),
+    ]
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(
+        objects=[root, a, b, c]
+    )
+
+    network = operations.get_memory_network(str(root.uuid), max_depth=2)
+
+    assert operations.relations.query.fetch_objects.call_count == 2
+    assert operations.memories.query.fetch_objects.call_count == 1
+    assert network.depths == {
+        str(root.uuid): 0, str(a.uuid): 1, str(b.uuid): 1, str(c.uuid): 2
+    }
+    assert [(e.target, e.strength) for e in network.adjacency[str(a.uuid)]] == [
+        (str(c.uuid), 0.7), (str(root.uuid), 0.6)
+    ]
+    assert len(network.edges) == 4
+    assert network.nodes[str(c.uuid)].userPrompt == "c"
+    assert network.to_dict()["nodes"][str(c.uuid)]["depth"] == 2
+
+
+def test_get_memory_network_missing(operations):
+    """Test that an unknown memory yields no network."""
+    operations.relations.query.fetch_objects.return_value = SimpleNamespace(objects=[])
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(objects=[])
+    assert operations.get_memory_network(str(uuid.uuid4())) is None
+    assert operations.relations.query.fetch_objects.call_count == 1
+
+    with pytest.raises(ValueError):
+        operations.get_memory_network(str(uuid.uuid4()), max_depth=-1)
+
+
+def test_get_archetype_perspective(operations):
+    """Test perspective queries return legacy-shaped relations."""
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    memory = make_object({"userPrompt": "hi", "timestamp": timestamp})
+    operations.relations.query.fetch_objects.return_value = SimpleNamespace(objects=[
+        make_object({"relationshipStrength": 0.5}, {"evaluatedMemory": [memory]})
+    ])
+
+    results = operations.get_archetype_perspective("Ella-M", context_tag="greeting", limit=3)
+
+    assert results[0]["evaluatedMemory"][0]["timestamp"] == "2024-01-01T00:00:00+00:00"
+    assert operations.relations.query.fetch_objects.call_args.kwargs["limit"] == 3
+    with pytest.raises(ValueError):
+        operations.get_archetype_perspective("Ella-Z")
+
+
+def test_get_memories_by_context(operations):
+    """Test context queries."""
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(
+        objects=[make_object({"userPrompt": "hi", "memoryPriority": 0.6})]
+    )
+
+    results = operations.get_memories_by_context(["greeting"], min_priority=0.5, limit=10)
+
+    assert results[0]["memoryPriority"] == 0.6
+    assert operations.memories.query.fetch_objects.call_args.kwargs["limit"] == 10
+
+
+def test_to_legacy_dict_metadata():
+    """Test that search metadata lands in the _additional block."""
+    obj = make_object({"userPrompt": "hi"}, metadata=MetadataReturn(distance=0.25))
+    result = to_legacy_dict(obj)
+    assert result["_additional"] == {"id": str(obj.uuid), "distance": 0.25}
+
+
+def test_store_evaluated_interaction_single_batch(client, operations):
+    """Test that the memory, with its significance, and its relations go out in one batch."""
+    batch = client.batch.fixed_size.return_value.__enter__.return_value
+    client.batch.failed_objects = []
+    relations = [make_relation(None, MEMORY_C, 0.7), make_relation(MEMORY_B)]
+
+    memory_id, relation_ids = operations.store_evaluated_interaction(make_memory(), relations)
+
+    client.batch.fixed_size.assert_called_once()
+    assert client.batch.fixed_size.call_args.kwargs["batch_size"] == 3
+    added = [call.kwargs for call in batch.add_object.call_args_list]
+    assert [a["collection"] for a in added] == [
+        MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS
+    ]
+    assert added[0]["uuid"] == memory_id
+    assert added[0]["properties"]["significance"] == 0.7
+    assert added[0]["properties"]["significanceEllaM"] == 0.7
+    assert added[1]["references"] == {"evaluatedMemory": memory_id, "relatedMemory": MEMORY_C}
+    assert added[2]["references"] == {"evaluatedMemory": MEMORY_B}
+    assert [a["uuid"] for a in added[1:]] == relation_ids
+
+
+def test_store_evaluated_interaction_failure(client, operations):
+    """Test that partial failures raise with the failed UUIDs."""
+    client.batch.failed_objects = [
+        SimpleNamespace(message="boom", original_uuid=uuid.uuid4())
+    ]
+    with pytest.raises(DatabaseError) as error:
+        operations.store_evaluated_interaction(make_memory(), [make_relation(None)])
+    assert error.value.details["failed"][0]["message"] == "boom"
+
+
+def test_search_similar_embeds_text(client):
+    """Test that text queries are embedded and results keep their distance."""
+    embedder = MagicMock()
+    embedder.generate.return_value = [0.1, 0.2]
+    operations = MemoryOperations(client, embedder=embedder)
+    operations.memories.query.near_vector.return_value = SimpleNamespace(objects=[
+        make_object({"userPrompt": "hi"}, metadata=MetadataReturn(distance=0.12))
+    ])
+
+    results = operations.search_similar("hello", k=1, user_id="user-1", distance=0.3)
+
+    embedder.generate.assert_called_once_with("hello")
+    args, kwargs = operations.memories.query.near_vector.call_args
+    assert args == ([0.1, 0.2],)
+    assert kwargs["distance"] == 0.3
+    assert kwargs["filters"] is not None
+    assert results[0]["_additional"]["distance"] == 0.12
+
+
+def test_search_similar_ef_override(operations):
+    """Test that a per-call ef widens the candidate list but k results are returned."""
+    operations.memories.query.near_vector.return_value = SimpleNamespace(
+        objects=[make_object({"userPrompt": str(i)}) for i in range(5)]
+    )
+
+    results = operations.search_similar([0.1, 0.2], k=2, ef=5)
+
+    assert operations.memories.query.near_vector.call_args.kwargs["limit"] == 5
+    assert operations.memories.query.near_vector.call_args.kwargs["filters"] is None
+    assert [r["userPrompt"] for r in results] == ["0", "1"]
+
+
+def test_search_similar_rejects_two_thresholds(operations):
+    """Test that distance and certainty are mutually exclusive."""
+    with pytest.raises(ValueError):
+        operations.search_similar([0.1], distance=0.2, certainty=0.9)
+
+
+def test_search_hybrid(client):
+    """Test that hybrid search fuses keyword and vector halves in one query."""
+    embedder = MagicMock()
+    embedder.generate.return_value = [0.1, 0.2]
+    operations = MemoryOperations(client, embedder=embedder)
+    operations.memories.query.hybrid.return_value = SimpleNamespace(objects=[
+        make_object({"userPrompt": "Lisbon"}, metadata=MetadataReturn(score=0.8))
+    ])
+
+    results = operations.search_hybrid(
+        "Lisbon", k=3, alpha=0.25, fusion_type="ranked", boosts={"userPrompt": 2}
+    )
+
+    args, kwargs = operations.memories.query.hybrid.call_args
+    assert args == ("Lisbon",)
+    assert kwargs["vector"] == [0.1, 0.2]
+    assert kwargs["alpha"] == 0.25
+    assert kwargs["fusion_type"] == HybridFusion.RANKED
+    assert kwargs["query_properties"] == ["userPrompt^2", "agentReply", "contextTags"]
+    assert results[0]["_additional"]["score"] == 0.8
+
+
+def test_search_hybrid_keyword_only_skips_embedding(client):
+    """Test that alpha 0 runs pure BM25 without embedding the query."""
+    embedder = MagicMock()
+    operations = MemoryOperations(client, embedder=embedder)
+    operations.memories.query.hybrid.return_value = SimpleNamespace(objects=[])
+
+    operations.search_hybrid("Lisbon", alpha=0.0)
+
+    embedder.generate.assert_not_called()
+    assert operations.memories.query.hybrid.call_args.kwargs["vector"] is None
+
+
+@pytest.mark.parametrize("options", [{"alpha": 1.5}, {"fusion_type": "sum"}, {"k": 0}])
+def test_search_hybrid_invalid_options(operations, options):
+    """Test that invalid hybrid options are rejected."""
+    with pytest.raises(ValueError):
+        operations.search_hybrid("Lisbon", vector=[0.1], **options)
@@ -0,0 +1,167 @@
+"""Tests for the connection pool module."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from eumas.database import pool
+from eumas.database.pool import (
+    ConnectionManager,
+    get_connection_manager,
+    shutdown_connection_manager,
+)
+from eumas.utils.errors import DatabaseError
+
+
+@pytest.fixture
+def connection_class():
+    """Patch DatabaseConnection so every instance is a distinct mock."""
+    with patch.object(pool, "DatabaseConnection", side_effect=lambda *a, **k: MagicMock()) as mock:
+        yield mock
+
+
+def test_startup_opens_pool_once(connection_class):
+    """Test that startup opens pool_size connections and is idempotent."""
+    manager = ConnectionManager(pool_size=3)
+    manager.startup()
+    manager.startup()
+
+    assert connection_class.call_count == 3
+    assert manager.stats["size"] == 3
+    assert manager.stats["idle"] == 3
+
+
+def test_connections_are_reused(connection_class):
+    """Test that borrowing returns warm connections instead of opening new ones."""
+    with ConnectionManager(pool_size=2) as manager:
+        with manager.connection() as first:
+            assert manager.stats["in_use"] == 1
+        with manager.connection() as second:
+            assert second is first
+
+    assert connection_class.call_count == 2
+    assert manager.stats["acquired"] == 2
+    first.close.assert_called_once()
+
+
+def test_lazy_startup(connection_class):
+    """Test that the first borrow opens the pool."""
+    manager = ConnectionManager(pool_size=1)
+    with manager.connection():
+        assert manager.started
+    manager.shutdown()
+
+
+def test_acquire_timeout(connection_class):
+    """Test that an exhausted pool raises after the timeout."""
+    with ConnectionManager(pool_size=1) as manager:
+        with manager.connection():
+            with pytest.raises(DatabaseError):
+                with manager.connection(timeout=0.01):
+                    pass
+        assert manager.stats["timeouts"] == 1
+
+
+def test_concurrent_threads_share_pool(connection_class):
+    """Test that threads never hold the same connection at once."""
+    in_use = set()
+    lock = threading.Lock()
+    errors = []
+
+    def worker(manager):
+        for _ in range(20):
+            with manager.connection() as connection:
+                with lock:
+                    if id(connection) in in_use:
+                        errors.append("shared")
+                    in_use.add(id(connection))
+                with lock:
+                    in_use.discard(id(connection))
+
+    with ConnectionManager(pool_size=2) as manager:
+        threads = [threading.Thread(target=worker, args=(manager,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert manager.stats["acquired"] == 160
+
+
+def test_async_borrow_waits_without_blocking_loop(connection_class):
+    """Test that asyncio tasks queue for connections while the loop keeps running."""
+    async def borrow(manager, results):
+        async with manager.aconnection() as connection:
+            results.append(connection)
+            await asyncio.sleep(0.01)
+
+    async def main(manager):
+        results = []
+        await asyncio.gather(*(borrow(manager, results) for _ in range(5)))
+        return results
+
+    with ConnectionManager(pool_size=1) as manager:
+        results = asyncio.run(main(manager))
+
+    assert len(results) == 5
+    assert len({id(connection) for connection in results}) == 1
+
+
+def test_async_borrow_checks_health_off_loop(connection_class):
+    """Test that the stale-connection health check never runs on the event loop."""
+    checked_on = []
+
+    async def main(manager):
+        with manager.connection() as connection:
+            connection.is_healthy.side_effect = lambda: checked_on.append(threading.get_ident())
+        async with manager.aconnection():
+            return threading.get_ident()
+
+    with ConnectionManager(pool_size=1, max_idle=0.0) as manager:
+        loop_thread = asyncio.run(main(manager))
+
+    assert len(checked_on) == 1
+    assert checked_on[0] != loop_thread
+
+
+def test_stale_connection_is_reopened(connection_class):
+    """Test that unhealthy idle connections are replaced."""
+    with ConnectionManager(pool_size=1, max_idle=0.0) as manager:
+        with manager.connection() as first:
+            first.is_healthy.return_value = False
+        with manager.connection() as second:
+            assert second is not first
+
+    first.close.assert_called_once()
+    assert manager.stats["reconnects"] == 1
+
+
+def test_shutdown_closes_borrowed_connection_on_return(connection_class):
+    """Test that connections lent out during shutdown are closed on return."""
+    manager = ConnectionManager(pool_size=1)
+    with manager.connection() as connection:
+        manager.shutdown()
+        connection.close.assert_not_called()
+    connection.close.assert_called_once()
+
+
+def test_process_wide_manager(connection_class):
+    """Test that the shared manager is created once and can be discarded."""
+    manager = get_connection_manager(pool_size=1)
+    assert get_connection_manager() is manager
+    with manager.connection():
+        pass
+
+    shutdown_connection_manager()
+    assert not manager.started
+    assert get_connection_manager() is not manager
+    shutdown_connection_manager()
+
+
+def test_invalid_pool_size():
+    """Test that empty pools are rejected."""
+    with pytest.raises(ValueError):
+        ConnectionManager(pool_size=0)
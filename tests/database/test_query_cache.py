@@ -0,0 +1,168 @@
+"""Tests for the query result cache module."""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.operations import MemoryOperations
+from eumas.database.query_cache import QueryCache, make_key
+from eumas.database.schema import (
+    ArchetypeMemoryRelation,
+    Memory,
+    MEMORY_CLASS,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+)
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_memory(user_id="user-1", context_tags=("work",)):
+    """Build a Memory instance."""
+    return Memory(
+        "hi", "yo", "session-1", user_id, list(context_tags), "calm",
+        datetime(2024, 1, 1, 12, 0), 1.0, [0.1]
+    )
+
+
+@pytest.fixture
+def operations():
+    """Create cached memory operations on a mock client."""
+    client = MagicMock()
+    collections = {MEMORY_CLASS: MagicMock(), ARCHETYPE_MEMORY_RELATION_CLASS: MagicMock()}
+    client.collections.get.side_effect = collections.__getitem__
+    operations = MemoryOperations(client, cache=QueryCache())
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(objects=[])
+    operations.relations.query.fetch_objects.return_value = SimpleNamespace(objects=[])
+    return operations
+
+
+def test_make_key_normalizes_arguments():
+    """Test that list order and naive vs UTC datetimes do not change the key."""
+    assert make_key("q", tags=["a", "b"]) == make_key("q", tags=["b", "a", "a"])
+    assert make_key("q", at=datetime(2024, 1, 1)) == make_key(
+        "q", at=datetime.fromisoformat("2024-01-01T00:00:00+00:00")
+    )
+    assert make_key("q", tags=["a"]) != make_key("p", tags=["a"])
+
+
+def test_hits_ttl_and_metrics():
+    """Test read-through hits, expiry and the hit ratio."""
+    clock = FakeClock()
+    cache = QueryCache(ttl=10, clock=clock)
+    loader = MagicMock(return_value=[1])
+    scope = {"collections": {MEMORY_CLASS}}
+
+    assert cache.get_or_load("k", scope, loader) == [1]
+    assert cache.get_or_load("k", scope, loader) == [1]
+    clock.now = 11
+    cache.get_or_load("k", scope, loader)
+
+    assert loader.call_count == 2
+    stats = cache.stats
+    assert stats["hits"] == 1
+    assert stats["expirations"] == 1
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+    assert stats["saved_seconds"] >= 0
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = QueryCache(max_items=2)
+    scope = {"collections": {MEMORY_CLASS}}
+    for key in ("a", "b"):
+        cache.get_or_load(key, scope, lambda: key)
+    cache.get_or_load("a", scope, lambda: "stale")
+    cache.get_or_load("c", scope, lambda: "c")
+
+    assert cache.get_or_load("a", scope, lambda: "reloaded") == "a"
+    assert cache.get_or_load("b", scope, lambda: "reloaded") == "reloaded"
+    assert cache.stats["evictions"] >= 1
+
+
+def test_load_racing_a_write_is_not_cached():
+    """Test that a result loaded while a write happened is not stored."""
+    cache = QueryCache()
+    scope = {"collections": {MEMORY_CLASS}}
+
+    def load():
+        cache.invalidate([{"collection": MEMORY_CLASS}])
+        return "old"
+
+    cache.get_or_load("k", scope, load)
+    assert cache.get_or_load("k", scope, lambda: "new") == "new"
+
+
+def test_context_queries_are_cached(operations):
+    """Test that repeated context queries hit the cache regardless of tag order."""
+    operations.get_memories_by_context(["work", "travel"])
+    operations.get_memories_by_context(["travel", "work"])
+
+    assert operations.memories.query.fetch_objects.call_count == 1
+    assert operations.cache.stats["hits"] == 1
+
+
+def test_memory_write_invalidates_only_affected_queries(operations):
+    """Test targeted invalidation by user and context tags."""
+    operations.get_memories_by_context(["work"], user_id="user-1")
+    operations.get_memories_by_context(["work"], user_id="user-2")
+    operations.get_memories_by_context(["travel"], user_id="user-1")
+
+    operations.store_memory(make_memory(user_id="user-1", context_tags=["work"]))
+
+    assert operations.cache.stats["invalidations"] == 1
+    operations.get_memories_by_context(["work"], user_id="user-1")
+    operations.get_memories_by_context(["work"], user_id="user-2")
+    assert operations.memories.query.fetch_objects.call_count == 4
+
+
+def test_relation_write_invalidates_perspective(operations):
+    """Test that relation writes drop perspectives of the same archetype only."""
+    operations.get_archetype_perspective("Ella-M")
+    operations.get_archetype_perspective("Ella-O")
+
+    operations.store_memory_relation(
+        ArchetypeMemoryRelation("Ella-M", "note", 0.5, str(uuid.uuid4()), None, None, None, {})
+    )
+
+    assert operations.cache.stats["invalidations"] == 1
+    assert operations.cache.stats["size"] == 1
+
+
+def test_read_during_significance_refresh_is_dropped(operations):
+    """Test that rankings cached while significance is refreshed are invalidated."""
+    memory = Object(
+        uuid=uuid.uuid4(), metadata=MetadataReturn(), properties={"significance": 0.1},
+        references=None, vector={}, collection=MEMORY_CLASS,
+    )
+    memory_id = str(memory.uuid)
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(objects=[memory])
+    operations.relations.query.fetch_objects.return_value = SimpleNamespace(objects=[Object(
+        uuid=uuid.uuid4(),
+        metadata=MetadataReturn(creation_time=datetime(2024, 1, 1)),
+        properties={"archetype": "Ella-M", "relationshipStrength": 0.9},
+        references={"evaluatedMemory": _CrossReference._from([memory])},
+        vector={},
+        collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+    )])
+    operations.memories.data.update.side_effect = (
+        lambda **kwargs: operations.get_significant_memories()
+    )
+
+    operations.store_memory_relation(
+        ArchetypeMemoryRelation("Ella-M", "note", 0.9, memory_id, None, None, None, {})
+    )
+
+    operations.memories.data.update.assert_called_once()
+    assert operations.cache.stats["size"] == 0
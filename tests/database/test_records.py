@@ -0,0 +1,110 @@
+"""Tests for the projected record module."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.operations import MemoryOperations
+from eumas.database.records import project, record_type, to_record
+from eumas.database.schema import MEMORY_CLASS, ARCHETYPE_MEMORY_RELATION_CLASS
+
+
+def make_object(properties, references=None, metadata=None):
+    """Build a v4 result object."""
+    return Object(
+        uuid=uuid.uuid4(),
+        metadata=metadata or MetadataReturn(),
+        properties=properties,
+        references={
+            name: _CrossReference._from(objects) for name, objects in (references or {}).items()
+        },
+        vector={},
+        collection=MEMORY_CLASS,
+    )
+
+
+@pytest.fixture
+def operations():
+    """Create memory operations on a mock client."""
+    client = MagicMock()
+    collections = {MEMORY_CLASS: MagicMock(), ARCHETYPE_MEMORY_RELATION_CLASS: MagicMock()}
+    client.collections.get.side_effect = collections.__getitem__
+    return MemoryOperations(client)
+
+
+def test_record_type_is_shared_and_slotted():
+    """Test that equal projections share one compact class."""
+    record = record_type(("memoryPriority",))
+    assert record is record_type(("memoryPriority",))
+    assert record._fields == ("id", "memoryPriority")
+    assert not hasattr(record("a", 0.5), "__dict__")
+
+
+@pytest.mark.parametrize("fields", [("a", "a"), ("not-valid",), ("_private",)])
+def test_record_type_rejects_invalid_fields(fields):
+    """Test that unusable field names are rejected."""
+    with pytest.raises(ValueError):
+        record_type(fields)
+
+
+def test_project_splits_properties_metadata_and_references():
+    """Test that only plain properties are requested as properties."""
+    query = {}
+    record = project(query, ["distance", "relationshipStrength", "evaluatedMemory"],
+                     references=("evaluatedMemory",))
+
+    assert query["return_properties"] == ["relationshipStrength"]
+    assert [ref.link_on for ref in query["return_references"]] == ["evaluatedMemory"]
+
+    memory = make_object({})
+    obj = make_object({"relationshipStrength": 0.7}, {"evaluatedMemory": [memory]},
+                      MetadataReturn(distance=0.2))
+    assert to_record(obj, record) == (str(obj.uuid), 0.2, 0.7, str(memory.uuid))
+
+
+def test_search_similar_ids_and_distances(operations):
+    """Test that a projection requests no properties and returns records."""
+    obj = make_object({}, metadata=MetadataReturn(distance=0.1))
+    operations.memories.query.near_vector.return_value = SimpleNamespace(objects=[obj])
+
+    results = operations.search_similar([0.1], k=1, fields=["distance"])
+
+    assert operations.memories.query.near_vector.call_args.kwargs["return_properties"] == []
+    assert results[0].id == str(obj.uuid)
+    assert results[0].distance == 0.1
+
+
+def test_get_memories_by_context_with_priority(operations):
+    """Test projected context queries."""
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(
+        objects=[make_object({"memoryPriority": 0.9})]
+    )
+
+    results = operations.get_memories_by_context(["work"], fields=["memoryPriority"])
+
+    assert operations.memories.query.fetch_objects.call_args.kwargs["return_properties"] == [
+        "memoryPriority"
+    ]
+    assert results[0].memoryPriority == 0.9
+
+
+def test_get_significant_memories_records(operations):
+    """Test one record per memory carrying its strongest relation's strength."""
+    memory = make_object({
+        "memoryPriority": 0.4, "significance": 0.9, "significanceArchetype": "Ella-M"
+    })
+    operations.memories.query.fetch_objects.return_value = SimpleNamespace(objects=[memory])
+
+    results = operations.get_significant_memories(
+        fields=["relationshipStrength", "archetype", "memoryPriority"]
+    )
+
+    assert results == [(str(memory.uuid), 0.9, "Ella-M", 0.4)]
+    kwargs = operations.memories.query.fetch_objects.call_args.kwargs
+    assert kwargs["return_properties"] == [
+        "memoryPriority", "significance", "significanceArchetype"
+    ]
+    operations.relations.query.fetch_objects.assert_not_called()
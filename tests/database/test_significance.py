@@ -0,0 +1,180 @@
+"""Tests for the materialized significance module."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from weaviate.collections.classes.internal import MetadataReturn, Object, _CrossReference
+
+from eumas.database.ingest import update_properties
+from eumas.database.schema import (
+    ArchetypeMemoryRelation,
+    ARCHETYPES,
+    ARCHETYPE_MEMORY_RELATION_CLASS,
+    MEMORY_CLASS,
+    get_memory_class_schema,
+)
+from eumas.database.significance import (
+    SIGNIFICANCE_PROPERTIES,
+    backfill_significance,
+    interaction_significance,
+    significance_query,
+    significance_updates,
+    significance_values,
+    strength_matrix,
+)
+
+
+def make_memory(properties=None):
+    """Build a memory result object."""
+    return Object(
+        uuid=uuid.uuid4(), metadata=MetadataReturn(), properties=properties or {},
+        references=None, vector={}, collection=MEMORY_CLASS,
+    )
+
+
+def make_relation(memory, archetype, strength):
+    """Build a relation evaluating a memory."""
+    return Object(
+        uuid=uuid.uuid4(),
+        metadata=MetadataReturn(),
+        properties={"relationshipStrength": strength, "archetype": archetype},
+        references={"evaluatedMemory": _CrossReference._from([memory])},
+        vector={},
+        collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+    )
+
+
+def test_schema_has_significance_columns():
+    """Test that every significance property is part of the Memory schema."""
+    names = {prop["name"] for prop in get_memory_class_schema()["properties"]}
+    assert set(SIGNIFICANCE_PROPERTIES) <= names
+    assert "significanceEllaM" in names
+    assert len(SIGNIFICANCE_PROPERTIES) == len(ARCHETYPES) + 2
+
+
+def test_strength_matrix_keeps_strongest_per_archetype():
+    """Test the per-memory, per-archetype maximum, ignoring missing strengths."""
+    first, second = make_memory(), make_memory()
+    rows = {}
+    matrix = strength_matrix([
+        make_relation(first, "Ella-M", 0.4),
+        make_relation(first, "Ella-M", 0.7),
+        make_relation(first, "Ella-O", 0.9),
+        make_relation(second, "Ella-D", None),
+    ], rows)
+
+    assert list(rows) == [str(first.uuid)]
+    assert matrix[0, ARCHETYPES.index("Ella-M")] == 0.7
+    assert matrix[0, ARCHETYPES.index("Ella-O")] == 0.9
+
+    values = significance_values(matrix[0])
+    assert values["significance"] == 0.9
+    assert values["significanceArchetype"] == "Ella-O"
+    assert significance_values(np.zeros(len(ARCHETYPES)))["significanceArchetype"] is None
+
+
+def test_interaction_significance_matches_stored_relations():
+    """Test that inline significance equals the one recomputed from stored rows."""
+    memory, other = make_memory(), make_memory()
+    memories = {str(memory.uuid): memory, str(other.uuid): other}
+    memory_id, other_id = list(memories)
+    relations = [
+        ArchetypeMemoryRelation("Ella-M", "note", 0.5, memory_id, other_id, "follows", 0.4, {}),
+        # Strengths of relations without a related memory are not stored
+        ArchetypeMemoryRelation("Ella-O", "note", 0.5, memory_id, None, None, 0.9, {}),
+        ArchetypeMemoryRelation("Ella-D", "note", 0.5, other_id, memory_id, "follows", 0.8, {}),
+    ]
+    stored = [
+        Object(
+            uuid=uuid.uuid4(),
+            metadata=MetadataReturn(),
+            properties=relation.to_weaviate_object()["properties"],
+            references={
+                "evaluatedMemory": _CrossReference._from([memories[relation.evaluated_memory_id]])
+            },
+            vector={},
+            collection=ARCHETYPE_MEMORY_RELATION_CLASS,
+        )
+        for relation in relations
+    ]
+
+    inline = interaction_significance(memory_id, relations)
+    [(_, recomputed)] = significance_updates(stored, [memory])
+
+    assert inline == recomputed
+    assert inline["significance"] == 0.4
+    assert inline["significanceArchetype"] == "Ella-M"
+
+
+def test_significance_updates_only_changed_values():
+    """Test that unchanged memories and properties are not written."""
+    current = make_memory(significance_values(np.eye(len(ARCHETYPES))[0] * 0.5))
+    stale = make_memory({"significance": 0.2})
+
+    updates = significance_updates(
+        [make_relation(current, "Ella-M", 0.5), make_relation(stale, "Ella-M", 0.6)],
+        [current, stale],
+    )
+
+    assert [memory_id for memory_id, _ in updates] == [str(stale.uuid)]
+    assert updates[0][1]["significance"] == 0.6
+
+
+def test_significance_query():
+    """Test that ranking filters and sorts on the archetype's column."""
+    query = significance_query(5, 0.3, "Ella-M", ["userPrompt"])
+
+    assert query["filters"].target == "significanceEllaM"
+    assert query["limit"] == 5
+    assert significance_query(5, 0.3, None, [])["filters"].target == "significance"
+    with pytest.raises(ValueError):
+        significance_query(5, 0.3, "Ella-Z", [])
+
+
+def test_update_properties_reports_failures():
+    """Test that failed partial updates are reported, not raised."""
+    collection = MagicMock()
+
+    def update(uuid, properties):
+        if properties.get("fail"):
+            raise RuntimeError("boom")
+
+    collection.data.update.side_effect = update
+    report = update_properties(
+        collection, [(str(i), {"fail": i == 3}) for i in range(10)], max_workers=2
+    )
+
+    assert report.submitted == 10
+    assert report.failed == [{"uuid": "3", "message": "boom"}]
+
+
+def test_backfill_significance():
+    """Test that a backfill scans both collections once and updates changed memories."""
+    first, second = make_memory(), make_memory()
+    first.properties.update(significance_values(np.zeros(len(ARCHETYPES))))
+    relations = [make_relation(second, "Ella-H", 0.8)]
+
+    memories = MagicMock()
+    memories.config.get.return_value = SimpleNamespace(
+        properties=[SimpleNamespace(name="userPrompt")]
+    )
+    memories.query.fetch_objects.return_value = SimpleNamespace(objects=[first, second])
+    relation_collection = MagicMock()
+    relation_collection.query.fetch_objects.return_value = SimpleNamespace(objects=relations)
+    client = MagicMock()
+    client.collections.get.side_effect = {
+        MEMORY_CLASS: memories, ARCHETYPE_MEMORY_RELATION_CLASS: relation_collection
+    }.__getitem__
+
+    result = backfill_significance(client, page_size=10, max_workers=2)
+
+    assert result["relations"] == 1
+    assert result["memories"] == 2
+    assert result["updated"] == 1
+    assert memories.config.add_property.call_count == len(SIGNIFICANCE_PROPERTIES)
+    update = memories.data.update.call_args.kwargs
+    assert update["uuid"] == str(second.uuid)
+    assert update["properties"]["significanceEllaH"] == 0.8
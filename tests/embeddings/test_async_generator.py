@@ -0,0 +1,161 @@
+"""Tests for the asynchronous embedding generator module."""
+
+import asyncio
+import threading
+from unittest import mock
+
+import httpx
+import pytest
+from openai import AsyncOpenAI, OpenAIError, RateLimitError
+
+from eumas.embeddings.async_generator import AsyncEmbeddingGenerator
+from eumas.embeddings.rate_limit import AsyncRateLimiter
+from eumas.utils.errors import EmbeddingError
+
+
+class MockEmbeddingData:
+    """Mock OpenAI embedding data response."""
+
+    def __init__(self, embedding, index):
+        self.embedding = embedding
+        self.index = index
+
+
+class MockEmbeddingResponse:
+    """Mock OpenAI embedding response."""
+
+    def __init__(self, data, total_tokens):
+        self.data = data
+        self.usage = mock.MagicMock(total_tokens=total_tokens)
+
+
+async def _echo_response(input, model, **kwargs):
+    """Build a mock response with one distinct vector per input text."""
+    return MockEmbeddingResponse(
+        [MockEmbeddingData([float(len(text))] * 4, i) for i, text in enumerate(input)],
+        total_tokens=len(input),
+    )
+
+
+@pytest.fixture
+def mock_async_openai():
+    """Mock the async OpenAI client."""
+    with mock.patch("eumas.embeddings.async_generator.AsyncOpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_instance.embeddings.create = mock.AsyncMock(side_effect=_echo_response)
+        mock_client.return_value = mock_instance
+        yield mock_instance
+
+
+def test_generate_single_text(mock_async_openai):
+    """Test generating an embedding for a single text."""
+    generator = AsyncEmbeddingGenerator()
+    embedding = asyncio.run(generator.generate("abc"))
+
+    assert embedding == [3.0] * 4
+    mock_async_openai.embeddings.create.assert_awaited_once_with(
+        input=["abc"],
+        model="text-embedding-ada-002"
+    )
+
+
+def test_generate_multiple_batches(mock_async_openai):
+    """Test that split batches are reassembled in input order."""
+    generator = AsyncEmbeddingGenerator(max_batch_size=2)
+    texts = ["a" * n for n in range(1, 6)]
+    embeddings = asyncio.run(generator.generate(texts))
+
+    assert embeddings == [[float(n)] * 4 for n in range(1, 6)]
+    assert mock_async_openai.embeddings.create.await_count == 3
+
+
+def test_generate_retries_after_rate_limit(mock_async_openai):
+    """Test that a 429 pauses the limiter and the request is retried."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    throttled = RateLimitError(
+        "Rate limit reached",
+        response=httpx.Response(429, headers={"retry-after-ms": "10"}, request=request),
+        body=None,
+    )
+    mock_async_openai.embeddings.create.side_effect = [
+        throttled,
+        MockEmbeddingResponse([MockEmbeddingData([2.0] * 4, 0)], total_tokens=1),
+    ]
+
+    limiter = AsyncRateLimiter()
+    generator = AsyncEmbeddingGenerator(rate_limiter=limiter)
+    with mock.patch.object(limiter, "penalize", wraps=limiter.penalize) as penalize:
+        assert asyncio.run(generator.generate("ab")) == [2.0] * 4
+        penalize.assert_called_once_with(0.01)
+    assert mock_async_openai.embeddings.create.await_count == 2
+
+
+def test_generate_pauses_limiter_on_first_rate_limit():
+    """Test that the SDK does not retry a 429 before the limiter sees it."""
+    requests = []
+    seen = []
+
+    def respond(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "10"}, json={})
+        return httpx.Response(200, json={
+            "object": "list",
+            "data": [{"object": "embedding", "index": 0, "embedding": [2.0] * 4}],
+            "model": "text-embedding-ada-002",
+            "usage": {"prompt_tokens": 1, "total_tokens": 1},
+        })
+
+    def client(**kwargs):
+        transport = httpx.MockTransport(respond)
+        return AsyncOpenAI(
+            api_key="test", http_client=httpx.AsyncClient(transport=transport), **kwargs
+        )
+
+    limiter = AsyncRateLimiter()
+    with mock.patch("eumas.embeddings.async_generator.AsyncOpenAI", side_effect=client):
+        generator = AsyncEmbeddingGenerator(rate_limiter=limiter)
+    with mock.patch.object(
+        limiter, "penalize", side_effect=lambda seconds: seen.append(len(requests))
+    ):
+        assert asyncio.run(generator.generate("ab")) == [2.0] * 4
+    assert seen == [1]
+    assert len(requests) == 2
+
+
+def test_generate_error(mock_async_openai):
+    """Test handling of API errors."""
+    mock_async_openai.embeddings.create.side_effect = OpenAIError("API error")
+
+    generator = AsyncEmbeddingGenerator()
+    with pytest.raises(EmbeddingError) as exc_info:
+        asyncio.run(generator.generate("test text"))
+
+    assert "Failed to generate embeddings" in str(exc_info.value)
+
+
+def test_generate_deduplicates_inputs(mock_async_openai):
+    """Test that duplicate texts are embedded once."""
+    generator = AsyncEmbeddingGenerator()
+    embeddings = asyncio.run(generator.generate(["ab", "c", "ab"]))
+
+    assert embeddings == [[2.0] * 4, [1.0] * 4, [2.0] * 4]
+    mock_async_openai.embeddings.create.assert_awaited_once_with(
+        input=["ab", "c"],
+        model="text-embedding-ada-002"
+    )
+
+
+def test_generate_reads_cache_off_event_loop(mock_async_openai):
+    """Test that the blocking cache is called from a worker thread."""
+    threads = []
+    cache = mock.MagicMock()
+    cache.get_many.side_effect = lambda model, texts: (
+        threads.append(threading.current_thread()) or [None] * len(texts)
+    )
+    cache.put_many.side_effect = lambda *args: threads.append(threading.current_thread())
+    generator = AsyncEmbeddingGenerator(cache=cache)
+
+    assert asyncio.run(generator.generate("abc")) == [3.0] * 4
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
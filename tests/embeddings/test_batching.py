@@ -0,0 +1,33 @@
+"""Tests for the embedding batching module."""
+
+from eumas.embeddings.batching import chunk_texts, estimate_tokens
+
+
+def test_estimate_tokens():
+    """Test the tokenizer-free token estimate."""
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("a" * 30) == 10
+
+
+def test_chunk_texts_single_batch():
+    """Test that small inputs stay in one batch."""
+    assert chunk_texts(["a", "b", "c"]) == [[0, 1, 2]]
+    assert chunk_texts([]) == []
+
+
+def test_chunk_texts_item_limit():
+    """Test splitting on the per-request item limit."""
+    assert chunk_texts(["a"] * 5, max_batch_size=2) == [[0, 1], [2, 3], [4]]
+
+
+def test_chunk_texts_token_limit():
+    """Test splitting on the per-request token limit."""
+    texts = ["aaaa", "bb", "cccccc", "d"]
+    batches = chunk_texts(texts, max_batch_tokens=6, token_counter=len)
+    assert batches == [[0, 1], [2], [3]]
+
+
+def test_chunk_texts_oversized_text():
+    """Test that a text above the token limit gets a batch of its own."""
+    batches = chunk_texts(["a", "b" * 10, "c"], max_batch_tokens=5, token_counter=len)
+    assert batches == [[0], [1], [2]]
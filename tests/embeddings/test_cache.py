@@ -0,0 +1,134 @@
+"""Tests for the embedding cache module."""
+
+import pytest
+
+from eumas.embeddings.cache import EmbeddingCache, normalize_text, text_key
+
+
+def test_normalize_text_collapses_whitespace():
+    """Test that whitespace differences map to the same key."""
+    assert normalize_text("  hello \n world\t") == "hello world"
+    assert text_key("hello world") == text_key("hello   world ")
+    assert text_key("hello world") != text_key("Hello world")
+
+
+def test_memory_hit_and_miss_counters():
+    """Test hit/miss accounting for the in-process tier."""
+    cache = EmbeddingCache()
+    assert cache.get("model", "text") is None
+
+    cache.put("model", "text", [0.1, 0.2, 0.3])
+    assert cache.get("model", "text") == [0.1, 0.2, 0.3]
+    assert cache.get("other-model", "text") is None
+
+    stats = cache.stats
+    assert stats["hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["memory_size"] == 1
+
+
+def test_hits_are_copies(tmp_path):
+    """Test that mutating a returned vector does not change the cache."""
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path=path)
+    vector = [0.5, 0.25]
+    cache.put("model", "text", vector)
+    vector[0] = 9.0
+    first, second = cache.get_many("model", ["text", "text"])
+    first[0] = 9.0
+    assert second == [0.5, 0.25]
+    assert cache.get("model", "text") == [0.5, 0.25]
+    cache.close()
+
+    # Disk hits, shared by duplicates and the memory tier, are copied too
+    reopened = EmbeddingCache(path=path)
+    first, second = reopened.get_many("model", ["text", "text"])
+    first[0] = 9.0
+    assert second == [0.5, 0.25]
+    assert reopened.get("model", "text") == [0.5, 0.25]
+
+
+def test_memory_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = EmbeddingCache(max_memory_items=2)
+    cache.put("model", "a", [1.0])
+    cache.put("model", "b", [2.0])
+    cache.get("model", "a")
+    cache.put("model", "c", [3.0])
+
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "a") == [1.0]
+    assert cache.get("model", "c") == [3.0]
+    assert cache.stats["evictions"] == 1
+
+
+def test_disk_tier_persists(tmp_path):
+    """Test that vectors survive a new cache instance on the same file."""
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path=path)
+    cache.put_many("model", ["a", "b"], [[0.5, 0.25], [1.0, 2.0]])
+    cache.close()
+
+    reopened = EmbeddingCache(path=path)
+    assert reopened.get_many("model", ["a", "b", "c"]) == [[0.5, 0.25], [1.0, 2.0], None]
+    stats = reopened.stats
+    assert stats["disk_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["disk_size"] == 2
+
+
+def test_disk_tier_size_bound(tmp_path):
+    """Test that the on-disk tier is bounded."""
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.db"), max_disk_items=2)
+    for i in range(4):
+        cache.put("model", f"text {i}", [float(i)])
+    assert cache.stats["disk_size"] == 2
+
+
+def test_disk_size_is_tracked_without_counting(tmp_path):
+    """Test that writes keep the row count without counting the table."""
+    path = str(tmp_path / "embeddings.db")
+    EmbeddingCache(path=path).put_many("model", ["a", "b"], [[1.0], [2.0]])
+
+    cache = EmbeddingCache(path=path, max_disk_items=3)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.put_many("model", ["a", "c", "c"], [[1.5], [3.0], [3.0]])
+    assert cache.stats["disk_size"] == 3
+    cache.put_many("model", ["d"], [[4.0]])
+    cache.put_many("other", ["a"], [[5.0]])
+    assert cache.stats["disk_size"] == 3
+    assert cache.stats["evictions"] == 2
+    assert not any("COUNT" in statement for statement in statements)
+    cache._conn.set_trace_callback(None)
+    assert cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone() == (3,)
+
+
+def test_dimension_check_on_put():
+    """Test that vectors with an unexpected dimension are rejected."""
+    cache = EmbeddingCache(dimension=3)
+    with pytest.raises(ValueError):
+        cache.put("model", "text", [0.1, 0.2])
+
+
+def test_dimension_learned_per_model():
+    """Test that the dimension is learned from the first vector of each model."""
+    cache = EmbeddingCache()
+    cache.put("small", "text", [0.1, 0.2])
+    cache.put("large", "text", [0.1, 0.2, 0.3])
+    with pytest.raises(ValueError):
+        cache.put("small", "other", [0.1, 0.2, 0.3])
+
+
+def test_invalid_disk_entries_are_discarded(tmp_path):
+    """Test that cached vectors of the wrong dimension are treated as misses."""
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path=path)
+    cache.put("model", "text", [0.1, 0.2])
+    cache.close()
+
+    reopened = EmbeddingCache(path=path, dimension=3)
+    assert reopened.get("model", "text") is None
+    assert reopened.stats["invalid"] == 1
+    assert reopened.stats["disk_size"] == 0
@@ -0,0 +1,104 @@
+"""Tests for the embedding coalescer module."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from eumas.embeddings.coalescer import EmbeddingCoalescer
+from eumas.utils.errors import EmbeddingError
+
+
+@pytest.fixture
+def mock_generator():
+    """Mock generator returning one distinct vector per text."""
+    generator = mock.MagicMock()
+    generator.generate.side_effect = lambda texts: [[float(len(t))] * 2 for t in texts]
+    return generator
+
+
+def test_concurrent_requests_are_coalesced(mock_generator):
+    """Test that concurrent callers share one batched call."""
+    with EmbeddingCoalescer(mock_generator, max_wait_ms=50, max_batch_size=8) as coalescer:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(coalescer.generate, ["a" * n for n in range(1, 9)]))
+
+    assert results == [[float(n)] * 2 for n in range(1, 9)]
+    assert mock_generator.generate.call_count == 1
+    assert coalescer.stats["mean_batch_size"] == 8
+
+
+def test_batch_size_bound(mock_generator):
+    """Test that batches never exceed the maximum size."""
+    with EmbeddingCoalescer(mock_generator, max_wait_ms=50, max_batch_size=3) as coalescer:
+        futures = [coalescer.submit(str(i)) for i in range(7)]
+        assert [f.result() for f in futures] == [[1.0] * 2] * 7
+
+    sizes = [len(call.args[0]) for call in mock_generator.generate.call_args_list]
+    assert max(sizes) <= 3
+    assert sum(sizes) == 7
+
+
+def test_leftovers_keep_their_arrival_time(mock_generator):
+    """Test that requests left over from a full batch wait at most max_wait."""
+    dispatched = {}
+
+    def generate(texts):
+        for text in texts:
+            dispatched[text] = time.monotonic()
+        time.sleep(0.1)
+        return [[1.0] * 2 for _ in texts]
+
+    mock_generator.generate.side_effect = generate
+    with EmbeddingCoalescer(mock_generator, max_wait_ms=200, max_batch_size=2) as coalescer:
+        coalescer.submit("a")
+        coalescer.submit("b")  # full batch, dispatched while the rest queue up
+        submitted = time.monotonic()
+        futures = [coalescer.submit(text) for text in "cde"]
+        [future.result() for future in futures]
+
+    # "e" is left over after the second batch; resetting its wait would hold it
+    # until 300 ms after it was submitted
+    assert dispatched["e"] - submitted < 0.25
+
+
+def test_agenerate(mock_generator):
+    """Test the asyncio front end."""
+    async def run(coalescer):
+        return await asyncio.gather(coalescer.agenerate("ab"), coalescer.agenerate("abc"))
+
+    with EmbeddingCoalescer(mock_generator, max_wait_ms=20) as coalescer:
+        assert asyncio.run(run(coalescer)) == [[2.0] * 2, [3.0] * 2]
+    assert mock_generator.generate.call_count == 1
+
+
+def test_cancelled_request_does_not_stop_dispatch(mock_generator):
+    """Test that a caller timing out is dropped and later callers are still served."""
+    async def time_out(coalescer):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(coalescer.agenerate("a"), 0.01)
+
+    with EmbeddingCoalescer(mock_generator, max_wait_ms=50) as coalescer:
+        asyncio.run(time_out(coalescer))
+        assert coalescer.submit("bb").result(timeout=1) == [2.0] * 2
+
+    sent = [text for call in mock_generator.generate.call_args_list for text in call.args[0]]
+    assert sent == ["bb"]
+
+
+def test_batch_failure_propagates(mock_generator):
+    """Test that a failed batch fails every caller in it."""
+    mock_generator.generate.side_effect = EmbeddingError("boom")
+    with EmbeddingCoalescer(mock_generator, max_wait_ms=1) as coalescer:
+        with pytest.raises(EmbeddingError):
+            coalescer.generate("text")
+
+
+def test_submit_after_close(mock_generator):
+    """Test that a closed coalescer rejects new requests."""
+    coalescer = EmbeddingCoalescer(mock_generator)
+    coalescer.close()
+    with pytest.raises(EmbeddingError):
+        coalescer.submit("text")
@@ -1,13 +1,16 @@
 """Tests for the embedding generator module."""
 
+import base64
 from dataclasses import dataclass
 from typing import List
 from unittest import mock
 
+import numpy as np
 import pytest
 from openai import OpenAIError, BadRequestError
 from openai.types import CreateEmbeddingResponse, Embedding
 
+from eumas.embeddings.cache import EmbeddingCache
 from eumas.embeddings.generator import EmbeddingGenerator
 from eumas.utils.errors import EmbeddingError
 
@@ -151,3 +154,185 @@ def test_generate_bad_request():
             generator.generate("")
         
         assert "Failed to generate embeddings" in str(exc_info.value)
+
+
+def _echo_response(input, model, **kwargs):
+    """Build a mock response with one distinct vector per input text."""
+    return MockEmbeddingResponse(
+        data=[
+            MockEmbeddingData(embedding=[float(len(text))] * 4, index=i)
+            for i, text in enumerate(input)
+        ],
+        model=model,
+    )
+
+
+def test_generate_with_cache_partial_hits():
+    """Test that only cache misses are sent to the API."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _echo_response
+
+        cache = EmbeddingCache()
+        cache.put("text-embedding-ada-002", "cached", [9.0] * 4)
+        generator = EmbeddingGenerator(cache=cache)
+
+        embeddings = generator.generate(["a", "cached", "bbb"])
+
+        assert embeddings == [[1.0] * 4, [9.0] * 4, [3.0] * 4]
+        mock_instance.embeddings.create.assert_called_once_with(
+            input=["a", "bbb"],
+            model="text-embedding-ada-002"
+        )
+
+        # A repeated single-string call is served entirely from the cache
+        assert generator.generate("bbb") == [3.0] * 4
+        assert mock_instance.embeddings.create.call_count == 1
+
+
+def test_generate_splits_large_batches():
+    """Test that large inputs are split into several requests and reassembled in order."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _echo_response
+
+        generator = EmbeddingGenerator(max_batch_size=2, max_workers=3)
+        texts = ["a" * n for n in range(1, 8)]
+        embeddings = generator.generate(texts)
+
+        assert embeddings == [[float(n)] * 4 for n in range(1, 8)]
+        assert mock_instance.embeddings.create.call_count == 4
+        sent = sorted(
+            call.kwargs["input"] for call in mock_instance.embeddings.create.call_args_list
+        )
+        assert sent == [["a", "aa"], ["aaa", "aaaa"], ["aaaaa", "aaaaaa"], ["aaaaaaa"]]
+
+
+def _base64_response(input, model, encoding_format=None):
+    """Build a mock base64-encoded response with one distinct vector per input text."""
+    return MockEmbeddingResponse(
+        data=[
+            MockEmbeddingData(
+                embedding=base64.b64encode(
+                    np.full(4, float(len(text)), dtype="<f4").tobytes()
+                ).decode(),
+                index=i,
+            )
+            for i, text in enumerate(input)
+        ],
+        model=model,
+    )
+
+
+def test_generate_as_array():
+    """Test float32 ndarray output decoded from the base64 wire format."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _base64_response
+
+        generator = EmbeddingGenerator()
+        matrix = generator.generate(["a", "bb", "ccc"], as_array=True)
+
+        assert isinstance(matrix, np.ndarray)
+        assert matrix.dtype == np.float32
+        assert matrix.shape == (3, 4)
+        assert matrix.flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(matrix[:, 0], [1.0, 2.0, 3.0])
+        mock_instance.embeddings.create.assert_called_once_with(
+            input=["a", "bb", "ccc"],
+            model="text-embedding-ada-002",
+            encoding_format="base64"
+        )
+
+        vector = generator.generate("dddd", as_array=True)
+        assert vector.shape == (4,)
+        assert vector[0] == 4.0
+
+
+def test_generate_as_array_with_cache():
+    """Test that cached lists and decoded arrays combine into one matrix."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _base64_response
+
+        cache = EmbeddingCache()
+        cache.put("text-embedding-ada-002", "cached", [9.0] * 4)
+        generator = EmbeddingGenerator(cache=cache)
+
+        matrix = generator.generate(["cached", "aa"], as_array=True)
+        np.testing.assert_array_equal(matrix[:, 0], [9.0, 2.0])
+        assert cache.get("text-embedding-ada-002", "aa") == [2.0] * 4
+
+
+def test_generate_with_metadata_as_array():
+    """Test that metadata generation supports array output."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _base64_response
+
+        generator = EmbeddingGenerator()
+        result = generator.generate_with_metadata("abc", as_array=True)
+        assert result["embedding"].dtype == np.float32
+        assert result["embedding"].shape == (4,)
+
+
+def test_generate_api_dimensions():
+    """Test that the dimensions parameter is sent to the API."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _echo_response
+
+        generator = EmbeddingGenerator(model="text-embedding-3-small", dimensions=256)
+        generator.generate("text")
+        mock_instance.embeddings.create.assert_called_once_with(
+            input=["text"],
+            model="text-embedding-3-small",
+            dimensions=256
+        )
+        assert generator.cache_namespace == "text-embedding-3-small@256"
+
+
+def test_generate_truncate_dimensions():
+    """Test local truncation and renormalization."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _echo_response
+
+        generator = EmbeddingGenerator(dimensions=2, reduction="truncate")
+        embedding = generator.generate("text")
+        mock_instance.embeddings.create.assert_called_once_with(
+            input=["text"],
+            model="text-embedding-ada-002"
+        )
+        assert embedding == pytest.approx([2 ** -0.5, 2 ** -0.5])
+
+        with pytest.raises(ValueError):
+            EmbeddingGenerator(dimensions=2, reduction="pca")
+
+
+def test_generate_deduplicates_inputs():
+    """Test that duplicate texts are embedded once and fanned back out."""
+    with mock.patch("eumas.embeddings.generator.OpenAI") as mock_client:
+        mock_instance = mock.MagicMock()
+        mock_client.return_value = mock_instance
+        mock_instance.embeddings.create.side_effect = _echo_response
+
+        generator = EmbeddingGenerator()
+        embeddings = generator.generate(["hi", "hello", "hi", "hi"])
+
+        assert embeddings == [[2.0] * 4, [5.0] * 4, [2.0] * 4, [2.0] * 4]
+        mock_instance.embeddings.create.assert_called_once_with(
+            input=["hi", "hello"],
+            model="text-embedding-ada-002"
+        )
+        assert generator.stats == {"requested": 4, "embedded": 2, "dedup_ratio": 0.5}
+
+        matrix = generator.generate(["x", "x"], as_array=True)
+        assert matrix.shape == (2, 4)
@@ -0,0 +1,76 @@
+"""Tests for the embedding providers module."""
+
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from eumas.embeddings.generator import EmbeddingGenerator
+from eumas.embeddings.providers import HashingEmbeddingProvider, OpenAIEmbeddingProvider
+
+
+def test_hashing_provider_is_deterministic():
+    """Test that the same text always maps to the same unit vector."""
+    provider = HashingEmbeddingProvider(dimension=64)
+    first, second = provider.embed(["Hello world", "hello, WORLD"], "ignored")
+    assert first == second
+    assert len(first) == 64
+    assert np.linalg.norm(first) == pytest.approx(1.0)
+
+
+def test_hashing_provider_similarity():
+    """Test that shared vocabulary yields higher similarity."""
+    provider = HashingEmbeddingProvider(dimension=256)
+    a, b, c = provider.embed(
+        ["the cat sat on the mat", "the cat sat on a rug", "quarterly revenue grew"],
+        "ignored",
+        as_array=True,
+    )
+    assert float(a @ b) > float(a @ c)
+
+
+def test_hashing_provider_dimensions_and_empty_text():
+    """Test requested sizes and empty input."""
+    provider = HashingEmbeddingProvider()
+    (vector,) = provider.embed([""], "ignored", dimensions=32)
+    assert vector == [0.0] * 32
+
+
+def test_openai_provider_options():
+    """Test that the OpenAI provider forwards dimensions and encoding."""
+    client = mock.MagicMock()
+    client.embeddings.create.return_value = mock.MagicMock(data=[])
+    OpenAIEmbeddingProvider(client).embed(["a"], "m", dimensions=8, as_array=True)
+    client.embeddings.create.assert_called_once_with(
+        input=["a"], model="m", encoding_format="base64", dimensions=8
+    )
+
+
+def test_openai_provider_with_timeout_disables_client_retries():
+    """Test that a bounded OpenAI provider neither retries nor waits past the timeout."""
+    client = mock.MagicMock()
+    bounded = OpenAIEmbeddingProvider(client).with_timeout(1.5)
+
+    client.with_options.assert_called_once_with(timeout=1.5, max_retries=0)
+    assert bounded.client is client.with_options.return_value
+
+
+def test_generator_selects_provider_from_config():
+    """Test backend selection through Config.EMBEDDING_PROVIDER."""
+    with mock.patch("eumas.embeddings.generator.Config.EMBEDDING_PROVIDER", "hashing"):
+        generator = EmbeddingGenerator()
+    assert isinstance(generator.provider, HashingEmbeddingProvider)
+    assert generator.client is None
+    assert generator.cache_namespace == "hashing:text-embedding-ada-002"
+    assert len(generator.generate("offline text")) == 1536
+
+    with mock.patch("eumas.embeddings.generator.Config.EMBEDDING_PROVIDER", "unknown"):
+        with pytest.raises(ValueError):
+            EmbeddingGenerator()
+
+
+def test_generator_with_explicit_provider():
+    """Test passing a provider instance directly."""
+    generator = EmbeddingGenerator(provider=HashingEmbeddingProvider(dimension=16))
+    matrix = generator.generate(["a b", "c d"], as_array=True)
+    assert matrix.shape == (2, 16)
@@ -0,0 +1,86 @@
+"""Tests for the embedding rate limiting module."""
+
+import asyncio
+import time
+from unittest import mock
+
+from eumas.embeddings.rate_limit import AsyncRateLimiter, TokenBucket, retry_after_seconds
+
+
+def test_token_bucket_wait_time():
+    """Test bucket refill and wait computation."""
+    bucket = TokenBucket(rate_per_minute=600)  # 10 per second, capacity 10
+    assert bucket.capacity == 10
+    assert bucket.wait_time(10) == 0
+    bucket.take(10)
+    assert abs(bucket.wait_time(5) - 0.5) < 1e-9
+    bucket.refill(bucket.updated + 0.5)
+    assert abs(bucket.level - 5) < 1e-9
+
+
+def test_token_bucket_oversized_request():
+    """Test that requests above the capacity wait for a full bucket only."""
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.wait_time(1000) == 0
+
+
+def test_rate_limiter_enforces_request_rate():
+    """Test that callers beyond the burst wait for the request quota."""
+    limiter = AsyncRateLimiter(requests_per_minute=1200, tokens_per_minute=10 ** 9)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(1) for _ in range(25)))
+        return time.monotonic() - start
+
+    # 20 requests fit in the burst, the remaining 5 arrive at 20 per second
+    assert asyncio.run(run()) >= 0.2
+
+
+def test_rate_limiter_enforces_token_rate():
+    """Test that the token quota is tracked separately from requests."""
+    limiter = AsyncRateLimiter(requests_per_minute=10 ** 6, tokens_per_minute=6000)
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire(50)
+        return time.monotonic() - start
+
+    # Capacity is 100 tokens refilled at 100 per second
+    assert asyncio.run(run()) >= 0.45
+
+
+def test_rate_limiter_penalize():
+    """Test that a 429 pauses subsequent callers."""
+    limiter = AsyncRateLimiter()
+    limiter.penalize(0.2)
+
+    async def run():
+        start = time.monotonic()
+        await limiter.acquire(1)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_retry_after_seconds():
+    """Test reading retry hints from response headers."""
+    error = mock.MagicMock()
+    error.response.headers = {"retry-after": "3"}
+    assert retry_after_seconds(error, default=1.0) == 3.0
+
+    error.response.headers = {"retry-after-ms": "250", "retry-after": "3"}
+    assert retry_after_seconds(error, default=1.0) == 0.25
+
+    error.response.headers = {}
+    assert retry_after_seconds(error, default=1.5) == 1.5
+
+
+def test_rate_limiter_creates_lock_in_running_loop():
+    """Test that a limiter built outside a loop creates its lock on first use."""
+    limiter = AsyncRateLimiter()
+    assert limiter._lock is None
+
+    asyncio.run(limiter.acquire(1))
+    assert limiter._lock is not None
@@ -0,0 +1,50 @@
+"""Tests for the embedding dimension reduction module."""
+
+import numpy as np
+import pytest
+
+from eumas.embeddings.reduction import (
+    evaluate_dimensions,
+    recall_at_k,
+    top_k,
+    truncate_embeddings,
+)
+
+
+def test_truncate_embeddings_renormalizes():
+    """Test that truncated vectors have unit length."""
+    truncated = truncate_embeddings([[3.0, 4.0, 12.0], [0.0, 0.0, 1.0]], 2)
+    assert truncated.shape == (2, 2)
+    assert truncated.dtype == np.float32
+    np.testing.assert_allclose(truncated[0], [0.6, 0.8])
+    # Zero prefixes stay zero instead of dividing by zero
+    np.testing.assert_array_equal(truncated[1], [0.0, 0.0])
+
+
+def test_truncate_embeddings_single_vector():
+    """Test truncating a single vector."""
+    assert truncate_embeddings([1.0, 0.0, 0.0], 2).shape == (2,)
+
+
+def test_truncate_embeddings_invalid_dimension():
+    """Test that impossible sizes are rejected."""
+    with pytest.raises(ValueError):
+        truncate_embeddings([[1.0, 2.0]], 3)
+
+
+def test_top_k_and_recall():
+    """Test exact neighbour search and recall computation."""
+    corpus = np.eye(4, dtype=np.float32)
+    queries = np.array([[1.0, 0.1, 0.0, 0.0]], dtype=np.float32)
+    assert set(top_k(queries, corpus, 2)[0].tolist()) == {0, 1}
+    assert recall_at_k(np.array([[0, 1]]), np.array([[1, 3]])) == 0.5
+
+
+def test_evaluate_dimensions_full_size_is_exact():
+    """Test that keeping every dimension gives perfect recall."""
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((200, 32))
+    queries = rng.standard_normal((10, 32))
+    results = evaluate_dimensions(corpus, queries, [8, 32], k=5)
+    assert results[32] == 1.0
+    assert 0.0 <= results[8] < 1.0
@@ -0,0 +1,194 @@
+"""Tests for the embedding resilience module."""
+
+import threading
+import time
+
+import pytest
+
+from eumas.embeddings.providers import EmbeddingProvider
+from eumas.embeddings.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    ResilientEmbeddingProvider,
+    backoff_delay,
+    is_retryable,
+)
+from eumas.utils.errors import EmbeddingError
+
+
+class ScriptedProvider(EmbeddingProvider):
+    """Provider whose successive calls sleep and/or fail as scripted."""
+
+    name = "scripted"
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def with_timeout(self, timeout):
+        self.timeouts.append(timeout)
+        return self
+
+    def embed(self, texts, model, dimensions=None, as_array=False):
+        with self._lock:
+            step = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+            call = self.calls
+        delay, error = step
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return [[float(call)] for _ in texts]
+
+
+class StatusError(Exception):
+    """Exception carrying an HTTP status code."""
+
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def _warm_tracker(latency=0.01, **kwargs):
+    tracker = LatencyTracker(min_samples=5, **kwargs)
+    for _ in range(10):
+        tracker.record(latency)
+    return tracker
+
+
+def test_latency_tracker_percentiles_and_timeout():
+    """Test percentile-derived timeouts and the warm-up default."""
+    tracker = LatencyTracker(min_samples=3, initial_timeout=7.0, min_timeout=0.1)
+    assert tracker.timeout() == 7.0
+    assert tracker.hedge_delay() is None
+
+    for latency in [0.1, 0.2, 0.3, 0.4]:
+        tracker.record(latency)
+    assert tracker.percentile(50) == 0.3
+    assert tracker.hedge_delay() == 0.4
+    assert tracker.timeout() == pytest.approx(1.2)
+
+
+def test_circuit_breaker_transitions():
+    """Test closed -> open -> half-open -> closed transitions."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # Only one trial request
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_backoff_delay_and_retryable():
+    """Test jittered backoff bounds and retry classification."""
+    assert all(0 <= backoff_delay(5, 0.5, 2.0) <= 2.0 for _ in range(50))
+    assert is_retryable(TimeoutError())
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+
+
+def test_hedged_request_wins():
+    """Test that a slow primary is beaten by the hedged duplicate."""
+    provider = ScriptedProvider([(0.5, None), (0.0, None)])
+    resilient = ResilientEmbeddingProvider(provider, latency=_warm_tracker(max_timeout=2.0))
+
+    start = time.monotonic()
+    assert resilient.embed(["a"], "m") == [[2.0]]
+    assert time.monotonic() - start < 0.4
+    assert resilient.stats["hedges"] == 1
+    assert resilient.stats["hedge_wins"] == 1
+    resilient.close()
+
+
+def test_retry_after_failure():
+    """Test that failed attempts are retried."""
+    provider = ScriptedProvider([(0.0, StatusError(500)), (0.0, None)])
+    resilient = ResilientEmbeddingProvider(provider, hedge=False, base_delay=0.01)
+    assert resilient.embed(["a"], "m") == [[2.0]]
+    assert resilient.stats["retries"] == 1
+
+
+def test_timeout_then_give_up():
+    """Test the adaptive timeout and the final error after retries."""
+    provider = ScriptedProvider([(0.3, None)])
+    resilient = ResilientEmbeddingProvider(
+        provider,
+        latency=_warm_tracker(min_timeout=0.05, max_timeout=0.05),
+        hedge=False,
+        max_retries=1,
+        base_delay=0.01,
+    )
+    with pytest.raises(EmbeddingError):
+        resilient.embed(["a"], "m")
+    assert resilient.stats["timeouts"] == 2
+    resilient.close()
+
+
+def test_attempts_bound_provider_requests_by_timeout():
+    """Test that every attempt hands the adaptive timeout to the provider."""
+    provider = ScriptedProvider([(0.0, StatusError(503)), (0.0, None)])
+    resilient = ResilientEmbeddingProvider(
+        provider,
+        latency=_warm_tracker(min_timeout=0.25, max_timeout=0.25),
+        hedge=False,
+        base_delay=0.01,
+    )
+    assert resilient.embed(["a"], "m") == [[2.0]]
+    assert provider.timeouts == [0.25, 0.25]
+    resilient.close()
+
+
+def test_non_retryable_error_is_raised_immediately():
+    """Test that client errors are not retried."""
+    provider = ScriptedProvider([(0.0, StatusError(400))])
+    resilient = ResilientEmbeddingProvider(provider, hedge=False)
+    with pytest.raises(StatusError):
+        resilient.embed(["a"], "m")
+    assert provider.calls == 1
+
+
+def test_non_retryable_error_keeps_circuit_state():
+    """Test that client errors neither close the circuit nor reset its failures."""
+    provider = ScriptedProvider([
+        (0.0, StatusError(503)), (0.0, StatusError(400)), (0.0, StatusError(503)),
+    ])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    resilient = ResilientEmbeddingProvider(provider, breaker=breaker, hedge=False, max_retries=0)
+    for error in (EmbeddingError, StatusError, EmbeddingError):
+        with pytest.raises(error):
+            resilient.embed(["a"], "m")
+    assert breaker.state == "open"
+
+    # A half-open trial that fails with a client error frees the slot only
+    provider.script = [(0.0, StatusError(400))]
+    time.sleep(0.06)
+    with pytest.raises(StatusError):
+        resilient.embed(["a"], "m")
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_open_circuit_fails_fast():
+    """Test that an open circuit rejects requests without calling the provider."""
+    provider = ScriptedProvider([(0.0, StatusError(503))])
+    resilient = ResilientEmbeddingProvider(
+        provider,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        hedge=False,
+        max_retries=5,
+        base_delay=0.001,
+    )
+    with pytest.raises(EmbeddingError, match="circuit is open"):
+        resilient.embed(["a"], "m")
+    assert provider.calls == 2
+    assert resilient.stats["rejected"] == 1